@@ -1,52 +1,125 @@
-"""
-Admin Panel Page
-Filename: admin_panel.py
-"""
-
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-from db_utils import get_db_connection
-
-def show_admin_panel():
-    """Display admin dashboard"""
-    st.title("Admin Dashboard")
-
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-
-        col1, col2, col3 = st.columns(3)
-
-        cursor.execute("SELECT COUNT(*) as count FROM Users")
-        user_count = cursor.fetchone()['count']
-        col1.metric("Total Users", user_count)
-
-        cursor.execute("SELECT COUNT(*) as count FROM Bookings")
-        booking_count = cursor.fetchone()['count']
-        col2.metric("Total Bookings", booking_count)
-
-        cursor.execute("SELECT SUM(tickets_booked) as total FROM Bookings")
-        ticket_count = cursor.fetchone()['total'] or 0
-        col3.metric("Tickets Sold", ticket_count)
-
-        st.markdown("---")
-
-        cursor.execute("SELECT language, COUNT(*) as count FROM Movies GROUP BY language")
-        lang_data = cursor.fetchall()
-        if lang_data:
-            df_lang = pd.DataFrame(lang_data)
-            fig = px.pie(df_lang, values='count', names='language', title='Movies by Language',
-                        color_discrete_sequence=['#667eea', '#764ba2', '#f59e0b', '#10b981'])
-            fig.update_layout(
-                paper_bgcolor='#ffffff', 
-                plot_bgcolor='#ffffff', 
-                font_color='#1e293b',
-                font_size=14,
-                title_font_size=20,
-                title_font_color='#1e293b'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        cursor.close()
-        conn.close()
\ No newline at end of file
+"""
+Admin Panel Page
+Filename: admin_panel.py
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from db_utils import get_db_connection, get_catalogue_cache, invalidate_movies, get_password_workers, get_movies, get_sales_report, get_query_metrics
+from rollups import read_totals
+from profiler import profiled
+
+@profiled('show_admin_panel')
+def show_admin_panel():
+    """Display admin dashboard"""
+    st.title("Admin Dashboard")
+
+    # Dashboard totals tolerate replica lag
+    conn = get_db_connection(read_only=True)
+    if conn:
+        cursor = conn.cursor()
+
+        col1, col2, col3 = st.columns(3)
+
+        # Running counters kept up to date by bookings and sign-ups
+        totals = read_totals(cursor)
+        col1.metric("Total Users", totals['users'])
+        col2.metric("Total Bookings", totals['bookings'])
+        col3.metric("Tickets Sold", totals['tickets'])
+
+        st.markdown("---")
+
+        # Counted from the cached catalogue instead of querying Movies
+        movies = get_movies()
+        if movies:
+            df_lang = pd.DataFrame(movies)['language'].value_counts().rename_axis('language').reset_index(name='count')
+            fig = px.pie(df_lang, values='count', names='language', title='Movies by Language',
+                        color_discrete_sequence=['#667eea', '#764ba2', '#f59e0b', '#10b981'])
+            fig.update_layout(
+                paper_bgcolor='#ffffff', 
+                plot_bgcolor='#ffffff', 
+                font_color='#1e293b',
+                font_size=14,
+                title_font_size=20,
+                title_font_color='#1e293b'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        cursor.close()
+        conn.close()
+
+    show_sales_analytics()
+
+    st.markdown("---")
+    st.subheader("Catalogue Cache")
+    stats = get_catalogue_cache().stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Cache Hits", stats['hits'])
+    col2.metric("Cache Misses", stats['misses'])
+    col3.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+    if st.button("Refresh Movie Catalogue"):
+        invalidate_movies()
+        st.success("Catalogue will be reloaded on next view.")
+
+    st.subheader("Login Latency")
+    login_stats = get_password_workers().stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("p50", f"{login_stats['p50_ms']:.0f} ms")
+    col2.metric("p95", f"{login_stats['p95_ms']:.0f} ms")
+    col3.metric("Rejected (busy)", login_stats['rejected'])
+
+    st.subheader("Query Latency")
+    queries = get_query_metrics().summary()
+    if queries:
+        st.dataframe(pd.DataFrame.from_dict(queries, orient='index').round(1), use_container_width=True)
+
+def _style(fig):
+    fig.update_layout(paper_bgcolor='#ffffff', plot_bgcolor='#ffffff', font_color='#1e293b', font_size=14)
+    return fig
+
+@profiled('show_sales_analytics')
+def show_sales_analytics():
+    """Revenue, occupancy and cancellation trends from the cached sales report"""
+    st.markdown("---")
+    st.subheader("Sales Analytics")
+    report = get_sales_report()
+    if report is None:
+        get_sales_report.clear()
+        return
+
+    titles = {m['movie_id']: m['title'] for m in get_movies()}
+    col1, col2 = st.columns(2)
+    col1.metric("Revenue", f"₹{report['total_revenue']:,.0f}")
+    col2.metric("Overall Occupancy", f"{report['overall_fill_rate']:.0%}")
+
+    trend = report['revenue_trend']
+    if not trend.empty:
+        top = trend.groupby('movie_id')['revenue'].sum().nlargest(5).index
+        trend = trend[trend['movie_id'].isin(top)].assign(movie=lambda df: df['movie_id'].map(titles))
+        st.plotly_chart(_style(px.line(trend, x='day', y='revenue', color='movie',
+                                       title='Daily Revenue (top 5 movies)')),
+                        use_container_width=True)
+
+    dimension = st.radio("Occupancy by", ["Movie", "Screen", "Hour"], horizontal=True)
+    occupancy = report[{'Movie': 'by_movie', 'Screen': 'by_screen', 'Hour': 'by_hour'}[dimension]]
+    if dimension == "Movie":
+        occupancy = occupancy.assign(movie_id=occupancy['movie_id'].map(titles)).nlargest(15, 'revenue')
+    x = {'Movie': 'movie_id', 'Screen': 'screen_id', 'Hour': 'hour'}[dimension]
+    st.plotly_chart(_style(px.bar(occupancy, x=x, y='fill_rate', hover_data=['sold', 'capacity', 'revenue'],
+                                  title=f'Fill Rate by {dimension}', color_discrete_sequence=['#667eea'])),
+                    use_container_width=True)
+
+    heatmap = report['fill_heatmap']
+    if not heatmap.empty:
+        st.plotly_chart(_style(px.imshow(heatmap, aspect='auto', color_continuous_scale='Purples',
+                                         labels={'x': 'Show hour', 'y': '', 'color': 'Fill rate'},
+                                         title='Fill Rate by Weekday and Hour')),
+                        use_container_width=True)
+
+    cancellations = report['cancellations']
+    if not cancellations.empty and cancellations['sum'].any():
+        worst = cancellations.nlargest(10, 'cancellation_rate').assign(movie=lambda df: df['movie_id'].map(titles))
+        st.plotly_chart(_style(px.bar(worst, x='movie', y='cancellation_rate', title='Cancellation Rate',
+                                      color_discrete_sequence=['#f59e0b'])),
+                        use_container_width=True)
\ No newline at end of file
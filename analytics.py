@@ -0,0 +1,117 @@
+"""
+Sales Analytics
+Filename: analytics.py
+"""
+
+import numpy as np
+import pandas as pd
+import pymysql
+
+BOOKING_COLUMNS = ['booking_id', 'showtime_id', 'tickets_booked', 'booking_date', 'status']
+SHOWTIME_COLUMNS = ['showtime_id', 'movie_id', 'screen_id', 'show_date', 'show_time',
+                    'available_seats', 'ticket_price']
+FETCH_CHUNK = 50000
+
+
+def _fetch_frame(conn, query, columns, chunk=FETCH_CHUNK):
+    """Stream a query through an unbuffered tuple cursor and build a DataFrame chunk by chunk.
+
+    Only ``chunk`` rows are held client-side at a time; closing the cursor
+    drains anything left unread so the connection can be reused.
+    """
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        cursor.execute(query)
+        frames = []
+        while True:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                break
+            frames.append(pd.DataFrame.from_records(rows, columns=columns))
+    finally:
+        cursor.close()
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def prepare_frames(bookings, showtimes):
+    """Narrow dtypes so a multi-million row extract stays small in memory"""
+    bookings = bookings.astype({'booking_id': 'int64', 'showtime_id': 'int32', 'tickets_booked': 'int16'})
+    bookings['booking_date'] = pd.to_datetime(bookings['booking_date'])
+    bookings['status'] = bookings['status'].astype('category')
+
+    showtimes = showtimes.astype({'showtime_id': 'int32', 'movie_id': 'int32', 'available_seats': 'int32'})
+    showtimes['screen_id'] = showtimes['screen_id'].fillna(0).astype('int32')
+    showtimes['ticket_price'] = showtimes['ticket_price'].astype('float32')
+    # MySQL TIME columns arrive as timedeltas, SQLite ones as 'HH:MM:SS' strings
+    show_time = pd.to_timedelta(showtimes['show_time'].astype(str))
+    hours = (show_time.dt.total_seconds() // 3600) % 24
+    showtimes['hour'] = hours.astype('int8')
+    showtimes['show_date'] = pd.to_datetime(showtimes['show_date'])
+    return bookings, showtimes.drop(columns=['show_time'])
+
+
+def load_sales_frames(conn):
+    """Columnar extract of Bookings and Showtimes for the analytics below"""
+    bookings = _fetch_frame(
+        conn,
+        "SELECT booking_id, showtime_id, tickets_booked, booking_date, status FROM Bookings",
+        BOOKING_COLUMNS
+    )
+    showtimes = _fetch_frame(
+        conn,
+        "SELECT showtime_id, movie_id, screen_id, show_date, show_time, available_seats, ticket_price FROM Showtimes",
+        SHOWTIME_COLUMNS
+    )
+    return prepare_frames(bookings, showtimes)
+
+
+def build_report(bookings, showtimes):
+    """Every aggregate the dashboard charts need, computed with vectorised group-bys"""
+    confirmed = bookings['status'] != 'cancelled'
+
+    # Per-showtime sold tickets; capacity is what is left plus what was sold
+    sold = (bookings.loc[confirmed]
+            .groupby('showtime_id', observed=True)['tickets_booked'].sum()
+            .reindex(showtimes['showtime_id'], fill_value=0).to_numpy())
+    shows = showtimes.assign(sold=sold)
+    shows['capacity'] = shows['available_seats'] + shows['sold']
+    shows['revenue'] = shows['sold'] * shows['ticket_price']
+    shows['fill_rate'] = np.where(shows['capacity'] > 0, shows['sold'] / shows['capacity'].clip(lower=1), 0.0)
+    shows['weekday'] = shows['show_date'].dt.day_name()
+
+    # Revenue per booking day and movie
+    joined = bookings.loc[confirmed, ['showtime_id', 'tickets_booked', 'booking_date']].merge(
+        showtimes[['showtime_id', 'movie_id', 'ticket_price']], on='showtime_id', how='inner'
+    )
+    joined['revenue'] = joined['tickets_booked'] * joined['ticket_price']
+    joined['day'] = joined['booking_date'].dt.floor('D')
+    revenue_trend = joined.groupby(['day', 'movie_id'], observed=True)['revenue'].sum().reset_index()
+
+    def occupancy(by):
+        grouped = shows.groupby(by, observed=True)[['sold', 'capacity', 'revenue']].sum()
+        grouped['fill_rate'] = grouped['sold'] / grouped['capacity'].clip(lower=1)
+        return grouped.reset_index()
+
+    weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    heatmap = (shows.pivot_table(index='weekday', columns='hour', values='fill_rate', aggfunc='mean')
+               .reindex([d for d in weekdays if d in set(shows['weekday'])]))
+
+    per_movie = bookings[['showtime_id', 'status']].merge(
+        showtimes[['showtime_id', 'movie_id']], on='showtime_id', how='inner'
+    )
+    per_movie['cancelled'] = per_movie['status'] == 'cancelled'
+    cancellations = per_movie.groupby('movie_id', observed=True)['cancelled'].agg(['sum', 'count'])
+    cancellations['cancellation_rate'] = cancellations['sum'] / cancellations['count']
+
+    return {
+        'revenue_trend': revenue_trend,
+        'by_movie': occupancy('movie_id'),
+        'by_screen': occupancy('screen_id'),
+        'by_hour': occupancy('hour'),
+        'fill_heatmap': heatmap,
+        'cancellations': cancellations.reset_index(),
+        'total_revenue': float(shows['revenue'].sum()),
+        'overall_fill_rate': float(shows['sold'].sum() / max(int(shows['capacity'].sum()), 1)),
+    }
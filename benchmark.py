@@ -0,0 +1,433 @@
+"""
+Booking Hot Path Benchmark
+Filename: benchmark.py
+Run with: python benchmark.py [--sqlite FILE | --mysql-database NAME] [--users 20] [--iterations 50]
+
+Seeds a scratch database, then drives get_movies, get_showtimes,
+get_booked_seats and reserve_seats (the engine behind book_tickets) from N
+concurrent simulated users through the app's own connection pool. Reports
+throughput, latency percentiles, double bookings and pool usage, writes
+them as JSON and can fail when a run regresses against a saved baseline.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+import pymysql
+
+import db_utils
+import migrations
+from db_pool import ConnectionPool, ReplicaRouter
+from seat_inventory import DEFAULT_LAYOUT
+
+OPERATIONS = ('get_movies', 'get_showtimes', 'get_booked_seats', 'book_tickets')
+
+
+class SQLiteCursor:
+    """A pymysql cursor on SQLite.
+
+    Rows are dicts or tuples following the cursor class. Like pymysql, plain
+    cursors read the whole result on execute() and report its size in
+    rowcount, while the SS classes step through it as rows are fetched.
+    """
+
+    def __init__(self, conn, as_dict=True, buffered=True):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        self._as_dict = as_dict
+        self._buffered = buffered
+        self._rows = None
+        self._pos = 0
+        self.arraysize = 1
+        self.rowcount = -1
+        self.lastrowid = None
+
+    @property
+    def connection(self):
+        return self._conn
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def _run(self, method, sql, params):
+        self._conn.begin(locking=bool(re.search(r'\bFOR UPDATE\b|^\s*(INSERT|UPDATE|DELETE)', sql)))
+        try:
+            getattr(self._cursor, method)(migrations.to_sqlite(sql), params)
+        except sqlite3.OperationalError as e:
+            # Surface lock contention the way MySQL would, so booking retries kick in
+            if 'locked' in str(e) or 'busy' in str(e):
+                raise pymysql.err.OperationalError(1205, str(e)) from e
+            raise
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid
+        if method == 'execute' and self.rowcount > 1 and re.match(r'\s*INSERT\b', sql):
+            # MySQL reports the first id of a multi-row INSERT, SQLite the last
+            self.lastrowid -= self.rowcount - 1
+        self._rows, self._pos = None, 0
+        if self._buffered and self._cursor.description:
+            self._rows = self._cursor.fetchall()
+            self.rowcount = len(self._rows)
+        return self.rowcount
+
+    def execute(self, sql, params=None):
+        return self._run('execute', sql, tuple(params or ()))
+
+    def executemany(self, sql, rows):
+        return self._run('executemany', sql, [tuple(row) for row in rows])
+
+    def _fetch(self, size=None):
+        if self._rows is None:
+            rows = self._cursor.fetchall() if size is None else self._cursor.fetchmany(size)
+        else:
+            end = len(self._rows) if size is None else self._pos + size
+            rows, self._pos = self._rows[self._pos:end], min(end, len(self._rows))
+        return [dict(row) if self._as_dict else tuple(row) for row in rows]
+
+    def fetchone(self):
+        rows = self._fetch(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        return self._fetch(size or self.arraysize)
+
+    def fetchall(self):
+        return self._fetch()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """SQLite stand-in for a pymysql connection.
+
+    SQLite has no row locks, so a transaction that reads with FOR UPDATE or
+    writes takes the database write lock up front (BEGIN IMMEDIATE). That
+    serialises bookings the way the showtime row lock does on MySQL.
+    """
+
+    def __init__(self, path, cursorclass=pymysql.cursors.DictCursor, **_):
+        self.raw = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.raw.row_factory = sqlite3.Row
+        self.raw.execute("PRAGMA journal_mode=WAL")
+        self.cursorclass = cursorclass
+        self._in_transaction = False
+
+    def begin(self, locking=False):
+        if not self._in_transaction:
+            self.raw.execute("BEGIN IMMEDIATE" if locking else "BEGIN")
+            self._in_transaction = True
+
+    def cursor(self, cursorclass=None):
+        cursorclass = cursorclass or self.cursorclass
+        return SQLiteCursor(self, as_dict=issubclass(cursorclass, pymysql.cursors.DictCursorMixin),
+                            buffered=not issubclass(cursorclass, pymysql.cursors.SSCursor))
+
+    def commit(self):
+        if self._in_transaction:
+            self._in_transaction = False
+            self.raw.execute("COMMIT")
+
+    def rollback(self):
+        if self._in_transaction:
+            self._in_transaction = False
+            self.raw.execute("ROLLBACK")
+
+    def ping(self, reconnect=False):
+        self.raw.execute("SELECT 1")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.raw.close()
+
+
+def seed(db, movies, showtimes_per_movie, users):
+    """Fill a freshly migrated database with a small, fixed catalogue"""
+    db.conn.cursor().executemany(
+        db.translate("INSERT INTO Users (username, password_hash, email) VALUES (%s, %s, %s)"),
+        [(f"bench{i}", "x", f"bench{i}@example.com") for i in range(users)]
+    )
+    db.conn.cursor().executemany(
+        db.translate("INSERT INTO Movies (title, genre, language, duration, rating, release_year, description, poster_url) "
+                     "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"),
+        [(f"Movie {i}", "Drama", "English", 120, 7.5, 2024, "", "") for i in range(movies)]
+    )
+    first_day = date.today() + timedelta(days=1)
+    db.conn.cursor().executemany(
+        db.translate("INSERT INTO Showtimes (movie_id, show_date, show_time, available_seats) VALUES (%s, %s, %s, %s)"),
+        [(movie_id, (first_day + timedelta(days=n // 4)).isoformat(), f"{10 + 3 * (n % 4)}:00:00", DEFAULT_LAYOUT.size)
+         for movie_id in range(1, movies + 1) for n in range(showtimes_per_movie)]
+    )
+    db.conn.cursor().executemany(
+        db.translate("INSERT INTO SeatInventory (showtime_id, seat_bitmap) VALUES (%s, %s)"),
+        [(showtime_id, DEFAULT_LAYOUT.empty_bitmap())
+         for showtime_id in range(1, movies * showtimes_per_movie + 1)]
+    )
+    db.commit()
+
+
+def pick_seats(rng, layout, booked, count):
+    """Adjacent free seats in one row when possible, like a real customer"""
+    rows = list(layout.rows)
+    rng.shuffle(rows)
+    for _, cells in rows:
+        seats = [cell for cell in cells if cell is not None]
+        start = rng.randrange(len(seats))
+        for offset in range(len(seats)):
+            block = seats[(start + offset) % len(seats):][:count]
+            if len(block) == count and not booked.intersection(block):
+                return block
+    free = [label for label in layout.labels if label not in booked]
+    return rng.sample(free, min(count, len(free)))
+
+
+def simulate_user(user_id, iterations, rng, think, latencies, outcomes, lock):
+    def timed(name, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception:
+            with lock:
+                outcomes['errors'][name] += 1
+            return None
+        finally:
+            with lock:
+                latencies[name].append(time.perf_counter() - started)
+
+    for _ in range(iterations):
+        movies = timed('get_movies', db_utils.get_movies)
+        if not movies:
+            continue
+        # Blockbuster skew: the first few titles draw most of the traffic
+        movie = rng.choices(movies, weights=[1 / (rank + 1) for rank in range(len(movies))])[0]
+        showtimes = timed('get_showtimes', db_utils.get_showtimes, movie['movie_id'])
+        if not showtimes:
+            continue
+        showtime = rng.choice(showtimes[:4])
+        booked = timed('get_booked_seats', db_utils.get_booked_seats, showtime['showtime_id'], DEFAULT_LAYOUT)
+        if booked is None:
+            continue
+        seats = pick_seats(rng, DEFAULT_LAYOUT, booked, rng.randint(1, 4))
+        if not seats:
+            continue
+        result = timed('book_tickets', db_utils.reserve_seats, user_id, showtime['showtime_id'], seats)
+        with lock:
+            if result is None:
+                pass
+            elif result['success']:
+                outcomes['booked'] += 1
+                outcomes['seats'] += len(seats)
+            elif result['lost_seats']:
+                outcomes['conflicts'] += 1
+            else:
+                outcomes['errors']['book_tickets'] += 1
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+
+
+def check_integrity(conn):
+    """Count seats sold twice and inventory rows that disagree with Bookings"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT showtime_id, seat_numbers FROM Bookings")
+        sold = {}
+        double_booked = 0
+        for row in cursor.fetchall():
+            seats = sold.setdefault(row['showtime_id'], set())
+            for seat in row['seat_numbers'].split(','):
+                if seat in seats:
+                    double_booked += 1
+                seats.add(seat)
+        cursor.execute("SELECT s.showtime_id, s.available_seats, i.seat_bitmap FROM Showtimes s "
+                       "JOIN SeatInventory i ON i.showtime_id = s.showtime_id")
+        mismatches = 0
+        for row in cursor.fetchall():
+            inventory = DEFAULT_LAYOUT.to_labels(DEFAULT_LAYOUT.decode(row['seat_bitmap']))
+            seats = sold.get(row['showtime_id'], set())
+            if inventory != seats or row['available_seats'] != DEFAULT_LAYOUT.size - len(seats):
+                mismatches += 1
+        return {'double_booked': double_booked, 'inventory_mismatches': mismatches}
+    finally:
+        cursor.close()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run(pool, users, iterations, seed_value, think):
+    """Drive the workload through ``pool`` and return the results dict"""
+    # Route every db_utils query through the benchmark's pool
+    router = ReplicaRouter(pool, [])
+    db_utils.get_pool = lambda: pool
+    db_utils.get_router = lambda: router
+
+    latencies = {name: [] for name in OPERATIONS}
+    outcomes = {'booked': 0, 'seats': 0, 'conflicts': 0, 'errors': {name: 0 for name in OPERATIONS}}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=simulate_user,
+                         args=(user_id, iterations, random.Random(seed_value * 10007 + user_id), think,
+                               latencies, outcomes, lock))
+        for user_id in range(1, users + 1)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    conn = pool.connection()
+    try:
+        integrity = check_integrity(conn)
+    finally:
+        conn.close()
+
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'operations': {
+            name: {
+                'count': len(samples),
+                'errors': outcomes['errors'][name],
+                'throughput_per_s': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+                'p50_ms': round(percentile(samples, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(samples, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(samples, 0.99) * 1000, 2),
+            }
+            for name, samples in latencies.items()
+        },
+        'bookings': {
+            'succeeded': outcomes['booked'],
+            'seats': outcomes['seats'],
+            'conflicts': outcomes['conflicts'],
+            'seats_per_s': round(outcomes['seats'] / elapsed, 1) if elapsed else 0.0,
+            **integrity,
+        },
+        'pool': pool.stats(),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Human-readable list of everything that got worse than ``baseline`` by more than ``tolerance``"""
+    problems = []
+    if results['bookings']['double_booked'] or results['bookings']['inventory_mismatches']:
+        problems.append("seat inventory is inconsistent with Bookings")
+    for name, current in results['operations'].items():
+        previous = baseline.get('operations', {}).get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            problems.append(f"{name} p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current['throughput_per_s'] < previous['throughput_per_s'] * (1 - tolerance):
+            problems.append(f"{name} throughput {previous['throughput_per_s']}/s -> {current['throughput_per_s']}/s")
+    return problems
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the booking hot path")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--sqlite', default='benchmark.db', help="SQLite stand-in file, recreated each run (default)")
+    target.add_argument('--mysql-database', help="Scratch MySQL database on the DB_CONFIG server, dropped and recreated")
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=50, help="Booking attempts per user")
+    parser.add_argument('--movies', type=int, default=20)
+    parser.add_argument('--showtimes', type=int, default=8, help="Showtimes per movie")
+    parser.add_argument('--pool-size', type=int, default=db_utils.POOL_CONFIG['max_size'])
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Mean pause between a user's bookings")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help="Results JSON of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed fractional slowdown before failing")
+    args = parser.parse_args(argv)
+
+    pool_config = dict(db_utils.POOL_CONFIG, max_size=args.pool_size)
+    if args.mysql_database:
+        admin = pymysql.connect(**{k: v for k, v in db_utils.DB_CONFIG.items() if k != 'database'})
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{args.mysql_database}`")
+            cursor.execute(f"CREATE DATABASE `{args.mysql_database}`")
+        admin.close()
+        db_config = dict(db_utils.DB_CONFIG, database=args.mysql_database)
+        db = migrations.Database(db_config=db_config)
+        pool = ConnectionPool(db_config, **pool_config)
+        backend = 'mysql'
+    else:
+        if os.path.exists(args.sqlite):
+            os.remove(args.sqlite)
+        db = migrations.Database(sqlite_path=args.sqlite)
+        pool = ConnectionPool({'path': args.sqlite}, connect=SQLiteConnection, **pool_config)
+        backend = 'sqlite'
+    try:
+        migrations.migrate(db)
+        seed(db, args.movies, args.showtimes, args.users)
+    finally:
+        db.close()
+
+    results = run(pool, args.users, args.iterations, args.seed, args.think_ms / 1000)
+    results['config'] = {
+        'backend': backend, 'users': args.users, 'iterations': args.iterations, 'movies': args.movies,
+        'showtimes_per_movie': args.showtimes, 'pool_size': args.pool_size, 'think_ms': args.think_ms,
+        'seed': args.seed, 'revision': _git_revision(), 'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+
+    for name, stats in results['operations'].items():
+        print(f"{name:18} {stats['throughput_per_s']:>9}/s  p50 {stats['p50_ms']:>8} ms  "
+              f"p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  errors {stats['errors']}")
+    bookings = results['bookings']
+    print(f"bookings: {bookings['succeeded']} ({bookings['seats']} seats, {bookings['seats_per_s']} seats/s), "
+          f"conflicts {bookings['conflicts']}, double-booked {bookings['double_booked']}")
+    print(f"pool: {results['pool']['created']} connections opened, {results['pool']['waited_borrows']} waits, "
+          f"max wait {results['pool']['max_wait_ms']:.1f} ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = regressions(results, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            return 1
+    elif bookings['double_booked'] or bookings['inventory_mismatches']:
+        print("Seat inventory is inconsistent with Bookings")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
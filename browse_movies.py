@@ -1,62 +1,128 @@
-"""
-Browse Movies Page
-Filename: browse_movies.py
-"""
-
-import streamlit as st
-from db_utils import get_movies
-
-def show_browse_movies():
-    """Display browse movies page"""
-    st.title("Now Showing")
-    movies = get_movies()
-
-    if movies:
-        # Filter buttons
-        col1, col2, col3 = st.columns([1, 1, 3])
-        with col1:
-            lang_filter = st.selectbox("Language", ["All", "Hindi", "English"])
-        with col2:
-            genre_filter = st.selectbox("Genre", ["All"] + list(set([m['genre'] for m in movies])))
-
-        # Filter movies
-        filtered_movies = movies
-        if lang_filter != "All":
-            filtered_movies = [m for m in filtered_movies if m['language'] == lang_filter]
-        if genre_filter != "All":
-            filtered_movies = [m for m in filtered_movies if m['genre'] == genre_filter]
-
-        st.markdown("---")
-
-        # Display movies in grid - 3 columns
-        cols = st.columns(3)
-        for idx, movie in enumerate(filtered_movies):
-            with cols[idx % 3]:
-                st.markdown(f"""
-                <div style='background: #ffffff; 
-                            border-radius: 16px; padding: 0; overflow: hidden; 
-                            border: 2px solid #e2e8f0; transition: all 0.3s ease;
-                            cursor: pointer; margin-bottom: 24px;
-                            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.05);'>
-                    <img src='{movie['poster_url']}' 
-                         style='width: 100%; height: 400px; object-fit: cover;'/>
-                    <div style='padding: 20px;'>
-                        <h3 style='color: #1e293b; font-size: 20px; margin: 0 0 8px 0; font-weight: 700;'>{movie['title']}</h3>
-                        <p style='color: #64748b; font-size: 14px; margin: 0 0 12px 0; font-weight: 600;'>{movie['genre']} • {movie['duration']} min</p>
-                        <div style='display: flex; justify-content: space-between; align-items: center;'>
-                            <span style='color: #f59e0b; font-weight: 700; font-size: 18px;'>⭐ {movie['rating']}</span>
-                            <span style='background: linear-gradient(135deg, #667eea, #764ba2); 
-                                         color: #ffffff; padding: 6px 14px; border-radius: 20px; 
-                                         font-size: 12px; font-weight: 700; letter-spacing: 0.5px;'>{movie['language']}</span>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-
-                # Book Now button
-                if st.button("Book Now", key=f"book_{movie['movie_id']}", use_container_width=True):
-                    st.session_state.selected_movie = movie['movie_id']
-                    st.session_state.current_menu = "Book Tickets"
-                    st.rerun()
-    else:
-        st.info("No movies available.")
\ No newline at end of file
+"""
+Browse Movies Page
+Filename: browse_movies.py
+"""
+
+from functools import lru_cache
+from html import escape
+
+import streamlit as st
+from db_utils import search_movies, get_movie_facets, poster_src, SEARCH_PAGE_SIZE
+from profiler import profiled
+
+SORT_LABELS = {"Newest": 'newest', "Top Rated": 'rating', "Title": 'title', "Best Match": 'relevance'}
+
+def _reset_page():
+    st.session_state.browse_page = 0
+
+def _set_page(page):
+    st.session_state.browse_page = page
+
+@lru_cache(maxsize=2048)
+def _card_html(movie_id, title, genre, duration, rating, language, poster_url):
+    """Card markup, keyed on the fields it shows so an edited movie gets a fresh card"""
+    title, genre, language, poster_url = (escape(str(v)) for v in (title, genre, language, poster_url))
+    return f"""
+    <div style='background: #ffffff; 
+                border-radius: 16px; padding: 0; overflow: hidden; 
+                border: 2px solid #e2e8f0; transition: all 0.3s ease;
+                cursor: pointer; margin-bottom: 24px;
+                box-shadow: 0 4px 12px rgba(0, 0, 0, 0.05);'>
+        <img src='{poster_url}' 
+             style='width: 100%; height: 400px; object-fit: cover;'/>
+        <div style='padding: 20px;'>
+            <h3 style='color: #1e293b; font-size: 20px; margin: 0 0 8px 0; font-weight: 700;'>{title}</h3>
+            <p style='color: #64748b; font-size: 14px; margin: 0 0 12px 0; font-weight: 600;'>{genre} • {duration} min</p>
+            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                <span style='color: #f59e0b; font-weight: 700; font-size: 18px;'>⭐ {rating}</span>
+                <span style='background: linear-gradient(135deg, #667eea, #764ba2); 
+                             color: #ffffff; padding: 6px 14px; border-radius: 20px; 
+                             font-size: 12px; font-weight: 700; letter-spacing: 0.5px;'>{language}</span>
+            </div>
+        </div>
+    </div>
+    """
+
+def card_html(movie):
+    return _card_html(movie['movie_id'], movie['title'], movie['genre'], movie['duration'],
+                      movie['rating'], movie['language'], poster_src(movie))
+
+@profiled('show_browse_movies')
+def show_browse_movies():
+    """Display browse movies page"""
+    st.title("Now Showing")
+    facets = get_movie_facets()
+    years = sorted(year for year, _ in facets['release_year'])
+
+    # Filters; any change goes back to the first page
+    search = st.text_input("Search", placeholder="Search titles and descriptions", on_change=_reset_page)
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        lang_filter = st.selectbox("Language", ["All"] + [v for v, _ in facets['language']], on_change=_reset_page)
+    with col2:
+        genre_filter = st.selectbox("Genre", ["All"] + [v for v, _ in facets['genre']], on_change=_reset_page)
+    with col3:
+        sort_label = st.selectbox("Sort by", list(SORT_LABELS), on_change=_reset_page)
+    col1, col2 = st.columns(2)
+    with col1:
+        min_rating, max_rating = st.slider("Rating", 0.0, 10.0, (0.0, 10.0), step=0.5, on_change=_reset_page)
+    with col2:
+        if len(years) > 1:
+            year_from, year_to = st.slider("Release year", years[0], years[-1], (years[0], years[-1]),
+                                           on_change=_reset_page)
+        else:
+            year_from = year_to = None
+
+    show_movie_grid(dict(
+        text=search,
+        genre=None if genre_filter == "All" else genre_filter,
+        language=None if lang_filter == "All" else lang_filter,
+        min_rating=min_rating if min_rating > 0 else None,
+        max_rating=max_rating if max_rating < 10 else None,
+        year_from=year_from if years and year_from != years[0] else None,
+        year_to=year_to if years and year_to != years[-1] else None,
+        sort=SORT_LABELS[sort_label]
+    ))
+
+@st.fragment
+@profiled('show_movie_grid')
+def show_movie_grid(filters):
+    """One page of result cards; paging reruns only this fragment, not the filters"""
+    page = st.session_state.get('browse_page', 0)
+    movies, total = search_movies(offset=page * SEARCH_PAGE_SIZE, **filters)
+    if not movies and page > 0:
+        # The catalogue shrank under us; start again from the first page
+        page = st.session_state.browse_page = 0
+        movies, total = search_movies(**filters)
+
+    if not movies:
+        if any(value for key, value in filters.items() if key != 'sort'):
+            st.info("No movies match these filters.")
+        else:
+            st.info("No movies available.")
+        return
+
+    st.markdown("---")
+
+    # Display movies in grid - 3 columns
+    cols = st.columns(3)
+    for idx, movie in enumerate(movies):
+        with cols[idx % 3]:
+            st.markdown(card_html(movie), unsafe_allow_html=True)
+
+            # Book Now button
+            if st.button("Book Now", key=f"book_{movie['movie_id']}", use_container_width=True):
+                st.session_state.selected_movie = movie['movie_id']
+                st.session_state.current_menu = "Book Tickets"
+                st.rerun()
+
+    # Page controls
+    pages = (total + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+    if pages > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        col1.button("← Previous", disabled=page == 0, use_container_width=True,
+                    on_click=_set_page, args=(page - 1,))
+        col2.markdown(f"<p style='text-align: center; color: #64748b;'>Page {page + 1} of {pages} · {total} movies</p>",
+                      unsafe_allow_html=True)
+        col3.button("Next →", disabled=page + 1 >= pages, use_container_width=True,
+                    on_click=_set_page, args=(page + 1,))
@@ -0,0 +1,166 @@
+"""
+Process-wide Caches
+Filename: cache.py
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after ``ttl`` seconds.
+
+    Concurrent misses on the same key are collapsed into a single load.
+    Expired entries are swept on insert and, with ``max_entries`` set, the
+    oldest entries are evicted to stay within it. A load that overlaps an
+    invalidate() is returned to its caller but not cached.
+    """
+
+    def __init__(self, ttl, max_entries=None, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._load_locks = {}   # key -> [lock, threads using it], dropped once the last one is done
+        self._entries = OrderedDict()   # key -> (expires_at, value), oldest first
+        self._generation = 0   # bumped by invalidate()
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[0] > self._clock():
+            return True, entry[1]
+        return False, None
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss.
+
+        A loader result of ``None`` means "could not load" and is not cached.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            generation = self._generation
+            load_lock = self._load_locks.setdefault(key, [threading.Lock(), 0])
+            load_lock[1] += 1
+
+        try:
+            with load_lock[0]:
+                # Another thread may have filled the entry while we waited
+                with self._lock:
+                    found, value = self._lookup(key)
+                if found:
+                    return value
+                value = loader()
+                if value is not None:
+                    with self._lock:
+                        if self._generation == generation:
+                            self._store(key, value)
+                return value
+        finally:
+            with self._lock:
+                load_lock[1] -= 1
+                if not load_lock[1]:
+                    del self._load_locks[key]
+
+    def _store(self, key, value):
+        now = self._clock()
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl, value)
+        # Every entry lives for the same ttl, so the expired ones are at the front
+        while self._entries:
+            oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and (self.max_entries is None or len(self._entries) <= self.max_entries):
+                break
+            del self._entries[oldest_key]
+            if expires_at > now:
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when ``key`` is None.
+
+        Loads already in flight are not cached, since they may have read the
+        data being invalidated.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+class VersionedCache:
+    """Cache whose entries are tied to a per-key version counter.
+
+    Writers call bump(key) after committing a change; the next read of that key
+    reloads, through ``fresh_loader`` when one is given so it can bypass lagging
+    replicas. ``max_age`` bounds staleness for changes made by other processes.
+    """
+
+    def __init__(self, max_age=60, clock=time.monotonic):
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._bumped = set()   # keys changed here and not yet reloaded fresh
+        self._entries = {}   # key -> (version, loaded_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, key):
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def bump(self, key):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._bumped.add(key)
+            self._entries.pop(key, None)
+
+    def get_or_load(self, key, loader, fresh_loader=None):
+        with self._lock:
+            version = self._versions.get(key, 0)
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and self._clock() - entry[1] < self.max_age:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            fresh = fresh_loader is not None and key in self._bumped
+
+        value = fresh_loader() if fresh else loader()
+        if value is not None:
+            with self._lock:
+                # Only store if nobody bumped the key while we were loading
+                if self._versions.get(key, 0) == version:
+                    self._entries[key] = (version, self._clock(), value)
+                    if fresh:
+                        self._bumped.discard(key)
+        return value
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,317 @@
+"""
+Database Connection Pool
+Filename: db_pool.py
+"""
+
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+from query_metrics import InstrumentedCursor, current_query
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be borrowed within the wait timeout"""
+
+
+class _PoolEntry:
+    """A raw pymysql connection plus the bookkeeping the pool needs"""
+
+    def __init__(self, raw, overflow):
+        now = time.monotonic()
+        self.raw = raw
+        self.overflow = overflow
+        self.created_at = now
+        self.last_used = now
+
+
+class PooledConnection:
+    """Borrowed connection. close() hands it back to the pool instead of closing it."""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise pymysql.err.InterfaceError("Connection already returned to pool")
+        return getattr(self._entry.raw, name)
+
+    def cursor(self, *args, **kwargs):
+        if self._entry is None:
+            raise pymysql.err.InterfaceError("Connection already returned to pool")
+        cursor = self._entry.raw.cursor(*args, **kwargs)
+        metrics = self._pool.metrics
+        return InstrumentedCursor(cursor, metrics) if metrics else cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool._release(entry)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of pymysql connections.
+
+    Up to ``max_size`` connections are kept warm; ``max_overflow`` extra
+    connections may be opened under bursts and are closed again when returned.
+    Idle connections are discarded after ``max_idle`` seconds, every connection
+    is recycled after ``max_lifetime`` seconds, and a connection that has been
+    idle for longer than ``ping_interval`` is pinged before it is handed out.
+    ``connect`` opens a raw connection from ``db_config``. With ``metrics`` (a
+    QueryMetrics) set, borrow times and every statement run on the pool's
+    cursors are recorded.
+    """
+
+    def __init__(self, db_config, max_size=10, max_overflow=5, timeout=10.0,
+                 max_idle=300.0, max_lifetime=3600.0, ping_interval=5.0, connect=pymysql.connect, metrics=None):
+        self.db_config = dict(db_config)
+        self._connect = connect
+        self.metrics = metrics
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._overflow_open = 0
+        self._in_use = 0
+
+        self._borrows = 0
+        self._created = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connection(self):
+        """Borrow a healthy connection, waiting up to ``timeout`` seconds"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+
+        while True:
+            entry = None
+            create_overflow = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._open < self.max_size:
+                        create_overflow = False
+                        break
+                    if self._overflow_open < self.max_overflow:
+                        create_overflow = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout:.1f}s "
+                            f"({self._in_use} in use)"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+                # Reserve the slot before doing any I/O outside the lock
+                self._in_use += 1
+                if create_overflow is not None:
+                    self._open += 1
+                    if create_overflow:
+                        self._overflow_open += 1
+
+            if entry is None:
+                try:
+                    entry = _PoolEntry(self._connect(**self.db_config), create_overflow)
+                except Exception:
+                    self._forget(create_overflow)
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif not self._is_healthy(entry):
+                self._discard(entry)
+                continue
+
+            wait = time.monotonic() - started
+            self._record_borrow(wait, waited)
+            if self.metrics:
+                self.metrics.observe_acquire(current_query(), wait)
+            return PooledConnection(self, entry)
+
+    def _is_healthy(self, entry):
+        now = time.monotonic()
+        if now - entry.created_at > self.max_lifetime:
+            return False
+        idle_for = now - entry.last_used
+        if idle_for > self.max_idle:
+            return False
+        if idle_for > self.ping_interval:
+            try:
+                entry.raw.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def _release(self, entry):
+        try:
+            # Ends any open transaction so the next borrower gets a fresh snapshot
+            entry.raw.rollback()
+        except Exception:
+            self._discard(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            keep = (
+                not entry.overflow
+                and entry.last_used - entry.created_at <= self.max_lifetime
+            )
+            if keep:
+                self._in_use -= 1
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+        self._discard(entry)
+
+    def _discard(self, entry):
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._discarded += 1
+        self._forget(entry.overflow)
+
+    def _forget(self, overflow):
+        with self._cond:
+            self._in_use -= 1
+            self._open -= 1
+            if overflow:
+                self._overflow_open -= 1
+            self._cond.notify()
+
+    def _record_borrow(self, wait, waited):
+        with self._cond:
+            self._borrows += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            if waited:
+                self._waits += 1
+
+    def stats(self):
+        """Snapshot of pool size and borrow-wait metrics"""
+        with self._cond:
+            return {
+                'open': self._open,
+                'overflow_open': self._overflow_open,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'borrows': self._borrows,
+                'created': self._created,
+                'discarded': self._discarded,
+                'timeouts': self._timeouts,
+                'waited_borrows': self._waits,
+                'avg_wait_ms': (self._wait_total / self._borrows * 1000) if self._borrows else 0.0,
+                'max_wait_ms': self._wait_max * 1000,
+            }
+
+    def close_idle(self):
+        """Close every idle connection (e.g. on shutdown)"""
+        with self._cond:
+            entries = list(self._idle)
+            self._idle.clear()
+            self._in_use += len(entries)
+        for entry in entries:
+            self._discard(entry)
+
+
+class ReplicaRouter:
+    """Sends reads to replica pools, skipping replicas that lag too far behind.
+
+    Lag is read from SHOW REPLICA STATUS at most once per ``check_interval``
+    seconds per replica. With no healthy replica, reads go to the primary.
+    """
+
+    def __init__(self, primary, replicas, max_lag=5.0, check_interval=5.0):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next = 0
+        self._health = {}   # id(pool) -> (checked_at, healthy, lag)
+        self.fallbacks = 0
+
+    def _replica_lag(self, pool):
+        conn = pool.connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except pymysql.err.ProgrammingError:
+                    # MySQL < 8.0.22 / MariaDB
+                    cursor.execute("SHOW SLAVE STATUS")
+                row = cursor.fetchone()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+        return None if lag is None else float(lag)
+
+    def _is_healthy(self, pool):
+        now = time.monotonic()
+        with self._lock:
+            checked = self._health.get(id(pool))
+        if checked and now - checked[0] < self.check_interval:
+            return checked[1]
+        try:
+            lag = self._replica_lag(pool)
+        except Exception:
+            lag = None
+        healthy = lag is not None and lag <= self.max_lag
+        with self._lock:
+            self._health[id(pool)] = (now, healthy, lag)
+        return healthy
+
+    def mark_unhealthy(self, pool):
+        with self._lock:
+            self._health[id(pool)] = (time.monotonic(), False, None)
+
+    def read_pool(self):
+        """Next healthy replica pool in round-robin order, else the primary"""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                pool = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+            if self._is_healthy(pool):
+                return pool
+        if self.replicas:
+            with self._lock:
+                self.fallbacks += 1
+        return self.primary
+
+    def stats(self):
+        with self._lock:
+            return {
+                'replicas': len(self.replicas),
+                'fallbacks': self.fallbacks,
+                'lag': [self._health.get(id(p), (0, None, None))[2] for p in self.replicas],
+            }
@@ -1,169 +1,879 @@
-"""
-Database Utility Functions
-Filename: db_utils.py
-"""
-
-import streamlit as st
-import pymysql
-import hashlib
-from datetime import datetime
-
-# Database Configuration
-DB_CONFIG = {
-    'host': '127.0.0.1',
-    'user': 'root',
-    'password': 'root',
-    'database': 'movie_booking',
-    'charset': 'utf8mb4',
-    'cursorclass': pymysql.cursors.DictCursor
-}
-
-def get_db_connection():
-    try:
-        conn = pymysql.connect(**DB_CONFIG)
-        return conn
-    except Exception as e:
-        st.error(f"Database connection error: {e}")
-        return None
-
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def register_user(username, password, email):
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            hashed_pw = hash_password(password)
-            cursor.execute(
-                "INSERT INTO Users (username, password_hash, email) VALUES (%s, %s, %s)",
-                (username, hashed_pw, email)
-            )
-            conn.commit()
-            return True
-        except Exception as e:
-            st.error(f"Registration failed: {e}")
-            return False
-        finally:
-            cursor.close()
-            conn.close()
-    return False
-
-def login_user(username, password):
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            hashed_pw = hash_password(password)
-            cursor.execute(
-                "SELECT * FROM Users WHERE username = %s AND password_hash = %s",
-                (username, hashed_pw)
-            )
-            user = cursor.fetchone()
-            return user
-        finally:
-            cursor.close()
-            conn.close()
-    return None
-
-def get_movies():
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM Movies ORDER BY release_year DESC, rating DESC")
-            return cursor.fetchall()
-        finally:
-            cursor.close()
-            conn.close()
-    return []
-
-def get_showtimes(movie_id):
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT * FROM Showtimes WHERE movie_id = %s AND available_seats > 0 ORDER BY show_date, show_time",
-                (movie_id,)
-            )
-            return cursor.fetchall()
-        finally:
-            cursor.close()
-            conn.close()
-    return []
-
-def get_booked_seats(showtime_id):
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT seat_numbers FROM Bookings WHERE showtime_id = %s",
-                (showtime_id,)
-            )
-            results = cursor.fetchall()
-            booked_seats = []
-            for row in results:
-                if row['seat_numbers']:
-                    booked_seats.extend(row['seat_numbers'].split(','))
-            return booked_seats
-        finally:
-            cursor.close()
-            conn.close()
-    return []
-
-def book_tickets(user_id, showtime_id, selected_seats):
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            num_tickets = len(selected_seats)
-            seat_numbers = ','.join(selected_seats)
-
-            cursor.execute(
-                "SELECT available_seats FROM Showtimes WHERE showtime_id = %s",
-                (showtime_id,)
-            )
-            result = cursor.fetchone()
-            if result and result['available_seats'] >= num_tickets:
-                cursor.execute(
-                    "INSERT INTO Bookings (user_id, showtime_id, tickets_booked, booking_date, seat_numbers) VALUES (%s, %s, %s, %s, %s)",
-                    (user_id, showtime_id, num_tickets, datetime.now(), seat_numbers)
-                )
-                cursor.execute(
-                    "UPDATE Showtimes SET available_seats = available_seats - %s WHERE showtime_id = %s",
-                    (num_tickets, showtime_id)
-                )
-                conn.commit()
-                return True
-            else:
-                st.error("Not enough seats available!")
-                return False
-        except Exception as e:
-            st.error(f"Booking failed: {e}")
-            return False
-        finally:
-            cursor.close()
-            conn.close()
-    return False
-
-def get_user_bookings(user_id):
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT b.booking_id, m.title, s.show_date, s.show_time, 
-                       b.tickets_booked, b.booking_date, b.seat_numbers
-                FROM Bookings b
-                JOIN Showtimes s ON b.showtime_id = s.showtime_id
-                JOIN Movies m ON s.movie_id = m.movie_id
-                WHERE b.user_id = %s
-                ORDER BY b.booking_date DESC
-            """, (user_id,))
-            return cursor.fetchall()
-        finally:
-            cursor.close()
-            conn.close()
-    return []
\ No newline at end of file
+"""
+Database Utility Functions
+Filename: db_utils.py
+"""
+
+import streamlit as st
+import pymysql
+import logging
+import os
+import random
+import secrets
+import time
+from datetime import datetime, date
+from db_pool import ConnectionPool, ReplicaRouter
+from seat_inventory import DEFAULT_LAYOUT, compile_layout
+from seat_holds import InMemoryHoldStore, MySQLHoldStore, HoldSweeper
+from cache import TTLCache, VersionedCache
+from passwords import PasswordWorkers, PasswordBusy, DUMMY_HASH
+from session_store import SessionManager, MemorySessionBackend, SQLiteSessionBackend, MySQLSessionBackend
+from rollups import record_booking, record_bookings, record_registration, RollupReconciler
+from analytics import load_sales_frames, prepare_frames, build_report
+import movie_search
+from poster_service import PosterCache, start_server, register_asset, source_version
+from query_metrics import QueryMetrics, named_query, start_metrics_server
+from theme import compile_stylesheet
+
+# Database Configuration
+DB_CONFIG = {
+    'host': '127.0.0.1',
+    'user': 'root',
+    'password': 'root',
+    'database': 'movie_booking',
+    'charset': 'utf8mb4',
+    'cursorclass': pymysql.cursors.DictCursor
+}
+
+# Connection pool settings (seconds for all time limits)
+POOL_CONFIG = {
+    'max_size': 10,
+    'max_overflow': 5,
+    'timeout': 10.0,
+    'max_idle': 300.0,
+    'max_lifetime': 3600.0,
+    'ping_interval': 5.0
+}
+
+# Read replicas as a comma-separated host list, e.g. "10.0.0.12,10.0.0.13"
+REPLICA_CONFIGS = [
+    dict(DB_CONFIG, host=host.strip())
+    for host in os.environ.get('CINEBOOK_DB_REPLICAS', '').split(',') if host.strip()
+]
+# Replicas further behind the primary than this (seconds) are skipped
+MAX_REPLICA_LAG = 5.0
+
+logger = logging.getLogger('cinebook.db')
+
+# Statements slower than this (seconds) are logged with their parameters redacted
+SLOW_QUERY_SECONDS = 0.2
+# Port of the Prometheus /metrics endpoint; 0 disables it
+METRICS_PORT = int(os.environ.get('CINEBOOK_METRICS_PORT', '0'))
+
+@st.cache_resource
+def get_query_metrics():
+    """Per-query latency, row and error metrics for every pooled connection"""
+    metrics = QueryMetrics(SLOW_QUERY_SECONDS)
+    if METRICS_PORT:
+        try:
+            start_metrics_server(metrics, port=METRICS_PORT)
+        except OSError as e:
+            # Another app process on this host owns the port; keep serving without the exporter
+            logger.warning("Metrics endpoint not started on port %s: %s", METRICS_PORT, e)
+    return metrics
+
+@st.cache_resource
+def get_pool():
+    """Process-wide connection pool shared by every session"""
+    metrics = get_query_metrics()
+    pool = ConnectionPool(DB_CONFIG, metrics=metrics, **POOL_CONFIG)
+    metrics.add_gauge('cinebook_pool_connections', "Primary pool connections by state.",
+                      lambda: {key: value for key, value in pool.stats().items() if key in ('open', 'in_use', 'idle')})
+    return pool
+
+@st.cache_resource
+def get_router():
+    """Routes read-only queries to replicas with acceptable lag"""
+    replicas = [ConnectionPool(config, metrics=get_query_metrics(), **POOL_CONFIG) for config in REPLICA_CONFIGS]
+    return ReplicaRouter(get_pool(), replicas, max_lag=MAX_REPLICA_LAG)
+
+def get_db_connection(read_only=False):
+    """Borrow a pooled connection; conn.close() returns it to the pool.
+
+    ``read_only=True`` may return a replica connection, so only use it for
+    queries that tolerate a few seconds of replication lag.
+    """
+    if read_only:
+        try:
+            router = get_router()
+            pool = router.read_pool()
+        except Exception as e:
+            # Fall back to the primary below, which reports the error if it fails too
+            logger.error("Replica routing error: %s", e)
+        else:
+            if pool is not router.primary:
+                try:
+                    return pool.connection()
+                except Exception:
+                    router.mark_unhealthy(pool)
+    try:
+        conn = get_pool().connection()
+        return conn
+    except Exception as e:
+        logger.error("Database connection error: %s", e)
+        st.error(f"Database connection error: {e}")
+        return None
+
+# 'mysql' shares holds across app processes; 'memory' keeps them in this process
+HOLD_BACKEND = 'mysql'
+
+@st.cache_resource
+def get_hold_store():
+    """Process-wide seat hold store with its expiry sweeper running"""
+    if HOLD_BACKEND == 'memory':
+        store = InMemoryHoldStore()
+    else:
+        store = MySQLHoldStore(get_db_connection)
+    HoldSweeper(store).start()
+    return store
+
+# 'memory' for a single worker; 'sqlite' or 'mysql' to share sessions between workers
+SESSION_BACKEND = 'memory'
+SESSION_DB_PATH = 'sessions.db'
+# Must be the same on every worker, otherwise tokens from one are rejected by another
+SESSION_SECRET = os.environ.get('CINEBOOK_SESSION_SECRET')
+
+@st.cache_resource
+def get_session_manager():
+    if SESSION_BACKEND != 'memory' and not SESSION_SECRET:
+        # A random per-process secret would log everyone out on each restart and on every other worker
+        raise RuntimeError(f"CINEBOOK_SESSION_SECRET must be set for the shared '{SESSION_BACKEND}' session backend")
+    if SESSION_BACKEND == 'sqlite':
+        backend = SQLiteSessionBackend(SESSION_DB_PATH)
+    elif SESSION_BACKEND == 'mysql':
+        backend = MySQLSessionBackend(get_db_connection)
+    else:
+        backend = MemorySessionBackend()
+    return SessionManager(backend, SESSION_SECRET or secrets.token_hex(32))
+
+# Seconds between full rollup reconciliations against Users/Bookings
+ROLLUP_RECONCILE_INTERVAL = 3600
+
+@st.cache_resource
+def get_rollup_reconciler():
+    """Background job that repairs drift in the dashboard rollups"""
+    reconciler = RollupReconciler(get_db_connection, ROLLUP_RECONCILE_INTERVAL)
+    reconciler.start()
+    return reconciler
+
+def start_background_jobs():
+    """Start the per-process hold sweeper and rollup reconciler; later calls are no-ops"""
+    get_hold_store()
+    get_rollup_reconciler()
+
+# Seconds the analytics extract and the report built from it are reused
+ANALYTICS_TTL = 900
+# Directory written by snapshot_export.py; when set, analytics never touch MySQL
+ANALYTICS_SNAPSHOT_DIR = os.environ.get('CINEBOOK_SNAPSHOT_DIR')
+
+@st.cache_resource(ttl=ANALYTICS_TTL)
+@named_query('sales_report')
+def get_sales_report():
+    """Sales aggregates shared by every admin session; frames are not copied per rerun"""
+    if ANALYTICS_SNAPSHOT_DIR:
+        from snapshot_export import load_snapshot
+        bookings, showtimes = load_snapshot(ANALYTICS_SNAPSHOT_DIR)
+        return build_report(*prepare_frames(bookings.to_pandas(), showtimes.to_pandas()))
+
+    try:
+        # Streamed over its own connection so the extract never ties up a pooled one
+        conn = pymysql.connect(**DB_CONFIG)
+    except pymysql.Error as e:
+        logger.error("Database connection error: %s", e)
+        st.error(f"Database connection error: {e}")
+        return None
+    try:
+        bookings, showtimes = load_sales_frames(conn)
+    finally:
+        conn.close()
+    return build_report(bookings, showtimes)
+
+# Processes that run password hashing off the Streamlit script threads
+PASSWORD_WORKERS = 2
+
+@st.cache_resource
+def get_password_workers():
+    return PasswordWorkers(workers=PASSWORD_WORKERS)
+
+def hash_password(password):
+    return get_password_workers().hash(password)
+
+@named_query('register_user')
+def register_user(username, password, email):
+    # Hash before borrowing a connection; it can wait on the password workers
+    try:
+        hashed_pw = hash_password(password)
+    except PasswordBusy as e:
+        st.error(str(e))
+        return False
+    conn = get_db_connection()
+    if conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO Users (username, password_hash, email) VALUES (%s, %s, %s)",
+                (username, hashed_pw, email)
+            )
+            record_registration(cursor)
+            conn.commit()
+            return True
+        except Exception as e:
+            st.error(f"Registration failed: {e}")
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+    return False
+
+def _find_user(username):
+    """User row by name, False when the database is unreachable"""
+    conn = get_db_connection()
+    if not conn:
+        return False
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT * FROM Users WHERE username = %s",
+            (username,)
+        )
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+def _upgrade_password_hash(user, new_hash):
+    conn = get_db_connection()
+    if not conn:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "UPDATE Users SET password_hash = %s WHERE user_id = %s AND password_hash = %s",
+            (new_hash, user['user_id'], user['password_hash'])
+        )
+        conn.commit()
+        user['password_hash'] = new_hash
+    finally:
+        cursor.close()
+        conn.close()
+
+@named_query('login_user')
+def login_user(username, password):
+    """Verify credentials; legacy SHA-256 hashes are upgraded on successful login.
+
+    The connection is only borrowed for the lookup and the upgrade, never
+    while a hash is computed.
+    """
+    user = _find_user(username)
+    if user is False:
+        return None
+    workers = get_password_workers()
+    try:
+        # Unknown usernames pay for a full verify too, so response time does not reveal them
+        ok, needs_rehash = workers.verify(password, user['password_hash'] if user else DUMMY_HASH)
+        if not ok or not user:
+            return None
+        if needs_rehash:
+            _upgrade_password_hash(user, workers.hash(password))
+        return user
+    except PasswordBusy as e:
+        st.error(str(e))
+        return None
+
+# Seconds the movie catalogue may be served from memory before it is re-read
+CATALOGUE_TTL = 300
+# Catalogue cache entries kept at most; search pages are keyed by their filters
+CATALOGUE_CACHE_ENTRIES = 2000
+
+@st.cache_resource
+def get_catalogue_cache():
+    return TTLCache(CATALOGUE_TTL, CATALOGUE_CACHE_ENTRIES)
+
+@named_query('get_movies')
+def _load_movies():
+    conn = get_db_connection(read_only=True)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT * FROM Movies ORDER BY release_year DESC, rating DESC")
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+    return None
+
+def get_movies():
+    """Movie catalogue, shared by all sessions through the catalogue cache"""
+    movies = get_catalogue_cache().get_or_load('movies', _load_movies)
+    return movies if movies is not None else []
+
+def invalidate_movies():
+    """Call after adding, editing or removing movies so every session re-reads them"""
+    refresh_movie_facets()
+    get_catalogue_cache().invalidate()
+
+# Local poster proxy; port 0 keeps hot-linking the original poster URLs
+POSTER_HOST = os.environ.get('CINEBOOK_POSTER_HOST', '127.0.0.1')
+POSTER_PORT = int(os.environ.get('CINEBOOK_POSTER_PORT', '0'))
+POSTER_PUBLIC_URL = os.environ.get('CINEBOOK_POSTER_URL', f'http://localhost:{POSTER_PORT}')
+POSTER_CACHE_DIR = os.environ.get('CINEBOOK_POSTER_CACHE', 'poster_cache')
+POSTER_CACHE_BYTES = 512 * 1024 * 1024
+# Directory of poster files to serve instead of downloading (tests and offline demos)
+POSTER_FIXTURES = os.environ.get('CINEBOOK_POSTER_FIXTURES')
+
+def _poster_source(movie_id):
+    movie = next((m for m in get_movies() if m['movie_id'] == movie_id), None)
+    return movie['poster_url'] if movie else None
+
+@st.cache_resource
+def get_poster_server():
+    """Poster proxy serving resized, cached posters and the theme stylesheet from a daemon thread.
+
+    Returns None when the port is already taken, usually by another app
+    worker's proxy; pages keep linking to it since it serves the same files.
+    """
+    posters = PosterCache(POSTER_CACHE_DIR, POSTER_CACHE_BYTES, POSTER_FIXTURES)
+    try:
+        server = start_server(posters, _poster_source, POSTER_HOST, POSTER_PORT)
+    except OSError as e:
+        logger.warning("Poster proxy not started on %s:%s, using the one already there: %s",
+                       POSTER_HOST, POSTER_PORT, e)
+        return None
+    sheet = get_stylesheet()
+    register_asset(server, sheet.filename, sheet.css.encode(), 'text/css; charset=utf-8')
+    return server
+
+def poster_src(movie, variant='thumb'):
+    """Image URL for a movie poster: the local proxy when enabled, else the original"""
+    if not POSTER_PORT or not movie.get('poster_url'):
+        return movie.get('poster_url')
+    get_poster_server()
+    return f"{POSTER_PUBLIC_URL}/poster/{movie['movie_id']}/{variant}?v={source_version(movie['poster_url'])}"
+
+@st.cache_resource
+def get_stylesheet():
+    """Theme CSS, minified and content-hashed once per process"""
+    return compile_stylesheet()
+
+def stylesheet_html():
+    """A <link> to the immutable theme stylesheet on the poster server, else the CSS inline"""
+    sheet = get_stylesheet()
+    if not POSTER_PORT:
+        return f"<style>{sheet.css}</style>"
+    get_poster_server()
+    return f'<link rel="stylesheet" href="{POSTER_PUBLIC_URL}/static/{sheet.filename}">'
+
+# Movies per page of search results
+SEARCH_PAGE_SIZE = 12
+
+@named_query('search_movies')
+def _search(limit, offset, filters):
+    conn = get_db_connection(read_only=True)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            return movie_search.search(cursor, limit=limit, offset=offset, **filters)
+        finally:
+            cursor.close()
+            conn.close()
+    return None
+
+def search_movies(text='', genre=None, language=None, min_rating=None, max_rating=None,
+                  year_from=None, year_to=None, sort='newest', limit=SEARCH_PAGE_SIZE, offset=0):
+    """One page of matching movies as (movies, total), filtered and sorted in SQL.
+
+    Pure filter combinations are few and are cached with the catalogue; free-text
+    searches go straight to the full-text index rather than filling the cache.
+    """
+    filters = dict(text=text, genre=genre, language=language, min_rating=min_rating, max_rating=max_rating,
+                   year_from=year_from, year_to=year_to, sort=sort)
+    if text and text.strip():
+        result = _search(limit, offset, filters)
+    else:
+        key = ('search', limit, offset) + tuple(filters.values())
+        result = get_catalogue_cache().get_or_load(key, lambda: _search(limit, offset, filters))
+    return result if result is not None else ([], 0)
+
+@named_query('get_movie_facets')
+def _load_facets():
+    conn = get_db_connection(read_only=True)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            return movie_search.read_facets(cursor)
+        finally:
+            cursor.close()
+            conn.close()
+    return None
+
+def get_movie_facets():
+    """Genre, language and release year values with their movie counts"""
+    facets = get_catalogue_cache().get_or_load('facets', _load_facets)
+    return facets if facets is not None else {facet: [] for facet in movie_search.FACETS}
+
+@named_query('refresh_movie_facets')
+def refresh_movie_facets():
+    """Recount MovieFacets from Movies on the primary"""
+    conn = get_db_connection()
+    if conn:
+        cursor = conn.cursor()
+        try:
+            movie_search.refresh_facets(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            st.error(f"Could not refresh movie filters: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+
+# Upper bound on showtime staleness for bookings made by other app processes
+SHOWTIME_MAX_AGE = 30
+
+@st.cache_resource
+def get_showtime_cache():
+    return VersionedCache(SHOWTIME_MAX_AGE)
+
+def get_showtimes(movie_id):
+    """Upcoming showtimes for a movie; reloaded from the primary whenever a booking bumps its version"""
+    showtimes = get_showtime_cache().get_or_load(movie_id, lambda: _load_showtimes(movie_id),
+                                                 lambda: _load_showtimes(movie_id, read_only=False))
+    return showtimes if showtimes is not None else []
+
+@named_query('get_showtimes')
+def _load_showtimes(movie_id, read_only=True):
+    conn = get_db_connection(read_only=read_only)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT * FROM Showtimes WHERE movie_id = %s AND available_seats > 0 ORDER BY show_date, show_time",
+                (movie_id,)
+            )
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+    return None
+
+# Seconds a screen's compiled seat layout is reused before it is re-read
+LAYOUT_TTL = 600
+
+@st.cache_resource
+def get_layout_cache():
+    return TTLCache(LAYOUT_TTL)
+
+def _read_layout_json(cursor, screen_id):
+    cursor.execute("""
+        SELECT l.layout_json FROM Screens sc
+        JOIN SeatLayouts l ON sc.layout_id = l.layout_id
+        WHERE sc.screen_id = %s
+    """, (screen_id,))
+    row = cursor.fetchone()
+    return row['layout_json'] if row else ''
+
+@named_query('get_screen_layout')
+def _load_layout_json(screen_id):
+    conn = get_db_connection(read_only=True)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            return _read_layout_json(cursor, screen_id)
+        finally:
+            cursor.close()
+            conn.close()
+    return None
+
+def get_screen_layout(screen_id, cursor=None):
+    """Compiled SeatLayout for a screen (DEFAULT_LAYOUT when none is configured).
+
+    Inside a transaction pass its ``cursor``: a cache miss is then read on that
+    connection instead of borrowing a second one while row locks are held.
+    """
+    if screen_id is None:
+        return DEFAULT_LAYOUT
+    if cursor is None:
+        loader = lambda: _load_layout_json(screen_id)
+    else:
+        loader = lambda: _read_layout_json(cursor, screen_id)
+    layout_json = get_layout_cache().get_or_load(screen_id, loader)
+    return compile_layout(layout_json) if layout_json else DEFAULT_LAYOUT
+
+def invalidate_layouts():
+    """Call after editing screens or seat layouts"""
+    get_layout_cache().invalidate()
+
+def _load_seat_mask(cursor, showtime_id, layout=DEFAULT_LAYOUT, lock=False):
+    """Read the booked-seat bitmap for a showtime, building it from Bookings the first time.
+
+    With ``lock=True`` the inventory row is read with FOR UPDATE so the caller
+    sees the latest committed bitmap and holds it until commit.
+    """
+    query = "SELECT seat_bitmap FROM SeatInventory WHERE showtime_id = %s"
+    if lock:
+        query += " FOR UPDATE"
+    cursor.execute(query, (showtime_id,))
+    row = cursor.fetchone()
+    if row:
+        return layout.decode(row['seat_bitmap'])
+
+    # Legacy showtime without an inventory row: fold its bookings in once
+    cursor.execute(
+        "SELECT seat_numbers FROM Bookings WHERE showtime_id = %s",
+        (showtime_id,)
+    )
+    bitmap = layout.bitmap_from_csv(r['seat_numbers'] for r in cursor.fetchall())
+    cursor.execute(
+        "INSERT IGNORE INTO SeatInventory (showtime_id, seat_bitmap) VALUES (%s, %s)",
+        (showtime_id, bitmap)
+    )
+    return layout.decode(bitmap)
+
+@named_query('get_booked_seats')
+def get_booked_seats(showtime_id, layout=None):
+    """Set of booked seat labels, read from the showtime's single inventory row.
+
+    Pass the showtime's layout when known to skip looking up its screen.
+    """
+    conn = get_db_connection()
+    if conn:
+        cursor = conn.cursor()
+        try:
+            if layout is None:
+                cursor.execute("SELECT screen_id FROM Showtimes WHERE showtime_id = %s", (showtime_id,))
+                row = cursor.fetchone()
+                layout = get_screen_layout(row['screen_id'] if row else None, cursor)
+            mask = _load_seat_mask(cursor, showtime_id, layout)
+            conn.commit()
+            return layout.to_labels(mask)
+        finally:
+            cursor.close()
+            conn.close()
+    return set()
+
+# MySQL error codes worth retrying: deadlock victim, lock wait timeout
+RETRYABLE_ERRORS = (1213, 1205)
+BOOKING_RETRIES = 4
+BOOKING_BACKOFF = 0.05
+
+def _held_by_others(cursor, seats_by_showtime, owner):
+    """{showtime_id: seats} of the requested seats another session holds right now.
+
+    Read inside the booking transaction. A hold committed after this read
+    can only cover seats being booked here, and its own booking then fails
+    on the seat bitmap.
+    """
+    if HOLD_BACKEND == 'memory':
+        store = get_hold_store()
+        held = {showtime_id: set(seats) & store.held_by_others(showtime_id, owner)
+                for showtime_id, seats in seats_by_showtime.items()}
+        return {showtime_id: seats for showtime_id, seats in held.items() if seats}
+    showtime_ids = sorted(seats_by_showtime)
+    cursor.execute(
+        f"SELECT showtime_id, seat_label FROM SeatHolds WHERE showtime_id IN ({', '.join(['%s'] * len(showtime_ids))}) "
+        "AND owner <> %s AND expires_at > NOW(3)",
+        showtime_ids + [owner]
+    )
+    held = {}
+    for row in cursor.fetchall():
+        if row['seat_label'] in seats_by_showtime[row['showtime_id']]:
+            held.setdefault(row['showtime_id'], set()).add(row['seat_label'])
+    return held
+
+def _claim_seats(cursor, user_id, showtime_id, selected_seats, hold_owner=''):
+    """One booking attempt inside the caller's transaction.
+
+    Locks the showtime and its inventory row, then compare-and-sets the seat
+    bitmap so a seat can only ever be claimed once. Seats held by a session
+    other than ``hold_owner`` are refused.
+    """
+    num_tickets = len(selected_seats)
+    cursor.execute(
+        "SELECT movie_id, screen_id, available_seats FROM Showtimes WHERE showtime_id = %s FOR UPDATE",
+        (showtime_id,)
+    )
+    showtime = cursor.fetchone()
+    if not showtime:
+        return {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Showtime not found!"}
+
+    layout = get_screen_layout(showtime['screen_id'], cursor)
+    unknown = [s for s in selected_seats if s not in layout.positions]
+    if unknown:
+        return {'success': False, 'booking_id': None, 'lost_seats': unknown, 'error': "Invalid seat selection!"}
+
+    booked_mask = _load_seat_mask(cursor, showtime_id, layout, lock=True)
+    requested_mask = layout.to_mask(selected_seats)
+    taken = booked_mask & requested_mask
+    if taken:
+        return {'success': False, 'booking_id': None,
+                'lost_seats': sorted(layout.to_labels(taken)),
+                'error': "Some seats were just booked by someone else!"}
+    held = _held_by_others(cursor, {showtime_id: set(selected_seats)}, hold_owner).get(showtime_id)
+    if held:
+        return {'success': False, 'booking_id': None, 'lost_seats': sorted(held),
+                'error': "Some seats are being held by another customer!"}
+    if showtime['available_seats'] < num_tickets:
+        return {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Not enough seats available!"}
+
+    cursor.execute(
+        "UPDATE SeatInventory SET seat_bitmap = %s WHERE showtime_id = %s AND seat_bitmap = %s",
+        (layout.encode(booked_mask | requested_mask), showtime_id, layout.encode(booked_mask))
+    )
+    if cursor.rowcount != 1:
+        raise pymysql.err.OperationalError(1213, "Seat inventory changed during booking")
+    cursor.execute(
+        "UPDATE Showtimes SET available_seats = available_seats - %s WHERE showtime_id = %s AND available_seats >= %s",
+        (num_tickets, showtime_id, num_tickets)
+    )
+    if cursor.rowcount != 1:
+        return {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Not enough seats available!"}
+    booked_at = datetime.now()
+    cursor.execute(
+        "INSERT INTO Bookings (user_id, showtime_id, tickets_booked, booking_date, seat_numbers) VALUES (%s, %s, %s, %s, %s)",
+        (user_id, showtime_id, num_tickets, booked_at, ','.join(selected_seats))
+    )
+    booking_id = cursor.lastrowid
+    record_booking(cursor, showtime['movie_id'], showtime_id, num_tickets, booked_at)
+    return {'success': True, 'booking_id': booking_id, 'lost_seats': [], 'error': None,
+            'movie_id': showtime['movie_id']}
+
+@named_query('book_tickets')
+def reserve_seats(user_id, showtime_id, selected_seats, hold_owner=''):
+    """Atomically book specific seats, retrying deadlocks with jittered backoff.
+
+    ``hold_owner`` is the booking session's hold owner; seats currently held
+    by anyone else are refused. Returns a dict with ``success``,
+    ``booking_id``, ``lost_seats`` (seats that someone else got first or
+    holds) and ``error``.
+    """
+    selected_seats = list(dict.fromkeys(selected_seats))
+    if not selected_seats:
+        return {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Invalid seat selection!"}
+
+    conn = get_db_connection()
+    if not conn:
+        return {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Database unavailable"}
+    cursor = conn.cursor()
+    try:
+        for attempt in range(BOOKING_RETRIES):
+            try:
+                result = _claim_seats(cursor, user_id, showtime_id, selected_seats, hold_owner)
+                if result['success']:
+                    conn.commit()
+                    # Other sessions pick up the new availability on their next read
+                    get_showtime_cache().bump(result['movie_id'])
+                else:
+                    conn.rollback()
+                return result
+            except pymysql.err.OperationalError as e:
+                conn.rollback()
+                if e.args[0] not in RETRYABLE_ERRORS or attempt == BOOKING_RETRIES - 1:
+                    raise
+                time.sleep(BOOKING_BACKOFF * (2 ** attempt) * (1 + random.random()))
+    except Exception as e:
+        conn.rollback()
+        return {'success': False, 'booking_id': None, 'lost_seats': [], 'error': f"Booking failed: {e}"}
+    finally:
+        cursor.close()
+        conn.close()
+
+# Showtimes locked and committed together by reserve_seats_bulk
+BULK_SHOWTIMES_PER_TXN = 25
+
+def _claim_seats_bulk(cursor, user_id, items, results, hold_owner=''):
+    """Claim every (index, showtime_id, seats) item of one shard inside the caller's transaction.
+
+    Showtimes and inventory rows are locked in showtime_id order, items are
+    checked against a running bitmap, and all writes go out as executemany
+    batches. Fills ``results`` in place; returns the movie ids that changed.
+    """
+    showtime_ids = sorted({showtime_id for _, showtime_id, _ in items})
+    placeholders = ', '.join(['%s'] * len(showtime_ids))
+    cursor.execute(
+        f"SELECT showtime_id, movie_id, screen_id, available_seats FROM Showtimes "
+        f"WHERE showtime_id IN ({placeholders}) ORDER BY showtime_id FOR UPDATE",
+        showtime_ids
+    )
+    showtimes = {row['showtime_id']: row for row in cursor.fetchall()}
+    cursor.execute(
+        f"SELECT showtime_id, seat_bitmap FROM SeatInventory "
+        f"WHERE showtime_id IN ({placeholders}) ORDER BY showtime_id FOR UPDATE",
+        showtime_ids
+    )
+    bitmaps = {row['showtime_id']: row['seat_bitmap'] for row in cursor.fetchall()}
+
+    layouts, masks, available = {}, {}, {}
+    for showtime_id, showtime in showtimes.items():
+        layout = layouts[showtime_id] = get_screen_layout(showtime['screen_id'], cursor)
+        if showtime_id in bitmaps:
+            masks[showtime_id] = layout.decode(bitmaps[showtime_id])
+        else:
+            masks[showtime_id] = _load_seat_mask(cursor, showtime_id, layout, lock=True)
+        available[showtime_id] = showtime['available_seats']
+    original = dict(masks)
+    requested_seats = {}
+    for _, showtime_id, seats in items:
+        if showtime_id in showtimes:
+            requested_seats.setdefault(showtime_id, set()).update(seats)
+    held = _held_by_others(cursor, requested_seats, hold_owner) if requested_seats else {}
+
+    booked_at = datetime.now()
+    claimed = []
+    for index, showtime_id, seats in items:
+        if showtime_id not in showtimes:
+            results[index] = {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Showtime not found!"}
+            continue
+        layout = layouts[showtime_id]
+        unknown = [s for s in seats if s not in layout.positions]
+        if unknown:
+            results[index] = {'success': False, 'booking_id': None, 'lost_seats': unknown,
+                              'error': "Invalid seat selection!"}
+            continue
+        requested = layout.to_mask(seats)
+        taken = masks[showtime_id] & requested
+        if taken:
+            results[index] = {'success': False, 'booking_id': None,
+                              'lost_seats': sorted(layout.to_labels(taken)),
+                              'error': "Some seats are already booked!"}
+            continue
+        held_here = held.get(showtime_id, set()).intersection(seats)
+        if held_here:
+            results[index] = {'success': False, 'booking_id': None, 'lost_seats': sorted(held_here),
+                              'error': "Some seats are being held by another customer!"}
+            continue
+        if available[showtime_id] < len(seats):
+            results[index] = {'success': False, 'booking_id': None, 'lost_seats': [],
+                              'error': "Not enough seats available!"}
+            continue
+        masks[showtime_id] |= requested
+        available[showtime_id] -= len(seats)
+        claimed.append((index, showtime_id, seats))
+
+    if not claimed:
+        return set()
+    changed = sorted({showtime_id for _, showtime_id, _ in claimed})
+    cursor.executemany(
+        "UPDATE SeatInventory SET seat_bitmap = %s WHERE showtime_id = %s",
+        [(layouts[s].encode(masks[s]), s) for s in changed]
+    )
+    cursor.executemany(
+        "UPDATE Showtimes SET available_seats = %s WHERE showtime_id = %s",
+        [(available[s], s) for s in changed]
+    )
+    # One multi-row INSERT: InnoDB gives the rows of a single simple insert
+    # consecutive ids (autoinc lock modes 1 and 2), in VALUES order, starting at lastrowid
+    values = []
+    for _, showtime_id, seats in claimed:
+        values.extend((user_id, showtime_id, len(seats), booked_at, ','.join(seats)))
+    cursor.execute(
+        "INSERT INTO Bookings (user_id, showtime_id, tickets_booked, booking_date, seat_numbers) VALUES "
+        + ', '.join(['(%s, %s, %s, %s, %s)'] * len(claimed)),
+        values
+    )
+    first_id = cursor.lastrowid
+    for offset, (index, showtime_id, seats) in enumerate(claimed):
+        results[index] = {'success': True, 'booking_id': first_id + offset,
+                          'lost_seats': [], 'error': None, 'movie_id': showtimes[showtime_id]['movie_id']}
+    record_bookings(cursor, [(showtimes[s]['movie_id'], s, len(seats), booked_at) for _, s, seats in claimed])
+    return {showtimes[s]['movie_id'] for s in changed}
+
+@named_query('book_tickets_bulk')
+def reserve_seats_bulk(user_id, requests, showtimes_per_txn=BULK_SHOWTIMES_PER_TXN, hold_owner=''):
+    """Book many (showtime_id, seats) requests at once, e.g. for group and corporate orders.
+
+    Requests are grouped into shards of ``showtimes_per_txn`` showtimes, each
+    booked in one transaction over a single pooled connection. Returns one
+    result dict per request, in request order, shaped like reserve_seats().
+    A request fails on its own (taken or held seats, bad showtime) without failing
+    the rest of its shard; a database error fails the whole shard.
+    """
+    requests = [(showtime_id, list(dict.fromkeys(seats))) for showtime_id, seats in requests]
+    results = [None] * len(requests)
+    by_showtime = {}
+    for index, (showtime_id, seats) in enumerate(requests):
+        if not seats:
+            results[index] = {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Invalid seat selection!"}
+        else:
+            by_showtime.setdefault(showtime_id, []).append((index, showtime_id, seats))
+    if not by_showtime:
+        return results
+
+    conn = get_db_connection()
+    if not conn:
+        return [r or {'success': False, 'booking_id': None, 'lost_seats': [], 'error': "Database unavailable"}
+                for r in results]
+    cursor = conn.cursor()
+    try:
+        showtime_ids = sorted(by_showtime)
+        for start in range(0, len(showtime_ids), showtimes_per_txn):
+            items = [item for showtime_id in showtime_ids[start:start + showtimes_per_txn]
+                     for item in by_showtime[showtime_id]]
+            for attempt in range(BOOKING_RETRIES):
+                try:
+                    movie_ids = _claim_seats_bulk(cursor, user_id, items, results, hold_owner)
+                    conn.commit()
+                    for movie_id in movie_ids:
+                        get_showtime_cache().bump(movie_id)
+                    break
+                except Exception as e:
+                    conn.rollback()
+                    retryable = isinstance(e, pymysql.err.OperationalError) and e.args[0] in RETRYABLE_ERRORS
+                    if retryable and attempt < BOOKING_RETRIES - 1:
+                        time.sleep(BOOKING_BACKOFF * (2 ** attempt) * (1 + random.random()))
+                        continue
+                    for index, _, _ in items:
+                        results[index] = {'success': False, 'booking_id': None, 'lost_seats': [],
+                                          'error': f"Booking failed: {e}"}
+                    break
+    finally:
+        cursor.close()
+        conn.close()
+    return results
+
+def book_tickets(user_id, showtime_id, selected_seats):
+    result = reserve_seats(user_id, showtime_id, selected_seats)
+    if not result['success']:
+        if result['lost_seats']:
+            st.error(f"{result['error']} Unavailable: {', '.join(result['lost_seats'])}")
+        else:
+            st.error(result['error'])
+    return result['success']
+
+BOOKINGS_PAGE_SIZE = 20
+
+@named_query('get_user_bookings_page')
+def get_user_bookings_page(user_id, upcoming, after=None, limit=BOOKINGS_PAGE_SIZE):
+    """One page of a user's upcoming or past bookings, newest booking first.
+
+    Keyset pagination: ``after`` is the ``(booking_date, booking_id)`` of the
+    last row already shown, so every page is a short walk of the
+    (user_id, booking_date) index no matter how long the history is.
+    Returns ``(rows, next_after)``; ``next_after`` is None on the last page.
+    """
+    conn = get_db_connection(read_only=True)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            query = """
+                SELECT b.booking_id, m.title, s.show_date, s.show_time,
+                       b.tickets_booked, b.booking_date, b.seat_numbers
+                FROM Bookings b
+                JOIN Showtimes s ON b.showtime_id = s.showtime_id
+                JOIN Movies m ON s.movie_id = m.movie_id
+                WHERE b.user_id = %s AND s.show_date {} %s
+            """.format('>=' if upcoming else '<')
+            params = [user_id, date.today()]
+            if after:
+                query += " AND (b.booking_date < %s OR (b.booking_date = %s AND b.booking_id < %s))"
+                params += [after[0], after[0], after[1]]
+            query += " ORDER BY b.booking_date DESC, b.booking_id DESC LIMIT %s"
+            params.append(limit + 1)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            if len(rows) > limit:
+                rows = rows[:limit]
+                return rows, (rows[-1]['booking_date'], rows[-1]['booking_id'])
+            return rows, None
+        finally:
+            cursor.close()
+            conn.close()
+    return [], None
\ No newline at end of file
@@ -0,0 +1,478 @@
+"""
+Schema Migrations and Query Plan Checks
+Filename: migrations.py
+Run with: python migrations.py [--sqlite FILE] [--check]
+"""
+
+import argparse
+import ast
+import os
+import re
+import sqlite3
+import sys
+
+import pymysql
+
+# Each migration is (version, description, statements). A statement is either
+# portable SQL or a (dialect, sql) pair that only runs on that dialect.
+MIGRATIONS = [
+    (1, "Base tables", [
+        """
+        CREATE TABLE IF NOT EXISTS Users (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(50) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            email VARCHAR(100),
+            is_admin TINYINT NOT NULL DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Movies (
+            movie_id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            genre VARCHAR(50),
+            language VARCHAR(30),
+            duration INT,
+            rating DECIMAL(3,1),
+            release_year INT,
+            description TEXT,
+            poster_url VARCHAR(500)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Showtimes (
+            showtime_id INT AUTO_INCREMENT PRIMARY KEY,
+            movie_id INT NOT NULL,
+            show_date DATE NOT NULL,
+            show_time TIME NOT NULL,
+            available_seats INT NOT NULL,
+            FOREIGN KEY (movie_id) REFERENCES Movies(movie_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Bookings (
+            booking_id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            showtime_id INT NOT NULL,
+            tickets_booked INT NOT NULL,
+            booking_date DATETIME NOT NULL,
+            seat_numbers TEXT,
+            FOREIGN KEY (user_id) REFERENCES Users(user_id),
+            FOREIGN KEY (showtime_id) REFERENCES Showtimes(showtime_id)
+        )
+        """,
+    ]),
+    (2, "Covering indexes for the hot queries", [
+        "CREATE INDEX idx_showtimes_movie ON Showtimes (movie_id, available_seats, show_date, show_time)",
+        "CREATE INDEX idx_bookings_showtime ON Bookings (showtime_id)",
+        "CREATE INDEX idx_bookings_user_date ON Bookings (user_id, booking_date)",
+        "CREATE UNIQUE INDEX idx_users_username ON Users (username)",
+    ]),
+    (3, "Seat inventory bitmaps and seat holds", [
+        """
+        CREATE TABLE IF NOT EXISTS SeatInventory (
+            showtime_id INT PRIMARY KEY,
+            seat_bitmap VARBINARY(1024) NOT NULL,
+            FOREIGN KEY (showtime_id) REFERENCES Showtimes(showtime_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS SeatHolds (
+            showtime_id INT NOT NULL,
+            seat_label VARCHAR(16) NOT NULL,
+            owner VARCHAR(64) NOT NULL,
+            expires_at DATETIME(3) NOT NULL,
+            PRIMARY KEY (showtime_id, seat_label)
+        )
+        """,
+        "CREATE INDEX idx_holds_expiry ON SeatHolds (expires_at)",
+    ]),
+    (4, "Screens and seat layouts", [
+        """
+        CREATE TABLE IF NOT EXISTS SeatLayouts (
+            layout_id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            layout_json TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Screens (
+            screen_id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            layout_id INT NOT NULL,
+            FOREIGN KEY (layout_id) REFERENCES SeatLayouts(layout_id)
+        )
+        """,
+        "ALTER TABLE Showtimes ADD COLUMN screen_id INT NULL",
+    ]),
+    (5, "Server-side sessions", [
+        """
+        CREATE TABLE IF NOT EXISTS Sessions (
+            session_id VARCHAR(64) PRIMARY KEY,
+            data TEXT NOT NULL,
+            expires_at DOUBLE NOT NULL
+        )
+        """,
+        "CREATE INDEX idx_sessions_expiry ON Sessions (expires_at)",
+    ]),
+    (6, "Incremental dashboard rollups", [
+        """
+        CREATE TABLE IF NOT EXISTS MetricCounters (
+            name VARCHAR(32) NOT NULL,
+            shard SMALLINT NOT NULL,
+            value BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, shard)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS DailySales (
+            day DATE NOT NULL,
+            shard SMALLINT NOT NULL,
+            bookings BIGINT NOT NULL DEFAULT 0,
+            tickets BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, shard)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS MovieSales (
+            movie_id INT NOT NULL,
+            shard SMALLINT NOT NULL,
+            bookings BIGINT NOT NULL DEFAULT 0,
+            tickets BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (movie_id, shard)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ShowtimeSales (
+            showtime_id INT NOT NULL,
+            shard SMALLINT NOT NULL,
+            bookings BIGINT NOT NULL DEFAULT 0,
+            tickets BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (showtime_id, shard)
+        )
+        """,
+    ]),
+    (7, "Ticket prices and booking status for sales analytics", [
+        "ALTER TABLE Showtimes ADD COLUMN ticket_price DECIMAL(8,2) NOT NULL DEFAULT 200.00",
+        "ALTER TABLE Bookings ADD COLUMN status VARCHAR(16) NOT NULL DEFAULT 'confirmed'",
+    ]),
+    (8, "Catalogue search indexes and facet counts", [
+        ('mysql', "CREATE FULLTEXT INDEX idx_movies_text ON Movies (title, description)"),
+        "CREATE INDEX idx_movies_language_genre ON Movies (language, genre, rating)",
+        "CREATE INDEX idx_movies_genre_rating ON Movies (genre, rating)",
+        "CREATE INDEX idx_movies_year_rating ON Movies (release_year, rating)",
+        """
+        CREATE TABLE IF NOT EXISTS MovieFacets (
+            facet VARCHAR(16) NOT NULL,
+            value VARCHAR(50) NOT NULL,
+            movie_count INT NOT NULL,
+            PRIMARY KEY (facet, value)
+        )
+        """,
+        """
+        INSERT INTO MovieFacets (facet, value, movie_count)
+        SELECT 'genre', genre, COUNT(*) FROM Movies WHERE genre IS NOT NULL GROUP BY genre
+        """,
+        """
+        INSERT INTO MovieFacets (facet, value, movie_count)
+        SELECT 'language', language, COUNT(*) FROM Movies WHERE language IS NOT NULL GROUP BY language
+        """,
+        """
+        INSERT INTO MovieFacets (facet, value, movie_count)
+        SELECT 'release_year', release_year, COUNT(*) FROM Movies WHERE release_year IS NOT NULL GROUP BY release_year
+        """,
+    ]),
+    (9, "Freeze seat layouts that seat bitmaps depend on", [
+        "CREATE INDEX idx_showtimes_screen ON Showtimes (screen_id)",
+        # A bitmap's bits only mean something under the layout it was written with
+        ('mysql', """
+        CREATE TRIGGER trg_layouts_frozen BEFORE UPDATE ON SeatLayouts FOR EACH ROW
+        IF NEW.layout_json <> OLD.layout_json AND EXISTS (
+            SELECT 1 FROM Screens sc JOIN Showtimes s ON s.screen_id = sc.screen_id
+            JOIN SeatInventory i ON i.showtime_id = s.showtime_id WHERE sc.layout_id = OLD.layout_id) THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Seat layout is used by showtimes with seat bitmaps; add a new layout instead';
+        END IF
+        """),
+        ('mysql', """
+        CREATE TRIGGER trg_screens_frozen BEFORE UPDATE ON Screens FOR EACH ROW
+        IF NOT (NEW.layout_id <=> OLD.layout_id) AND EXISTS (
+            SELECT 1 FROM Showtimes s JOIN SeatInventory i ON i.showtime_id = s.showtime_id
+            WHERE s.screen_id = OLD.screen_id) THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Screen has showtimes with seat bitmaps; its layout cannot change';
+        END IF
+        """),
+        ('mysql', """
+        CREATE TRIGGER trg_showtimes_screen_frozen BEFORE UPDATE ON Showtimes FOR EACH ROW
+        IF NOT (NEW.screen_id <=> OLD.screen_id)
+           AND EXISTS (SELECT 1 FROM SeatInventory WHERE showtime_id = OLD.showtime_id) THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Showtime has a seat bitmap; its screen cannot change';
+        END IF
+        """),
+        ('sqlite', """
+        CREATE TRIGGER trg_layouts_frozen BEFORE UPDATE OF layout_json ON SeatLayouts
+        WHEN NEW.layout_json <> OLD.layout_json AND EXISTS (
+            SELECT 1 FROM Screens sc JOIN Showtimes s ON s.screen_id = sc.screen_id
+            JOIN SeatInventory i ON i.showtime_id = s.showtime_id WHERE sc.layout_id = OLD.layout_id)
+        BEGIN SELECT RAISE(ABORT, 'Seat layout is used by showtimes with seat bitmaps; add a new layout instead'); END
+        """),
+        ('sqlite', """
+        CREATE TRIGGER trg_screens_frozen BEFORE UPDATE OF layout_id ON Screens
+        WHEN NEW.layout_id IS NOT OLD.layout_id AND EXISTS (
+            SELECT 1 FROM Showtimes s JOIN SeatInventory i ON i.showtime_id = s.showtime_id
+            WHERE s.screen_id = OLD.screen_id)
+        BEGIN SELECT RAISE(ABORT, 'Screen has showtimes with seat bitmaps; its layout cannot change'); END
+        """),
+        ('sqlite', """
+        CREATE TRIGGER trg_showtimes_screen_frozen BEFORE UPDATE OF screen_id ON Showtimes
+        WHEN NEW.screen_id IS NOT OLD.screen_id
+             AND EXISTS (SELECT 1 FROM SeatInventory WHERE showtime_id = OLD.showtime_id)
+        BEGIN SELECT RAISE(ABORT, 'Showtime has a seat bitmap; its screen cannot change'); END
+        """),
+    ]),
+]
+
+# Tables a full scan is acceptable on. Movies is a catalogue of a few thousand
+# rows that get_movies() deliberately reads whole into the process-wide
+# catalogue cache, and refresh_movie_facets() aggregates over all of it; both
+# run once per cache period, not per request. Search queries are filtered by
+# the indexes from migration 8 and still show up as scans on SQLite.
+ALLOWED_SCANS = {'Movies'}
+
+# Modules whose queries --check explains by default
+CHECKED_MODULES = ('db_utils.py', 'seat_holds.py')
+# Stands in for a generated IN-list such as ', '.join(['%s'] * len(seats))
+IN_LIST_SAMPLE = '%s, %s'
+
+
+def to_sqlite(sql):
+    """Rewrite the MySQL dialect used in this app into SQLite"""
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'\bINT AUTO_INCREMENT PRIMARY KEY\b', 'INTEGER PRIMARY KEY AUTOINCREMENT', sql)
+    sql = re.sub(r'\s+FOR UPDATE\b', '', sql)
+    sql = re.sub(r'\bINSERT IGNORE\b', 'INSERT OR IGNORE', sql)
+    sql = re.sub(r'\bON DUPLICATE KEY UPDATE\b', 'ON CONFLICT DO UPDATE SET', sql)
+    sql = re.sub(r'\bVALUES\((\w+)\)', r'excluded.\1', sql)
+    sql = re.sub(r'\bNOW\(3\)', "strftime('%Y-%m-%d %H:%M:%f', 'now')", sql)
+    return sql
+
+
+class Database:
+    """Thin wrapper so migrations and checks run on MySQL or an SQLite stand-in"""
+
+    def __init__(self, sqlite_path=None, db_config=None):
+        if sqlite_path:
+            self.dialect = 'sqlite'
+            self.conn = sqlite3.connect(sqlite_path)
+            self.conn.row_factory = sqlite3.Row
+        else:
+            self.dialect = 'mysql'
+            if db_config is None:
+                from db_utils import DB_CONFIG
+                db_config = DB_CONFIG
+            self.conn = pymysql.connect(**dict(db_config, cursorclass=pymysql.cursors.DictCursor))
+
+    def translate(self, sql):
+        return to_sqlite(sql) if self.dialect == 'sqlite' else sql
+
+    def execute(self, sql, params=()):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(self.translate(sql), params)
+            return [dict(row) for row in cursor.fetchall()] if cursor.description else []
+        finally:
+            cursor.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def current_version(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rows = db.execute("SELECT MAX(version) AS version FROM schema_migrations")
+    return rows[0]['version'] or 0
+
+
+def migrate(db, target=None):
+    """Apply every pending migration up to ``target``; returns the versions applied"""
+    applied = []
+    version = current_version(db)
+    for number, description, statements in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        for statement in statements:
+            if isinstance(statement, tuple):
+                dialect, statement = statement
+                if dialect != db.dialect:
+                    continue
+            db.execute(statement)
+        # MySQL DDL auto-commits, so each version is recorded right after it runs
+        db.execute(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (number, description)
+        )
+        db.commit()
+        applied.append(number)
+    return applied
+
+
+def _render(node, names):
+    """SQL text of a string expression with sample values filled in, or None.
+
+    Handles literals, f-strings, concatenation, str.format() and variables
+    assigned earlier in the function. Conditional parts take their first
+    branch; lists generated with sep.join([item] * n), such as IN-lists and
+    multi-row VALUES, are rendered with two items.
+    """
+    if isinstance(node, ast.Constant):
+        return str(node.value)
+    if isinstance(node, ast.JoinedStr):
+        parts = [_render(value.value if isinstance(value, ast.FormattedValue) else value, names)
+                 for value in node.values]
+        return None if None in parts else ''.join(parts)
+    if isinstance(node, ast.Name):
+        return names.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _render(node.left, names), _render(node.right, names)
+        return None if left is None or right is None else left + right
+    if isinstance(node, ast.IfExp):
+        return _render(node.body, names)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        if node.func.attr == 'join':
+            sep, arg = _render(node.func.value, names), node.args[0] if node.args else None
+            if (sep is not None and isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Mult)
+                    and isinstance(arg.left, ast.List) and len(arg.left.elts) == 1):
+                item = _render(arg.left.elts[0], names)
+                if item is not None:
+                    return sep.join([item] * 2)
+            if "'%s'" in ast.unparse(node):
+                return IN_LIST_SAMPLE
+        if node.func.attr == 'format' and not node.keywords:
+            template = _render(node.func.value, names)
+            args = [_render(arg, names) for arg in node.args]
+            if template is not None and None not in args:
+                return template.format(*args)
+    return None
+
+
+def _string_names(function, before):
+    """Variables holding SQL text in ``function`` as of line ``before``.
+
+    Every ``+=`` seen is applied, so conditionally appended clauses are
+    checked too.
+    """
+    names = {}
+    steps = sorted((node for node in ast.walk(function)
+                    if isinstance(node, (ast.Assign, ast.AugAssign)) and node.lineno < before),
+                   key=lambda node: node.lineno)
+    for node in steps:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            value = _render(node.value, names)
+            if value is None:
+                names.pop(node.targets[0].id, None)
+            else:
+                names[node.targets[0].id] = value
+        elif (isinstance(node, ast.AugAssign) and isinstance(node.op, ast.Add)
+              and isinstance(node.target, ast.Name) and node.target.id in names):
+            value = _render(node.value, names)
+            if value is None:
+                del names[node.target.id]
+            else:
+                names[node.target.id] += value
+    return names
+
+
+def find_queries(path):
+    """(line, sql) for every cursor.execute()/executemany() in a module.
+
+    ``sql`` is None when the statement is built in a way that cannot be
+    rendered statically; --check treats those as failures.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    functions = [node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    queries = []
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr in ('execute', 'executemany') and node.args):
+            # Innermost function containing the call
+            enclosing = [f for f in functions if f.lineno <= node.lineno <= f.end_lineno]
+            names = _string_names(max(enclosing, key=lambda f: f.lineno), node.lineno) if enclosing else {}
+            sql = _render(node.args[0], names)
+            queries.append((node.lineno, ' '.join(sql.split()) if sql is not None else None))
+    return sorted(queries, key=lambda query: query[0])
+
+
+def full_scans(db, sql):
+    """Tables the query plan reads in full"""
+    params = (1,) * sql.count('%s')
+    if db.dialect == 'sqlite':
+        plan = db.execute("EXPLAIN QUERY PLAN " + sql, params)
+        scans = set()
+        for step in plan:
+            match = re.match(r'SCAN (?:TABLE )?(\w+)', step['detail'])
+            if match and 'USING' not in step['detail'] and match.group(1) != 'CONSTANT':
+                scans.add(match.group(1))
+        return scans
+    plan = db.execute("EXPLAIN " + sql, params)
+    return {step['table'] for step in plan if step.get('type') == 'ALL'}
+
+
+def check_query_plans(db, paths):
+    """List of (path, line, problem) for queries that do a disallowed full scan or cannot be checked"""
+    problems = []
+    for path in paths:
+        for lineno, sql in find_queries(path):
+            if sql is None:
+                problems.append((path, lineno, "query is not built from literals, so its plan cannot be checked"))
+                continue
+            if not re.match(r'(SELECT|UPDATE|DELETE)\b', sql, re.IGNORECASE):
+                continue
+            try:
+                scans = full_scans(db, sql) - ALLOWED_SCANS
+            except Exception as e:
+                problems.append((path, lineno, f"could not explain ({e}): {sql}"))
+                continue
+            if scans:
+                problems.append((path, lineno, f"full scan of {', '.join(sorted(scans))}: {sql}"))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply schema migrations and check query plans")
+    parser.add_argument('--sqlite', help="Use an SQLite file instead of the MySQL server in DB_CONFIG")
+    parser.add_argument('--target', type=int, help="Stop at this schema version")
+    parser.add_argument('--check', action='store_true', help="Fail if an app query does a full table scan")
+    parser.add_argument('paths', nargs='*', help=f"Modules to check (default: {', '.join(CHECKED_MODULES)})")
+    args = parser.parse_args(argv)
+
+    db = Database(sqlite_path=args.sqlite)
+    try:
+        applied = migrate(db, args.target)
+        print(f"Schema at version {current_version(db)}"
+              + (f" (applied {', '.join(map(str, applied))})" if applied else ""))
+        if args.check:
+            here = os.path.dirname(os.path.abspath(__file__))
+            paths = args.paths or [os.path.join(here, name) for name in CHECKED_MODULES]
+            problems = check_query_plans(db, paths)
+            for path, lineno, problem in problems:
+                print(f"{os.path.basename(path)}:{lineno}: {problem}")
+            if problems:
+                return 1
+            print("No full table scans found.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
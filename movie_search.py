@@ -0,0 +1,95 @@
+"""
+Movie Search and Facets
+Filename: movie_search.py
+"""
+
+import re
+
+# Columns the catalogue grid needs; description is searched but not returned
+MOVIE_COLUMNS = "movie_id, title, genre, language, duration, rating, release_year, poster_url"
+
+# Sort name -> ORDER BY; movie_id keeps offset pages stable between ties
+SORT_ORDERS = {
+    'newest': "release_year DESC, rating DESC, movie_id DESC",
+    'rating': "rating DESC, release_year DESC, movie_id DESC",
+    'title': "title, movie_id",
+    'relevance': "relevance DESC, rating DESC, movie_id DESC",
+}
+
+FACETS = ('genre', 'language', 'release_year')
+
+# InnoDB's default innodb_ft_min_token_size; shorter words are not in the index
+MIN_TOKEN_SIZE = 3
+
+
+def _boolean_query(text):
+    """Turn free text into a boolean-mode query requiring every word as a prefix"""
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'+{word}*' for word in words if len(word) >= MIN_TOKEN_SIZE)
+
+
+def build_search(text='', genre=None, language=None, min_rating=None, max_rating=None,
+                 year_from=None, year_to=None, sort='newest', limit=12, offset=0):
+    """(page_sql, page_params, count_sql, count_params) for one page of the catalogue"""
+    where, params = [], []
+    relevance, relevance_params = "0", []
+    text = (text or '').strip()
+    match = _boolean_query(text)
+    if match:
+        relevance, relevance_params = "MATCH(title, description) AGAINST (%s IN BOOLEAN MODE)", [match]
+        where.append(relevance)
+        params.append(match)
+    elif text:
+        # Words too short for the full-text index fall back to a title prefix match
+        where.append("title LIKE %s")
+        params.append(re.sub(r'([\\%_])', r'\\\1', text) + '%')
+    if not match and sort == 'relevance':
+        sort = 'newest'
+
+    for column, value in (('genre', genre), ('language', language)):
+        if value:
+            where.append(f"{column} = %s")
+            params.append(value)
+    for condition, value in (("rating >= %s", min_rating), ("rating <= %s", max_rating),
+                             ("release_year >= %s", year_from), ("release_year <= %s", year_to)):
+        if value is not None:
+            where.append(condition)
+            params.append(value)
+
+    where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+    page_sql = (f"SELECT {MOVIE_COLUMNS}, {relevance} AS relevance FROM Movies{where_sql} "
+                f"ORDER BY {SORT_ORDERS.get(sort, SORT_ORDERS['newest'])} LIMIT %s OFFSET %s")
+    count_sql = f"SELECT COUNT(*) AS total FROM Movies{where_sql}"
+    return page_sql, relevance_params + params + [int(limit), int(offset)], count_sql, params
+
+
+def search(cursor, limit=12, offset=0, **filters):
+    """Return (movies on this page, total number of matches)"""
+    page_sql, page_params, count_sql, count_params = build_search(limit=limit, offset=offset, **filters)
+    cursor.execute(page_sql, page_params)
+    movies = cursor.fetchall()
+    if offset == 0 and len(movies) < limit:
+        # The whole result fits on the first page, no need to count
+        return movies, len(movies)
+    cursor.execute(count_sql, count_params)
+    return movies, int(cursor.fetchone()['total'])
+
+
+def refresh_facets(cursor):
+    """Rebuild the MovieFacets counts from Movies; run after the catalogue changes"""
+    cursor.execute("DELETE FROM MovieFacets")
+    for facet in FACETS:
+        cursor.execute(
+            f"INSERT INTO MovieFacets (facet, value, movie_count) "
+            f"SELECT '{facet}', {facet}, COUNT(*) FROM Movies WHERE {facet} IS NOT NULL GROUP BY {facet}"
+        )
+
+
+def read_facets(cursor):
+    """{facet: [(value, movie_count), ...]} with the most common values first"""
+    cursor.execute("SELECT facet, value, movie_count FROM MovieFacets ORDER BY facet, movie_count DESC, value")
+    facets = {facet: [] for facet in FACETS}
+    for row in cursor.fetchall():
+        value = int(row['value']) if row['facet'] == 'release_year' else row['value']
+        facets.setdefault(row['facet'], []).append((value, int(row['movie_count'])))
+    return facets
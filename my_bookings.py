@@ -1,27 +1,58 @@
-"""
-My Bookings Page
-Filename: my_bookings.py
-"""
-
-import streamlit as st
-from db_utils import get_user_bookings
-
-def show_my_bookings():
-    """Display user bookings page"""
-    st.title("My Bookings")
-    bookings = get_user_bookings(st.session_state.user_id)
-
-    if bookings:
-        for booking in bookings:
-            st.markdown(f"""
-            <div style='background: #ffffff; border: 2px solid #e2e8f0; border-radius: 12px; 
-                        padding: 28px; margin-bottom: 20px; box-shadow: 0 4px 12px rgba(0, 0, 0, 0.05);
-                        transition: all 0.3s ease;'>
-                <h3 style='color: #1e293b; margin: 0 0 16px 0; font-weight: 700; font-size: 22px;'>{booking['title']}</h3>
-                <p style='color: #475569; margin: 8px 0; font-size: 15px;'><strong>📅 Date:</strong> {booking['show_date']} at {booking['show_time']}</p>
-                <p style='color: #475569; margin: 8px 0; font-size: 15px;'><strong>🎫 Seats:</strong> {booking['seat_numbers']}</p>
-                <p style='color: #10b981; margin: 8px 0; font-size: 14px; font-weight: 600;'>✅ Booked on {booking['booking_date']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-    else:
-        st.info("No bookings yet. Start booking movies!")
\ No newline at end of file
+"""
+My Bookings Page
+Filename: my_bookings.py
+"""
+
+import streamlit as st
+from html import escape
+from db_utils import get_user_bookings_page
+from profiler import profiled
+
+def _load_next_page(view):
+    """Append the next page of ``view`` ('Upcoming' or 'Past') to the session"""
+    pages = st.session_state.bookings_pages[view]
+    rows, pages['after'] = get_user_bookings_page(
+        st.session_state.user_id, upcoming=(view == "Upcoming"), after=pages['after']
+    )
+    pages['rows'].extend(rows)
+    pages['done'] = pages['after'] is None
+
+@profiled('show_my_bookings')
+def show_my_bookings():
+    """Display user bookings page"""
+    st.title("My Bookings")
+
+    # Pages fetched so far this session (dropped by book_tickets after a new booking)
+    if st.session_state.get('bookings_pages', {}).get('user_id') != st.session_state.user_id:
+        st.session_state.bookings_pages = {
+            'user_id': st.session_state.user_id,
+            'Upcoming': {'rows': [], 'after': None, 'done': False, 'loaded': False},
+            'Past': {'rows': [], 'after': None, 'done': False, 'loaded': False}
+        }
+
+    view = st.radio("Show", ["Upcoming", "Past"], horizontal=True, label_visibility="collapsed")
+    pages = st.session_state.bookings_pages[view]
+    if not pages['loaded']:
+        _load_next_page(view)
+        pages['loaded'] = True
+
+    bookings = pages['rows']
+    if bookings:
+        for booking in bookings:
+            st.markdown(f"""
+            <div style='background: #ffffff; border: 2px solid #e2e8f0; border-radius: 12px; 
+                        padding: 28px; margin-bottom: 20px; box-shadow: 0 4px 12px rgba(0, 0, 0, 0.05);
+                        transition: all 0.3s ease;'>
+                <h3 style='color: #1e293b; margin: 0 0 16px 0; font-weight: 700; font-size: 22px;'>{escape(booking['title'])}</h3>
+                <p style='color: #475569; margin: 8px 0; font-size: 15px;'><strong>📅 Date:</strong> {booking['show_date']} at {booking['show_time']}</p>
+                <p style='color: #475569; margin: 8px 0; font-size: 15px;'><strong>🎫 Seats:</strong> {escape(booking['seat_numbers'])}</p>
+                <p style='color: #10b981; margin: 8px 0; font-size: 14px; font-weight: 600;'>✅ Booked on {booking['booking_date']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+        if not pages['done']:
+            st.button("Load more", use_container_width=True, on_click=_load_next_page, args=(view,))
+    elif view == "Upcoming":
+        st.info("No upcoming shows. Start booking movies!")
+    else:
+        st.info("No past bookings yet.")
\ No newline at end of file
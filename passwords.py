@@ -0,0 +1,124 @@
+"""
+Password Hashing
+Filename: passwords.py
+"""
+
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# scrypt cost parameters; raising them makes stored hashes rehash on next login
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+class PasswordBusy(Exception):
+    """Raised when too many hash/verify jobs are already queued"""
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * (n + p + 2), dklen=KEY_BYTES)
+
+
+# Well-formed hash that no password matches. Verifying against it when a user
+# does not exist costs as much as a real check, so timing leaks no usernames.
+DUMMY_HASH = f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(bytes(SALT_BYTES))}${_b64(bytes(KEY_BYTES))}"
+
+
+def hash_password(password):
+    """Salted scrypt hash encoded as ``scrypt$n$r$p$salt$key``"""
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash.
+
+    Returns ``(ok, needs_rehash)``. Legacy unsalted SHA-256 hex digests are
+    still accepted and always flagged for rehashing.
+    """
+    if not stored:
+        return False, False
+    if stored.startswith('scrypt$'):
+        try:
+            _, n, r, p, salt, key = stored.split('$')
+            n, r, p = int(n), int(r), int(p)
+            expected = base64.b64decode(key)
+            actual = _scrypt(password, base64.b64decode(salt), n, r, p)
+        except ValueError:
+            return False, False
+        ok = hmac.compare_digest(actual, expected)
+        return ok, ok and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    ok = hmac.compare_digest(legacy.encode(), stored.encode())
+    return ok, ok
+
+
+class PasswordWorkers:
+    """Runs hashing in a small process pool so a burst of logins cannot
+    starve the Streamlit script threads of CPU.
+
+    At most ``max_pending`` jobs may be queued; beyond that callers get
+    PasswordBusy after ``wait`` seconds instead of piling up.
+    """
+
+    def __init__(self, workers=2, max_pending=32, wait=5.0, window=1000):
+        # Forking the threaded Streamlit server can copy a held lock into the
+        # child and deadlock it; start workers from a clean process instead
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.wait = wait
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.rejected = 0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordBusy("Too many logins in progress, please try again")
+        started = time.perf_counter()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._latencies.append(time.perf_counter() - started)
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify(self, password, stored):
+        return self._run(verify_password, password, stored)
+
+    def stats(self):
+        """Latency percentiles (ms) over the most recent jobs"""
+        with self._lock:
+            samples = sorted(self._latencies)
+            rejected = self.rejected
+        if not samples:
+            return {'count': 0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0, 'rejected': rejected}
+        pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+        return {
+            'count': len(samples),
+            'p50_ms': pick(0.50),
+            'p95_ms': pick(0.95),
+            'max_ms': samples[-1] * 1000,
+            'rejected': rejected,
+        }
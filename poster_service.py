@@ -0,0 +1,317 @@
+"""
+Poster Image Proxy
+Filename: poster_service.py
+Run with: python poster_service.py [--host 127.0.0.1] [--port 8601] [--cache-dir DIR] [--fixtures DIR]
+
+Fetches each movie poster once, stores resized variants in a
+content-addressed disk cache with LRU eviction and serves them with ETags
+and long-lived cache headers. Poster URLs carry a hash of the source URL,
+so a movie whose poster changes gets a new URL and the old one can be
+cached as immutable. The same server hosts small versioned static assets
+(the theme stylesheet) under /static/.
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from PIL import Image, ImageOps
+
+# Loopback only unless asked otherwise; put a reverse proxy in front to expose it
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8601
+
+# Variant name -> (width, height); cards use thumb, the booking page detail
+VARIANTS = {'thumb': (320, 480), 'detail': (640, 960)}
+FORMATS = {'webp': ('WEBP', 'image/webp'), 'jpeg': ('JPEG', 'image/jpeg')}
+QUALITY = 82
+
+FETCH_TIMEOUT = 10.0
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def source_version(url):
+    """Short hash of a poster URL, used to version the proxied URL"""
+    return hashlib.sha1(url.encode()).hexdigest()[:12]
+
+
+class PosterCache:
+    """Resized posters on disk, addressed by the hash of their bytes.
+
+    ``refs/`` maps (source URL, variant, format) to a blob digest and
+    ``blobs/`` holds the images. Blob mtimes are touched on every hit and the
+    least recently used blobs are deleted once the cache exceeds ``max_bytes``.
+    With ``fixture_dir`` set, sources are read from that directory by file
+    name instead of being downloaded.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, fixture_dir=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+        self._load_locks = {}   # ref path -> [lock, threads using it], dropped once the last one is done
+        self.hits = 0
+        self.misses = 0
+        for sub in ('refs', 'blobs'):
+            os.makedirs(os.path.join(cache_dir, sub), exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path, _ in self._blobs())
+
+    def _blobs(self):
+        blob_dir = os.path.join(self.cache_dir, 'blobs')
+        for name in os.listdir(blob_dir):
+            if not name.startswith('.'):
+                path = os.path.join(blob_dir, name)
+                yield path, os.stat(path).st_mtime
+
+    def _ref_path(self, url, variant, fmt):
+        key = hashlib.sha256(f"{url}\n{variant}\n{fmt}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, 'refs', key)
+
+    def _blob_path(self, digest, fmt):
+        return os.path.join(self.cache_dir, 'blobs', f"{digest}.{fmt}")
+
+    def _lookup(self, ref_path, fmt):
+        try:
+            with open(ref_path) as f:
+                digest = f.read().strip()
+        except FileNotFoundError:
+            return None
+        path = self._blob_path(digest, fmt)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted since the ref was written
+            return None
+        return path, digest
+
+    def fetch_source(self, url):
+        if self.fixture_dir:
+            with open(os.path.join(self.fixture_dir, os.path.basename(urlparse(url).path)), 'rb') as f:
+                return f.read()
+        with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT) as response:
+            data = response.read(MAX_SOURCE_BYTES + 1)
+        if len(data) > MAX_SOURCE_BYTES:
+            raise ValueError(f"Poster larger than {MAX_SOURCE_BYTES} bytes: {url}")
+        return data
+
+    def _render(self, source, variant, fmt):
+        image = Image.open(io.BytesIO(source))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        image = ImageOps.fit(image, VARIANTS[variant], Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, FORMATS[fmt][0], quality=QUALITY, optimize=fmt == 'jpeg')
+        return out.getvalue()
+
+    def _store(self, data, fmt):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest, fmt)
+        if not os.path.exists(path):
+            tmp = os.path.join(os.path.dirname(path), f".{digest}.{threading.get_ident()}.tmp")
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+            with self._lock:
+                self.total_bytes += len(data)
+        return path, digest
+
+    def _write_ref(self, ref_path, digest):
+        tmp = f"{ref_path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(digest)
+        os.replace(tmp, ref_path)
+
+    def get(self, url, variant='thumb', fmt='webp'):
+        """(path, digest) of the resized poster, fetching and rendering it on a miss"""
+        if variant not in VARIANTS or fmt not in FORMATS:
+            raise KeyError(f"Unknown poster variant {variant}.{fmt}")
+        ref_path = self._ref_path(url, variant, fmt)
+        found = self._lookup(ref_path, fmt)
+        if found:
+            self.hits += 1
+            return found
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(ref_path, [threading.Lock(), 0])
+            load_lock[1] += 1
+        try:
+            with load_lock[0]:
+                # Another request may have rendered it while we waited
+                found = self._lookup(ref_path, fmt)
+                if found:
+                    self.hits += 1
+                    return found
+                self.misses += 1
+                path, digest = self._store(self._render(self.fetch_source(url), variant, fmt), fmt)
+                self._write_ref(ref_path, digest)
+        finally:
+            with self._lock:
+                load_lock[1] -= 1
+                if not load_lock[1]:
+                    del self._load_locks[ref_path]
+        self.evict()
+        return path, digest
+
+    def evict(self):
+        """Delete least recently used blobs until the cache fits in max_bytes"""
+        if self.total_bytes <= self.max_bytes:
+            return 0
+        removed = 0
+        for path, _ in sorted(self._blobs(), key=lambda blob: blob[1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self.total_bytes -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+class PosterHandler(BaseHTTPRequestHandler):
+    """GET /poster/<movie_id>/<variant>?v=<version> and GET /static/<name>
+
+    WebP is served to clients that accept it and JPEG to the rest. The
+    server must carry ``posters`` (a PosterCache), ``resolve`` (movie_id ->
+    poster URL or None) and ``assets`` (see register_asset).
+    """
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'static':
+            return self._send_asset(parts[1])
+        if len(parts) != 3 or parts[0] != 'poster' or not parts[1].isdigit() or parts[2] not in VARIANTS:
+            return self.send_error(404)
+        url = self.server.resolve(int(parts[1]))
+        if not url:
+            return self.send_error(404)
+
+        fmt = 'webp' if 'image/webp' in self.headers.get('Accept', '') else 'jpeg'
+        try:
+            path, digest = self.server.posters.get(url, parts[2], fmt)
+        except Exception:
+            return self.send_error(502, "Could not fetch poster")
+
+        etag = f'"{digest}"'
+        self.send_response(304 if self.headers.get('If-None-Match') == etag else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', CACHE_CONTROL)
+        self.send_header('Vary', 'Accept')
+        if self.headers.get('If-None-Match') == etag:
+            return self.end_headers()
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.send_header('Content-Type', FORMATS[fmt][1])
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_asset(self, name):
+        asset = self.server.assets.get(name)
+        if asset is None:
+            return self.send_error(404)
+        data, compressed, content_type = asset
+        # Asset names carry a content hash, so the name is a valid ETag
+        etag = f'"{name}"'
+        not_modified = self.headers.get('If-None-Match') == etag
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', CACHE_CONTROL)
+        self.send_header('Vary', 'Accept-Encoding')
+        if not_modified:
+            return self.end_headers()
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            data = compressed
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def register_asset(server, name, data, content_type):
+    """Serve ``data`` at /static/<name>; ``name`` should change whenever ``data`` does"""
+    server.assets[name] = (data, gzip.compress(data), content_type)
+
+
+def make_server(posters, resolve, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), PosterHandler)
+    server.daemon_threads = True
+    server.posters = posters
+    server.resolve = resolve
+    server.assets = {}
+    return server
+
+
+def start_server(posters, resolve, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Serve posters from a daemon thread; returns the running server"""
+    server = make_server(posters, resolve, host, port)
+    threading.Thread(target=server.serve_forever, name="poster-server", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resized, cached movie posters")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache-dir', default='poster_cache')
+    parser.add_argument('--max-mb', type=int, default=512)
+    parser.add_argument('--fixtures', help="Read posters from this directory instead of downloading them")
+    args = parser.parse_args(argv)
+
+    import pymysql
+    from cache import TTLCache
+    from db_utils import DB_CONFIG, CATALOGUE_TTL
+    from theme import compile_stylesheet
+
+    urls = TTLCache(CATALOGUE_TTL)
+
+    def load_url(movie_id):
+        conn = pymysql.connect(**DB_CONFIG)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT poster_url FROM Movies WHERE movie_id = %s", (movie_id,))
+                row = cursor.fetchone()
+            return row['poster_url'] if row else None
+        finally:
+            conn.close()
+
+    posters = PosterCache(args.cache_dir, args.max_mb * 1024 * 1024, args.fixtures)
+    server = make_server(posters, lambda movie_id: urls.get_or_load(movie_id, lambda: load_url(movie_id)),
+                         args.host, args.port)
+    sheet = compile_stylesheet()
+    register_asset(server, sheet.filename, sheet.css.encode(), 'text/css; charset=utf-8')
+    print(f"Serving posters on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Page Render Profiler
+Filename: profiler.py
+
+Opt-in timing of each script rerun: set CINEBOOK_PROFILE=1 to profile every
+session, or switch it on from the admin sidebar for your own session. Each
+rerun is broken into nested sections with the number of DB statements and
+Streamlit elements created in each, drawn as a flame graph in the sidebar.
+Fragment reruns (seat clicks, result paging) are profiled on their own and
+listed under recent reruns. cProfile stats can be written to
+CINEBOOK_PROFILE_DIR (default ``profiles/``) for snakeviz or pstats; only
+the newest CINEBOOK_PROFILE_KEEP of them are kept.
+"""
+
+import contextvars
+import cProfile
+import functools
+import html
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+
+from query_metrics import watch_queries
+
+PROFILE_ALL = os.environ.get('CINEBOOK_PROFILE') == '1'
+PROFILE_DIR = os.environ.get('CINEBOOK_PROFILE_DIR', 'profiles')
+# cProfile dumps kept in PROFILE_DIR; older ones are deleted as new ones are written
+PROFILE_KEEP = int(os.environ.get('CINEBOOK_PROFILE_KEEP', '20'))
+# Reruns kept in the session for the "recent reruns" table
+HISTORY_SIZE = 10
+
+_active = contextvars.ContextVar('render_profiler', default=None)
+
+
+def _count_elements(method, kind):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = _active.get()
+        if profiler is not None:
+            profiler.on_element(kind(args, kwargs))
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _install_element_hooks():
+    """Count elements and layout blocks as they are queued for the browser.
+
+    These are private Streamlit methods (checked against 1.66);
+    if a release drops them, profiling carries on without element counts.
+    """
+    if getattr(DeltaGenerator, '_cinebook_profiled', False):
+        return True
+    if not all(callable(getattr(DeltaGenerator, name, None)) for name in ('_enqueue', '_block')):
+        return False
+    DeltaGenerator._enqueue = _count_elements(
+        DeltaGenerator._enqueue, lambda args, kwargs: args[0] if args else kwargs.get('delta_type', 'element'))
+    DeltaGenerator._block = _count_elements(DeltaGenerator._block, lambda args, kwargs: 'block')
+    DeltaGenerator._cinebook_profiled = True
+    return True
+
+
+COUNTS_ELEMENTS = _install_element_hooks()
+
+
+class _Section:
+    __slots__ = ('name', 'start', 'seconds', 'queries', 'query_seconds', 'elements', 'children')
+
+    def __init__(self, name, start=0.0):
+        self.name = name
+        self.start = start
+        self.seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.elements = 0
+        self.children = []
+
+    def total(self, attr):
+        return getattr(self, attr) + sum(child.total(attr) for child in self.children)
+
+
+class RenderProfiler:
+    """Times nested sections of one rerun and counts DB statements and elements.
+
+    Use as a context manager around the rerun; ``section(name)`` marks the
+    parts to time. With ``cprofile=True`` the rerun also runs under cProfile
+    so ``dump()`` can write the stats to disk.
+    """
+
+    def __init__(self, name, cprofile=False):
+        self.root = _Section(name)
+        self._stack = [self.root]
+        self.element_types = Counter()
+        self.query_names = Counter()
+        self._profile = cProfile.Profile() if cprofile else None
+        self.dump_path = None
+        self.at = datetime.now()
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._token = _active.set(self)
+        self._watch = watch_queries(self.on_query)
+        self._watch.__enter__()
+        if self._profile is not None:
+            try:
+                self._profile.enable()
+            except ValueError:
+                # Another profiler already owns this thread
+                self._profile = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is not None:
+            self._profile.disable()
+        self.root.seconds = time.perf_counter() - self._started
+        self._watch.__exit__(exc_type, exc, tb)
+        _active.reset(self._token)
+        return False
+
+    @contextmanager
+    def section(self, name):
+        started = time.perf_counter()
+        section = _Section(name, started - self._started)
+        self._stack[-1].children.append(section)
+        self._stack.append(section)
+        try:
+            yield section
+        finally:
+            section.seconds = time.perf_counter() - started
+            self._stack.pop()
+
+    def on_query(self, name, seconds):
+        section = self._stack[-1]
+        section.queries += 1
+        section.query_seconds += seconds
+        self.query_names[name] += 1
+
+    def on_element(self, kind):
+        self._stack[-1].elements += 1
+        self.element_types[kind] += 1
+
+    def dump(self, directory=PROFILE_DIR):
+        """Write the cProfile stats to ``directory``; returns the path or None"""
+        if self._profile is None:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'\W+', '-', self.root.name.lower()).strip('-')
+        self.dump_path = os.path.join(directory, f"{self.at:%Y%m%d-%H%M%S-%f}-{slug}.prof")
+        self._profile.dump_stats(self.dump_path)
+        _prune_dumps(directory)
+        return self.dump_path
+
+    def report(self):
+        """Plain dict of the rerun, small enough to keep in session state"""
+        sections = []
+
+        def walk(section, depth):
+            sections.append({
+                'name': section.name,
+                'depth': depth,
+                'start': section.start,
+                'seconds': section.seconds,
+                'queries': section.total('queries'),
+                'query_seconds': section.total('query_seconds'),
+                'elements': section.total('elements'),
+            })
+            for child in section.children:
+                walk(child, depth + 1)
+
+        walk(self.root, 0)
+        return {
+            'name': self.root.name,
+            'at': self.at.strftime('%H:%M:%S'),
+            'seconds': self.root.seconds,
+            'queries': self.root.total('queries'),
+            'query_seconds': self.root.total('query_seconds'),
+            'elements': self.root.total('elements'),
+            'sections': sections,
+            'element_types': dict(self.element_types.most_common()),
+            'query_names': dict(self.query_names.most_common()),
+            'dump_path': self.dump_path,
+        }
+
+
+def _prune_dumps(directory, keep=PROFILE_KEEP):
+    """Delete all but the newest ``keep`` dumps; names start with their timestamp"""
+    dumps = sorted(name for name in os.listdir(directory) if name.endswith('.prof'))
+    for name in dumps[:-keep] if keep > 0 else dumps:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            # Another session pruned it first
+            pass
+
+
+def profiling_enabled():
+    return PROFILE_ALL or bool(st.session_state.get('is_admin') and st.session_state.get('profile_enabled'))
+
+
+def section(name):
+    """Time a block as part of the current rerun; a no-op when not profiling"""
+    profiler = _active.get()
+    return profiler.section(name) if profiler is not None else nullcontext()
+
+
+def _remember(profiler):
+    profiler.dump()
+    history = st.session_state.setdefault('profile_history', [])
+    history.insert(0, profiler.report())
+    del history[HISTORY_SIZE:]
+
+
+def profiled(name):
+    """Decorator timing a page function as a section of the current rerun.
+
+    Fragments rerun without main(), so when no rerun is being profiled the
+    function gets a profiler of its own and its report joins the history.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active.get() is not None:
+                with section(name):
+                    return fn(*args, **kwargs)
+            if not profiling_enabled():
+                return fn(*args, **kwargs)
+            profiler = RenderProfiler(f"{name} (fragment)", st.session_state.get('profile_cprofile', False))
+            try:
+                with profiler:
+                    return fn(*args, **kwargs)
+            finally:
+                _remember(profiler)
+        return wrapper
+    return decorate
+
+
+def profile_rerun(render, name="rerun"):
+    """Run ``render()`` under a profiler when enabled and draw the breakdown in the sidebar"""
+    if not profiling_enabled():
+        return render()
+    profiler = RenderProfiler(name, st.session_state.get('profile_cprofile', False))
+    try:
+        with profiler:
+            render()
+    finally:
+        # st.rerun() unwinds through here too; its report shows on the next run
+        _remember(profiler)
+    show_profile(profiler.report())
+
+
+def flame_html(report):
+    """Icicle chart of the sections: width is wall time, depth is nesting"""
+    total = report['seconds'] or 1e-9
+    depth = max(section['depth'] for section in report['sections']) + 1
+    bars = []
+    for section in report['sections']:
+        left = min(section['start'] / total, 1.0) * 100
+        width = max(min(section['seconds'] / total, 1.0) * 100, 0.5)
+        db_share = min(section['query_seconds'] / section['seconds'], 1.0) if section['seconds'] else 0.0
+        # Redder sections spend more of their time waiting on the database
+        color = f"hsl({int(45 - 45 * db_share)}, 85%, {int(62 - 8 * db_share)}%)"
+        label = html.escape(section['name'])
+        title = (f"{label}: {section['seconds'] * 1000:.1f} ms, {section['queries']} queries "
+                 f"({section['query_seconds'] * 1000:.1f} ms), {section['elements']} elements")
+        bars.append(
+            f'<div title="{title}" style="position:absolute; left:{left:.2f}%; width:{width:.2f}%; '
+            f'top:{section["depth"] * 20}px; height:18px; background:{color}; border-radius:3px; '
+            f'overflow:hidden; white-space:nowrap; font-size:11px; line-height:18px; padding:0 3px; '
+            f'box-sizing:border-box; color:#1a202c;">{label}</div>'
+        )
+    return f'<div style="position:relative; height:{depth * 20}px;">{"".join(bars)}</div>'
+
+
+def show_profile(report):
+    with st.sidebar.expander(f"⏱️ Render profile: {report['seconds'] * 1000:.0f} ms", expanded=True):
+        elements = f"{report['elements']} elements" if COUNTS_ELEMENTS else "element counts unavailable"
+        st.caption(f"{report['queries']} DB queries ({report['query_seconds'] * 1000:.1f} ms) · {elements}")
+        st.markdown(flame_html(report), unsafe_allow_html=True)
+        st.dataframe(
+            [{'Section': '· ' * section['depth'] + section['name'],
+              'ms': round(section['seconds'] * 1000, 1),
+              'Queries': section['queries'],
+              'Elements': section['elements']} for section in report['sections']],
+            hide_index=True, use_container_width=True,
+        )
+        if report['query_names']:
+            st.caption("Queries: " + ", ".join(f"{name} ×{count}" for name, count in report['query_names'].items()))
+        st.caption("Elements: " + ", ".join(f"{kind} ×{count}" for kind, count in report['element_types'].items()))
+        st.checkbox("Write cProfile stats", key='profile_cprofile',
+                    help=f"Runs each rerun under cProfile and keeps the last {PROFILE_KEEP} stats files in {PROFILE_DIR}/")
+        if report['dump_path']:
+            st.caption(f"Saved `{report['dump_path']}`")
+
+        history = st.session_state.get('profile_history', [])[1:]
+        if history:
+            st.markdown("**Recent reruns**")
+            st.dataframe(
+                [{'At': past['at'], 'Rerun': past['name'], 'ms': round(past['seconds'] * 1000, 1),
+                  'Queries': past['queries'], 'Elements': past['elements']} for past in history],
+                hide_index=True, use_container_width=True,
+            )
@@ -0,0 +1,250 @@
+"""
+Query Instrumentation
+Filename: query_metrics.py
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('cinebook.queries')
+
+# Upper bounds in seconds, as in Prometheus' default histogram
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_query_name = contextvars.ContextVar('query_name', default='other')
+_listener = contextvars.ContextVar('query_listener', default=None)
+
+
+def named_query(name):
+    """Decorator tagging every query run inside the function with ``name``"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _query_name.set(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _query_name.reset(token)
+        return wrapper
+    return decorate
+
+
+def current_query():
+    return _query_name.get()
+
+
+@contextmanager
+def watch_queries(callback):
+    """Call ``callback(name, seconds)`` for every statement run in this context"""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def redact(params):
+    """Describe parameters by type only, so logs never carry user data"""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Bucket upper bound below which a ``q`` share of observations fall"""
+        if not self.count:
+            return 0.0
+        seen = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= q * self.count:
+                return bound
+        return float('inf')
+
+
+class QueryMetrics:
+    """Latency histograms, row and error counts per named query.
+
+    Queries slower than ``slow_seconds`` are logged to ``cinebook.queries``
+    with their parameters redacted; failing queries are logged with the error.
+    """
+
+    def __init__(self, slow_seconds=0.2):
+        self.slow_seconds = slow_seconds
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._acquire = {}
+        self._rows = {}
+        self._errors = {}
+        self._gauges = {}
+
+    def observe(self, name, seconds, rows=None, error=None):
+        with self._lock:
+            self._latency.setdefault(name, _Histogram()).observe(seconds)
+            if rows is not None and rows >= 0:
+                self._rows[name] = self._rows.get(name, 0) + rows
+            if error is not None:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    def observe_acquire(self, name, seconds):
+        with self._lock:
+            self._acquire.setdefault(name, _Histogram()).observe(seconds)
+
+    def add_gauge(self, name, help_text, read):
+        """Export ``read()`` (a number or {label: number}) as a gauge"""
+        self._gauges[name] = (help_text, read)
+
+    def summary(self):
+        """{query: {'count', 'errors', 'rows', 'avg_ms', 'p95_ms'}} for dashboards"""
+        with self._lock:
+            return {
+                name: {
+                    'count': hist.count,
+                    'errors': self._errors.get(name, 0),
+                    'rows': self._rows.get(name, 0),
+                    'avg_ms': hist.total / hist.count * 1000 if hist.count else 0.0,
+                    'p95_ms': hist.quantile(0.95) * 1000,
+                }
+                for name, hist in sorted(self._latency.items())
+            }
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def histogram(metric, help_text, histograms):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, hist in sorted(histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float('inf'),), hist.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{metric}_bucket{{query="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{query="{name}"}} {hist.total:.6f}')
+                lines.append(f'{metric}_count{{query="{name}"}} {hist.count}')
+
+        def counter(metric, help_text, values):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, value in sorted(values.items()):
+                lines.append(f'{metric}{{query="{name}"}} {value}')
+
+        with self._lock:
+            histogram('cinebook_query_duration_seconds', "Time spent in cursor.execute by query.", self._latency)
+            histogram('cinebook_connection_acquire_seconds', "Time spent borrowing a pooled connection.",
+                      self._acquire)
+            counter('cinebook_query_rows_total', "Rows returned or affected by query.", self._rows)
+            counter('cinebook_query_errors_total', "Failed statements by query.", self._errors)
+
+        for metric, (help_text, read) in sorted(self._gauges.items()):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            value = read()
+            if isinstance(value, dict):
+                for label, number in sorted(value.items()):
+                    lines.append(f'{metric}{{state="{label}"}} {number}')
+            else:
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times execute()/executemany() and reports to QueryMetrics"""
+
+    def __init__(self, cursor, metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    @staticmethod
+    def _notify(name, seconds):
+        listener = _listener.get()
+        if listener is not None:
+            listener(name, seconds)
+
+    def _timed(self, method, query, args):
+        name = current_query()
+        started = time.perf_counter()
+        try:
+            result = getattr(self._cursor, method)(query, args)
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            self._metrics.observe(name, elapsed, error=e)
+            self._notify(name, elapsed)
+            logger.error("%s failed after %.1f ms: %s; sql=%s params=%s", name, elapsed * 1000, e,
+                         ' '.join(query.split()), redact(args) if method == 'execute' else f"{len(args)} rows")
+            raise
+        elapsed = time.perf_counter() - started
+        self._metrics.observe(name, elapsed, rows=self._cursor.rowcount)
+        self._notify(name, elapsed)
+        if elapsed >= self._metrics.slow_seconds:
+            logger.warning("slow query %s: %.1f ms, %s rows; sql=%s params=%s", name, elapsed * 1000,
+                           self._cursor.rowcount, ' '.join(query.split()),
+                           redact(args) if method == 'execute' else f"{len(args)} rows")
+        return result
+
+    def execute(self, query, args=None):
+        return self._timed('execute', query, args)
+
+    def executemany(self, query, args):
+        args = list(args)
+        return self._timed('executemany', query, args)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            return self.send_error(404)
+        body = self.server.metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(metrics, host='127.0.0.1', port=9108):
+    """Serve GET /metrics from a daemon thread; returns the running server"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
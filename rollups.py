@@ -0,0 +1,191 @@
+"""
+Incremental Metric Rollups
+Filename: rollups.py
+"""
+
+import random
+import threading
+
+# Hot counters are split over this many rows so concurrent bookings for
+# different showtimes don't all queue on the same row lock
+COUNTER_SHARDS = 16
+
+# Aggregate table -> (key column, query computing the true values from Bookings)
+ROLLUP_TABLES = {
+    'DailySales': ('day', """
+        SELECT DATE(booking_date) AS k, COUNT(*) AS bookings, SUM(tickets_booked) AS tickets
+        FROM Bookings GROUP BY DATE(booking_date)
+    """),
+    'MovieSales': ('movie_id', """
+        SELECT s.movie_id AS k, COUNT(*) AS bookings, SUM(b.tickets_booked) AS tickets
+        FROM Bookings b JOIN Showtimes s ON b.showtime_id = s.showtime_id
+        GROUP BY s.movie_id
+    """),
+    'ShowtimeSales': ('showtime_id', """
+        SELECT showtime_id AS k, COUNT(*) AS bookings, SUM(tickets_booked) AS tickets
+        FROM Bookings GROUP BY showtime_id
+    """),
+}
+
+# Named lock held for a whole reconcile() run; every app process starts a
+# reconciler and two overlapping runs would apply the same deltas twice
+RECONCILE_LOCK = 'cinebook_rollup_reconcile'
+
+
+def _add_counters(cursor, increments, shard):
+    cursor.executemany(
+        "INSERT INTO MetricCounters (name, shard, value) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE value = value + VALUES(value)",
+        [(name, shard, amount) for name, amount in increments.items()]
+    )
+
+
+def _add_sales(cursor, table, key, bookings, tickets, shard):
+    key_column = ROLLUP_TABLES[table][0]
+    cursor.execute(
+        f"INSERT INTO {table} ({key_column}, shard, bookings, tickets) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE bookings = bookings + VALUES(bookings), tickets = tickets + VALUES(tickets)",
+        (key, shard, bookings, tickets)
+    )
+
+
+def record_booking(cursor, movie_id, showtime_id, tickets, booked_at):
+    """Update every rollup for a new booking, inside the booking's own transaction"""
+    shard = showtime_id % COUNTER_SHARDS
+    _add_counters(cursor, {'bookings': 1, 'tickets': tickets}, shard)
+    _add_sales(cursor, 'DailySales', booked_at.date(), 1, tickets, shard)
+    _add_sales(cursor, 'MovieSales', movie_id, 1, tickets, shard)
+    _add_sales(cursor, 'ShowtimeSales', showtime_id, 1, tickets, shard)
+
+
+def record_bookings(cursor, bookings):
+    """Batch form of record_booking for many (movie_id, showtime_id, tickets, booked_at).
+
+    Increments are summed per row first and written in key order, so two
+    concurrent batches lock the rollup rows in the same order.
+    """
+    counters = {}
+    sales = {table: {} for table in ROLLUP_TABLES}
+    for movie_id, showtime_id, tickets, booked_at in bookings:
+        shard = showtime_id % COUNTER_SHARDS
+        for name, amount in (('bookings', 1), ('tickets', tickets)):
+            counters[name, shard] = counters.get((name, shard), 0) + amount
+        for table, key in (('DailySales', booked_at.date()), ('MovieSales', movie_id),
+                           ('ShowtimeSales', showtime_id)):
+            count, total = sales[table].get((key, shard), (0, 0))
+            sales[table][key, shard] = (count + 1, total + tickets)
+    if not counters:
+        return
+    cursor.executemany(
+        "INSERT INTO MetricCounters (name, shard, value) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE value = value + VALUES(value)",
+        [(name, shard, amount) for (name, shard), amount in sorted(counters.items())]
+    )
+    for table, rows in sales.items():
+        key_column = ROLLUP_TABLES[table][0]
+        cursor.executemany(
+            f"INSERT INTO {table} ({key_column}, shard, bookings, tickets) VALUES (%s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE bookings = bookings + VALUES(bookings), tickets = tickets + VALUES(tickets)",
+            [(key, shard, count, total) for (key, shard), (count, total) in sorted(rows.items())]
+        )
+
+
+def record_registration(cursor):
+    _add_counters(cursor, {'users': 1}, random.randrange(COUNTER_SHARDS))
+
+
+def read_totals(cursor):
+    """Running totals as {'users': n, 'bookings': n, 'tickets': n}"""
+    cursor.execute("SELECT name, SUM(value) AS value FROM MetricCounters GROUP BY name")
+    totals = {'users': 0, 'bookings': 0, 'tickets': 0}
+    for row in cursor.fetchall():
+        totals[row['name']] = int(row['value'] or 0)
+    return totals
+
+
+def reconcile(conn):
+    """Correct any drift between the rollups and the base tables.
+
+    Base aggregates and rollups are read in one consistent snapshot. Bookings
+    always update both in the same transaction, so the difference seen there
+    stays valid after the snapshot and can be added as a delta without
+    blocking live bookings. Returns the number of corrected rows, or None
+    when another process is already reconciling.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK(%s, 0) AS locked", (RECONCILE_LOCK,))
+    if not cursor.fetchone()['locked']:
+        cursor.close()
+        return None
+    try:
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        cursor.execute("""
+            SELECT (SELECT COUNT(*) FROM Users) AS users,
+                   (SELECT COUNT(*) FROM Bookings) AS bookings,
+                   (SELECT COALESCE(SUM(tickets_booked), 0) FROM Bookings) AS tickets
+        """)
+        expected = {name: int(value) for name, value in cursor.fetchone().items()}
+        actual = read_totals(cursor)
+        counter_deltas = {name: expected[name] - actual[name] for name in expected
+                          if expected[name] != actual[name]}
+
+        sales_deltas = {}
+        for table, (key_column, base_query) in ROLLUP_TABLES.items():
+            cursor.execute(base_query)
+            true_values = {row['k']: (int(row['bookings']), int(row['tickets'] or 0)) for row in cursor.fetchall()}
+            cursor.execute(
+                f"SELECT {key_column} AS k, SUM(bookings) AS bookings, SUM(tickets) AS tickets "
+                f"FROM {table} GROUP BY {key_column}"
+            )
+            rolled = {row['k']: (int(row['bookings']), int(row['tickets'])) for row in cursor.fetchall()}
+            deltas = []
+            for key in true_values.keys() | rolled.keys():
+                want, have = true_values.get(key, (0, 0)), rolled.get(key, (0, 0))
+                if want != have:
+                    deltas.append((key, want[0] - have[0], want[1] - have[1]))
+            sales_deltas[table] = deltas
+        conn.commit()
+
+        if counter_deltas:
+            _add_counters(cursor, counter_deltas, 0)
+        for table, deltas in sales_deltas.items():
+            for key, bookings, tickets in deltas:
+                _add_sales(cursor, table, key, bookings, tickets, 0)
+        conn.commit()
+        return len(counter_deltas) + sum(len(d) for d in sales_deltas.values())
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (RECONCILE_LOCK,))
+        cursor.fetchall()
+        cursor.close()
+
+
+class RollupReconciler(threading.Thread):
+    """Daemon thread that runs reconcile() at start-up and then every ``interval`` seconds"""
+
+    def __init__(self, connect, interval=3600.0):
+        super().__init__(name="rollup-reconciler", daemon=True)
+        self._connect = connect
+        self.interval = interval
+        self.last_corrections = None
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                if conn:
+                    self.last_corrections = reconcile(conn)
+            except Exception:
+                # Retried on the next tick
+                pass
+            finally:
+                if conn:
+                    conn.close()
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,194 @@
+"""
+Temporary Seat Holds
+Filename: seat_holds.py
+"""
+
+import heapq
+import threading
+import time
+
+HOLD_TTL = 300  # seconds a picked seat stays reserved for its session
+# The MySQL store uses the SeatHolds table (see migrations.py)
+
+
+class InMemoryHoldStore:
+    """Process-local hold store. Expired holds are ignored on read and
+    released in bulk by sweep()."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._holds = {}        # showtime_id -> {seat: (owner, expires_at)}
+        self._expiry = []       # heap of (expires_at, showtime_id, seat)
+
+    def hold(self, showtime_id, seats, owner, ttl=HOLD_TTL):
+        """Hold (or refresh) seats for ``owner``; returns seats held by someone else"""
+        if not seats:
+            return []
+        now = self._clock()
+        expires_at = now + ttl
+        conflicts = []
+        with self._lock:
+            holds = self._holds.setdefault(showtime_id, {})
+            for seat in seats:
+                current = holds.get(seat)
+                if current and current[0] != owner and current[1] > now:
+                    conflicts.append(seat)
+                    continue
+                holds[seat] = (owner, expires_at)
+                heapq.heappush(self._expiry, (expires_at, showtime_id, seat))
+        return conflicts
+
+    def release(self, showtime_id, seats, owner):
+        with self._lock:
+            holds = self._holds.get(showtime_id)
+            if not holds:
+                return
+            for seat in seats:
+                current = holds.get(seat)
+                if current and current[0] == owner:
+                    del holds[seat]
+            if not holds:
+                del self._holds[showtime_id]
+
+    def held_by_others(self, showtime_id, owner):
+        """Set of seats in a showtime currently held by other sessions"""
+        now = self._clock()
+        with self._lock:
+            return {
+                seat for seat, (holder, expires_at) in self._holds.get(showtime_id, {}).items()
+                if holder != owner and expires_at > now
+            }
+
+    def sweep(self):
+        """Drop every expired hold; returns how many were released"""
+        now = self._clock()
+        released = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, showtime_id, seat = heapq.heappop(self._expiry)
+                holds = self._holds.get(showtime_id, {})
+                current = holds.get(seat)
+                # Skip heap entries superseded by a later refresh
+                if current and current[1] == expires_at:
+                    del holds[seat]
+                    if not holds:
+                        del self._holds[showtime_id]
+                    released += 1
+        return released
+
+
+class MySQLHoldStore:
+    """Hold store backed by the SeatHolds table, shared by every app process"""
+
+    def __init__(self, connect, sweep_batch=5000):
+        self._connect = connect
+        self.sweep_batch = sweep_batch
+
+    def hold(self, showtime_id, seats, owner, ttl=HOLD_TTL):
+        if not seats:
+            return []
+        conn = self._connect()
+        if not conn:
+            return list(seats)
+        cursor = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(seats))
+            # Expired holds of other sessions can be taken over
+            cursor.execute(
+                f"DELETE FROM SeatHolds WHERE showtime_id = %s AND seat_label IN ({placeholders}) "
+                "AND expires_at < NOW(3)",
+                (showtime_id, *seats)
+            )
+            cursor.executemany(
+                "INSERT INTO SeatHolds (showtime_id, seat_label, owner, expires_at) "
+                "VALUES (%s, %s, %s, NOW(3) + INTERVAL %s SECOND) "
+                "ON DUPLICATE KEY UPDATE expires_at = IF(owner = VALUES(owner), VALUES(expires_at), expires_at)",
+                [(showtime_id, seat, owner, ttl) for seat in seats]
+            )
+            cursor.execute(
+                f"SELECT seat_label FROM SeatHolds WHERE showtime_id = %s AND seat_label IN ({placeholders}) "
+                "AND owner <> %s",
+                (showtime_id, *seats, owner)
+            )
+            conflicts = [row['seat_label'] for row in cursor.fetchall()]
+            conn.commit()
+            return conflicts
+        finally:
+            cursor.close()
+            conn.close()
+
+    def release(self, showtime_id, seats, owner):
+        if not seats:
+            return
+        conn = self._connect()
+        if not conn:
+            return
+        cursor = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(seats))
+            cursor.execute(
+                f"DELETE FROM SeatHolds WHERE showtime_id = %s AND seat_label IN ({placeholders}) AND owner = %s",
+                (showtime_id, *seats, owner)
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def held_by_others(self, showtime_id, owner):
+        conn = self._connect()
+        if not conn:
+            return set()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT seat_label FROM SeatHolds WHERE showtime_id = %s AND owner <> %s AND expires_at > NOW(3)",
+                (showtime_id, owner)
+            )
+            return {row['seat_label'] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def sweep(self):
+        conn = self._connect()
+        if not conn:
+            return 0
+        cursor = conn.cursor()
+        released = 0
+        try:
+            # Small batches keep each DELETE's lock footprint short
+            while True:
+                cursor.execute(
+                    "DELETE FROM SeatHolds WHERE expires_at < NOW(3) LIMIT %s",
+                    (self.sweep_batch,)
+                )
+                conn.commit()
+                released += cursor.rowcount
+                if cursor.rowcount < self.sweep_batch:
+                    return released
+        finally:
+            cursor.close()
+            conn.close()
+
+
+class HoldSweeper(threading.Thread):
+    """Daemon thread that periodically releases expired holds"""
+
+    def __init__(self, store, interval=15.0):
+        super().__init__(name="seat-hold-sweeper", daemon=True)
+        self.store = store
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.store.sweep()
+            except Exception:
+                # A failed sweep is retried on the next tick
+                pass
+
+    def stop(self):
+        self._stopped.set()
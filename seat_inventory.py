@@ -0,0 +1,113 @@
+"""
+Seat Inventory Bitmaps
+Filename: seat_inventory.py
+"""
+
+import json
+from functools import lru_cache
+
+# Tables: SeatInventory holds one bitmap per showtime (bit N set = seat position N
+# booked); Screens point at SeatLayouts. See migrations.py for the schema.
+# Layouts that bitmaps were written under are frozen by triggers (migration 9).
+
+# SeatInventory.seat_bitmap is VARBINARY(1024): one bit per seat
+MAX_SEATS = 1024 * 8
+
+
+class SeatLayout:
+    """Maps seat labels (e.g. 'C7') to integer bit positions.
+
+    ``rows`` is a list of ``(row_label, seat_count)`` pairs or of dicts like
+    ``{"label": "A", "seats": 12, "aisles": [4, 8], "missing": [1], "class": "premium"}``
+    where ``aisles`` are seat numbers followed by a gap and ``missing`` seat
+    numbers are left empty (pillars, wheelchair spaces). Positions run row by row.
+    """
+
+    def __init__(self, rows):
+        self.rows = []          # (row_label, cells) where a cell is a seat label or None for a gap
+        self.labels = []
+        self.seat_class = {}
+        for row in rows:
+            if isinstance(row, dict):
+                label, count = str(row['label']), int(row['seats'])
+                aisles = set(row.get('aisles', ()))
+                missing = set(row.get('missing', ()))
+                seat_class = row.get('class', 'standard')
+            else:
+                label, count = str(row[0]), int(row[1])
+                aisles, missing, seat_class = set(), set(), 'standard'
+
+            cells = []
+            for num in range(1, count + 1):
+                if num in missing:
+                    cells.append(None)
+                else:
+                    seat = f"{label}{num}"
+                    cells.append(seat)
+                    self.labels.append(seat)
+                    self.seat_class[seat] = seat_class
+                if num in aisles:
+                    cells.append(None)
+            self.rows.append((label, cells))
+
+        self.positions = {label: pos for pos, label in enumerate(self.labels)}
+        self.size = len(self.labels)
+        if self.size > MAX_SEATS:
+            raise ValueError(f"Seat layout has {self.size} seats; bitmaps hold at most {MAX_SEATS}")
+        self.nbytes = (self.size + 7) // 8
+        self.width = max((len(cells) for _, cells in self.rows), default=0)
+        self.class_masks = {}
+        for seat, seat_class in self.seat_class.items():
+            self.class_masks[seat_class] = self.class_masks.get(seat_class, 0) | (1 << self.positions[seat])
+
+    @classmethod
+    def grid(cls, row_labels, seats_per_row):
+        return cls([(label, seats_per_row) for label in row_labels])
+
+    def position(self, label):
+        return self.positions[label]
+
+    def to_mask(self, labels):
+        """Integer mask with one bit set per seat label"""
+        mask = 0
+        for label in labels:
+            mask |= 1 << self.positions[label]
+        return mask
+
+    def to_labels(self, mask):
+        """Set of seat labels whose bit is set in ``mask``"""
+        labels = set()
+        while mask:
+            low = mask & -mask
+            labels.add(self.labels[low.bit_length() - 1])
+            mask ^= low
+        return labels
+
+    def encode(self, mask):
+        return mask.to_bytes(self.nbytes, 'little')
+
+    def decode(self, blob):
+        if not blob:
+            return 0
+        return int.from_bytes(bytes(blob), 'little')
+
+    def empty_bitmap(self):
+        return bytes(self.nbytes)
+
+    def bitmap_from_csv(self, seat_strings):
+        """Build a bitmap from legacy comma-joined Bookings.seat_numbers values"""
+        mask = 0
+        for seat_numbers in seat_strings:
+            if seat_numbers:
+                mask |= self.to_mask(s.strip() for s in seat_numbers.split(',') if s.strip() in self.positions)
+        return self.encode(mask)
+
+
+# The 10x10 A-J hall used when a showtime has no screen assigned
+DEFAULT_LAYOUT = SeatLayout.grid('ABCDEFGHIJ', 10)
+
+
+@lru_cache(maxsize=128)
+def compile_layout(layout_json):
+    """Build the seat index for a stored layout once; screens sharing a layout share the index"""
+    return SeatLayout(json.loads(layout_json)['rows'])
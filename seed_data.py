@@ -0,0 +1,362 @@
+"""
+Synthetic Data Generator
+Filename: seed_data.py
+Run with: python seed_data.py (--sqlite FILE | --mysql-database NAME) [--scale 1.0] [--method insert|load-data]
+
+Generates a large, realistically skewed dataset into a fresh database:
+a few blockbusters draw most showtimes and bookings, weekend and evening
+shows sell best, groups of 1-6 sit together and the middle rows fill
+first. Rows are streamed in chunks and written with multi-row INSERTs or
+LOAD DATA LOCAL INFILE, then SeatInventory, the sales rollups and the
+movie facets are derived from the same data so the app starts consistent.
+Every user's password is "password".
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pymysql
+
+import migrations
+import movie_search
+from passwords import hash_password
+from rollups import ROLLUP_TABLES
+from seat_inventory import DEFAULT_LAYOUT
+
+# Row counts at --scale 1.0; bookings are capped by seat capacity (showtimes x 100)
+USERS = 2000000
+MOVIES = 5000
+SHOWTIMES = 500000
+BOOKINGS = 12000000
+CHUNK_ROWS = 200000
+
+GENRES = {'Drama': 0.22, 'Action': 0.2, 'Comedy': 0.18, 'Thriller': 0.12, 'Romance': 0.1,
+          'Horror': 0.07, 'Sci-Fi': 0.06, 'Animation': 0.05}
+LANGUAGES = {'Hindi': 0.45, 'English': 0.3, 'Tamil': 0.1, 'Telugu': 0.1, 'Malayalam': 0.05}
+SHOW_HOURS = {10: 0.08, 13: 0.14, 16: 0.2, 19: 0.34, 22: 0.24}
+TICKETS = {1: 0.22, 2: 0.38, 3: 0.14, 4: 0.15, 5: 0.06, 6: 0.05}
+WEEKEND_BOOST = 1.8
+CANCEL_RATE = 0.04
+WORDS = ("love war city night last secret return rise dark light king game road story heart "
+         "storm home final edge dream fire shadow river code ghost mission").split()
+
+
+def _weighted(rng, options, size):
+    return rng.choice(list(options), size=size, p=np.array(list(options.values())) / sum(options.values()))
+
+
+class Writer:
+    """Writes row chunks with multi-row INSERTs, or LOAD DATA LOCAL INFILE on MySQL"""
+
+    def __init__(self, db, method='insert'):
+        self.db = db
+        self.method = method if db.dialect == 'mysql' else 'insert'
+        if db.dialect == 'mysql':
+            db.execute("SET foreign_key_checks = 0")
+            db.execute("SET unique_checks = 0")
+
+    @staticmethod
+    def _field(value):
+        """One LOAD DATA field: bare NULL and numbers, hex for bytes, everything else quoted.
+
+        With ESCAPED BY '' only an unquoted NULL is read as NULL, and a quoted
+        field may hold newlines and doubled quotes.
+        """
+        if value is None:
+            return 'NULL'
+        if isinstance(value, bytes):
+            return value.hex()
+        if isinstance(value, (int, float)):
+            return str(value)
+        return '"' + str(value).replace('"', '""') + '"'
+
+    def write(self, table, columns, rows):
+        if not rows:
+            return
+        if self.method == 'load-data':
+            # Binary columns go through a hex user variable, LOAD DATA has no raw byte escape
+            binary = [isinstance(value, bytes) for value in rows[0]]
+            targets = [f"@{column}_hex" if is_binary else column for column, is_binary in zip(columns, binary)]
+            assignments = [f"{column} = UNHEX(@{column}_hex)" for column, is_binary in zip(columns, binary) if is_binary]
+            with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as f:
+                for row in rows:
+                    f.write(','.join(self._field(value) for value in row) + '\n')
+            try:
+                self.db.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} FIELDS TERMINATED BY ',' "
+                    f"OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' LINES TERMINATED BY '\\n' ({', '.join(targets)})"
+                    + (f" SET {', '.join(assignments)}" if assignments else ""),
+                    (f.name,)
+                )
+            finally:
+                os.remove(f.name)
+        else:
+            cursor = self.db.conn.cursor()
+            cursor.executemany(
+                self.db.translate(f"INSERT INTO {table} ({', '.join(columns)}) "
+                                  f"VALUES ({', '.join(['%s'] * len(columns))})"),
+                rows
+            )
+            cursor.close()
+        self.db.commit()
+
+
+def generate_users(rng, count, start):
+    password = hash_password('password')
+    for first in range(1, count + 1, CHUNK_ROWS):
+        ids = range(first, min(first + CHUNK_ROWS, count + 1))
+        offsets = rng.integers(0, 730 * 86400, size=len(ids))
+        yield [(user_id, f"user{user_id}", password, f"user{user_id}@example.com", 0,
+                start - timedelta(seconds=int(offset)))
+               for user_id, offset in zip(ids, offsets)]
+
+
+def generate_movies(rng, count):
+    """Movie rows plus each movie's share of demand (Zipf by movie_id)"""
+    popularity = 1.0 / np.arange(1, count + 1) ** 1.1
+    popularity /= popularity.sum()
+    genres = _weighted(rng, GENRES, count)
+    languages = _weighted(rng, LANGUAGES, count)
+    ratings = np.clip(rng.normal(6.8, 1.2, count), 1, 10).round(1)
+    years = 2025 - np.minimum(rng.geometric(0.25, count) - 1, 40)
+    durations = np.clip(rng.normal(135, 20, count), 80, 200).astype(int)
+    rows = []
+    for i in range(count):
+        words = rng.choice(WORDS, size=rng.integers(1, 4))
+        title = ' '.join(w.capitalize() for w in words) + f" {i + 1}"
+        description = f"A {genres[i].lower()} about {' and '.join(rng.choice(WORDS, size=3))}."
+        rows.append((i + 1, title, str(genres[i]), str(languages[i]), int(durations[i]), float(ratings[i]),
+                     int(years[i]), description, f"https://posters.example.com/{i + 1}.jpg"))
+    return rows, popularity
+
+
+def generate_showtimes(rng, count, popularity, first_day, days):
+    """Showtimes spread over movies by popularity, plus each one's booking weight"""
+    share = popularity ** 0.6
+    per_movie = np.maximum(1, np.floor(share / share.sum() * count)).astype(int)
+    movie_ids = np.repeat(np.arange(1, len(popularity) + 1), per_movie)[:count]
+    count = len(movie_ids)
+    day_offsets = rng.integers(0, days, size=count)
+    hours = _weighted(rng, SHOW_HOURS, count)
+    dates = [first_day + timedelta(days=int(d)) for d in day_offsets]
+    weekend = np.array([d.weekday() >= 4 for d in dates])
+    hour_weight = np.array([SHOW_HOURS[h] for h in hours])
+    prices = np.where(weekend, 250.0, 200.0) + np.where(hours >= 19, 50.0, 0.0)
+    weight = (popularity[movie_ids - 1] / per_movie[movie_ids - 1]) * np.where(weekend, WEEKEND_BOOST, 1.0) * hour_weight
+    rows = [(i + 1, int(movie_ids[i]), None, dates[i], f"{int(hours[i]):02d}:00:00", DEFAULT_LAYOUT.size,
+             float(prices[i]))
+            for i in range(count)]
+    return rows, weight / weight.sum()
+
+
+class SeatAllocator:
+    """Seats groups together, filling rows from the preferred middle-back row outwards"""
+
+    def __init__(self, showtimes, layout=DEFAULT_LAYOUT):
+        self.layout = layout
+        rows = [[label for label in cells if label is not None] for _, cells in layout.rows]
+        sweet_spot = 0.6 * (len(rows) - 1)
+        self.rows = sorted(rows, key=lambda row: abs(rows.index(row) - sweet_spot))
+        self.row = [0] * showtimes
+        self.left = [len(self.rows[0]) // 2] * showtimes
+        self.right = list(self.left)
+        self.taken = [0] * showtimes
+        self.masks = [0] * showtimes
+        # Smallest group size that no longer fits, so full shows are rejected at once
+        self.no_room = [len(layout.labels) + 1] * showtimes
+
+    def allocate(self, showtime, count, keep=True):
+        """Seat labels for ``count`` adjacent seats, or None when the show is full"""
+        if count >= self.no_room[showtime]:
+            return None
+        row, left, right = self.row[showtime], self.left[showtime], self.right[showtime]
+        while row < len(self.rows):
+            seats = self.rows[row]
+            if right + count <= len(seats):
+                block, right = seats[right:right + count], right + count
+                break
+            if left - count >= 0:
+                block, left = seats[left - count:left], left - count
+                break
+            row += 1
+            left = right = len(self.rows[row]) // 2 if row < len(self.rows) else 0
+        else:
+            self.no_room[showtime] = count
+            return None
+        if keep:
+            self.row[showtime], self.left[showtime], self.right[showtime] = row, left, right
+            self.taken[showtime] += count
+            self.masks[showtime] |= self.layout.to_mask(block)
+        return block
+
+
+def generate_bookings(rng, count, users, showtimes, weights, allocator, rollups):
+    """Booking rows in chunks; demand for a sold-out showtime spills over to others"""
+    booking_id = 0
+    remaining = count
+    # Nobody books in the future: tickets for upcoming shows were bought before now
+    now = datetime.now().replace(microsecond=0)
+    starts = [min(datetime.combine(row[3], datetime.strptime(row[4], '%H:%M:%S').time()), now)
+              for row in showtimes]
+    while remaining > 0:
+        size = min(CHUNK_ROWS, remaining)
+        picks = rng.choice(len(showtimes), size=size, p=weights)
+        tickets = _weighted(rng, TICKETS, size)
+        # Power users: a small share of accounts make most bookings
+        user_ids = (users * rng.random(size) ** 2).astype(int) + 1
+        leads = rng.exponential(3 * 86400, size)
+        cancelled = rng.random(size) < CANCEL_RATE
+        spill = rng.integers(0, len(showtimes), size)
+        rows = []
+        for i in range(size):
+            index = int(picks[i])
+            for attempt in range(50):
+                seats = allocator.allocate(index, int(tickets[i]), keep=not cancelled[i])
+                if seats:
+                    break
+                # Sold out: try the next show of the same movie, then anything with room
+                index = (index + 1 if attempt < 3 else int(spill[i]) + attempt * 7919) % len(showtimes)
+            else:
+                continue
+            booked_at = starts[index] - timedelta(seconds=int(leads[i]) + 600)
+            booking_id += 1
+            rows.append((booking_id, int(user_ids[i]), index + 1, len(seats), booked_at, ','.join(seats),
+                         'cancelled' if cancelled[i] else 'confirmed'))
+            rollups.add(showtimes[index][1], index + 1, len(seats), booked_at.date())
+        remaining -= size
+        yield rows
+
+
+class RollupTotals:
+    """The rollup tables' contents, accumulated while bookings are generated"""
+
+    def __init__(self):
+        self.bookings = 0
+        self.tickets = 0
+        self.sales = {table: {} for table in ROLLUP_TABLES}
+
+    def add(self, movie_id, showtime_id, tickets, day):
+        self.bookings += 1
+        self.tickets += tickets
+        for table, key in (('DailySales', day), ('MovieSales', movie_id), ('ShowtimeSales', showtime_id)):
+            count, total = self.sales[table].get(key, (0, 0))
+            self.sales[table][key] = (count + 1, total + tickets)
+
+
+def _timed(label, rows_written, started):
+    elapsed = time.perf_counter() - started
+    print(f"{label:14} {rows_written:>11,} rows  {elapsed:7.1f}s  {rows_written / max(elapsed, 1e-9):>10,.0f} rows/s")
+
+
+def seed(db, writer, rng, users, movies, showtimes, bookings, first_day, days):
+    started = time.perf_counter()
+    total = 0
+    for rows in generate_users(rng, users, datetime.combine(first_day, datetime.min.time())):
+        writer.write('Users', ('user_id', 'username', 'password_hash', 'email', 'is_admin', 'created_at'), rows)
+        total += len(rows)
+    _timed('Users', total, started)
+
+    started = time.perf_counter()
+    movie_rows, popularity = generate_movies(rng, movies)
+    for first in range(0, len(movie_rows), CHUNK_ROWS):
+        writer.write('Movies', ('movie_id', 'title', 'genre', 'language', 'duration', 'rating', 'release_year',
+                                'description', 'poster_url'), movie_rows[first:first + CHUNK_ROWS])
+    _timed('Movies', len(movie_rows), started)
+
+    started = time.perf_counter()
+    showtime_rows, weights = generate_showtimes(rng, showtimes, popularity, first_day, days)
+    for first in range(0, len(showtime_rows), CHUNK_ROWS):
+        writer.write('Showtimes', ('showtime_id', 'movie_id', 'screen_id', 'show_date', 'show_time',
+                                   'available_seats', 'ticket_price'), showtime_rows[first:first + CHUNK_ROWS])
+    _timed('Showtimes', len(showtime_rows), started)
+
+    started = time.perf_counter()
+    allocator = SeatAllocator(len(showtime_rows))
+    rollups = RollupTotals()
+    total = 0
+    for rows in generate_bookings(rng, bookings, users, showtime_rows, weights, allocator, rollups):
+        writer.write('Bookings', ('booking_id', 'user_id', 'showtime_id', 'tickets_booked', 'booking_date',
+                                  'seat_numbers', 'status'), rows)
+        total += len(rows)
+    _timed('Bookings', total, started)
+
+    # Derived tables, so the app never has to rebuild them from Bookings
+    started = time.perf_counter()
+    layout = allocator.layout
+    for first in range(0, len(showtime_rows), CHUNK_ROWS):
+        indexes = range(first, min(first + CHUNK_ROWS, len(showtime_rows)))
+        writer.write('SeatInventory', ('showtime_id', 'seat_bitmap'),
+                     [(i + 1, layout.encode(allocator.masks[i])) for i in indexes])
+    db.conn.cursor().executemany(
+        db.translate("UPDATE Showtimes SET available_seats = %s WHERE showtime_id = %s"),
+        [(layout.size - taken, i + 1) for i, taken in enumerate(allocator.taken) if taken]
+    )
+    db.commit()
+    writer.write('MetricCounters', ('name', 'shard', 'value'),
+                 [('users', 0, users), ('bookings', 0, rollups.bookings), ('tickets', 0, rollups.tickets)])
+    for table, (key_column, _) in ROLLUP_TABLES.items():
+        items = list(rollups.sales[table].items())
+        for first in range(0, len(items), CHUNK_ROWS):
+            writer.write(table, (key_column, 'shard', 'bookings', 'tickets'),
+                         [(key, 0, count, tickets) for key, (count, tickets) in items[first:first + CHUNK_ROWS]])
+    cursor = db.conn.cursor()
+    movie_search.refresh_facets(cursor)
+    cursor.close()
+    db.commit()
+    _timed('Derived', len(showtime_rows), started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a large synthetic dataset")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--sqlite', help="SQLite file to create")
+    target.add_argument('--mysql-database', help="Database on the DB_CONFIG server, dropped and recreated")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier for every row count")
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--movies', type=int)
+    parser.add_argument('--showtimes', type=int)
+    parser.add_argument('--bookings', type=int)
+    parser.add_argument('--days', type=int, default=120, help="Showtimes are spread over this many days")
+    parser.add_argument('--start', type=date.fromisoformat, help="First show date (default: --days/2 ago)")
+    parser.add_argument('--method', choices=('insert', 'load-data'), default='insert')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    def count(value, default):
+        return value if value is not None else max(1, int(default * args.scale))
+
+    if args.mysql_database:
+        from db_utils import DB_CONFIG
+        server = {k: v for k, v in DB_CONFIG.items() if k != 'database'}
+        admin = pymysql.connect(**server)
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{args.mysql_database}`")
+            cursor.execute(f"CREATE DATABASE `{args.mysql_database}`")
+        admin.close()
+        db = migrations.Database(db_config=dict(DB_CONFIG, database=args.mysql_database,
+                                                local_infile=args.method == 'load-data'))
+    else:
+        if os.path.exists(args.sqlite):
+            os.remove(args.sqlite)
+        db = migrations.Database(sqlite_path=args.sqlite)
+
+    try:
+        migrations.migrate(db)
+        started = time.perf_counter()
+        seed(db, Writer(db, args.method), np.random.default_rng(args.seed),
+             count(args.users, USERS), count(args.movies, MOVIES), count(args.showtimes, SHOWTIMES),
+             count(args.bookings, BOOKINGS),
+             args.start or date.today() - timedelta(days=args.days // 2), args.days)
+        print(f"Done in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Server-side Session Store
+Filename: session_store.py
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = 7 * 24 * 3600  # seconds a session survives without being saved
+
+
+class MemorySessionBackend:
+    """LRU of sessions held in this process; expired entries are dropped on read"""
+
+    def __init__(self, max_entries=10000, clock=time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = OrderedDict()   # session_id -> (expires_at, data)
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._data.get(session_id)
+            if not entry:
+                return None
+            if entry[0] <= self._clock():
+                del self._data[session_id]
+                return None
+            self._data.move_to_end(session_id)
+            return dict(entry[1])
+
+    def put_many(self, items, ttl=SESSION_TTL):
+        expires_at = self._clock() + ttl
+        with self._lock:
+            for session_id, data in items:
+                self._data[session_id] = (expires_at, dict(data))
+                self._data.move_to_end(session_id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+class SQLiteSessionBackend:
+    """Sessions in a local SQLite file, shared by workers on the same host"""
+
+    def __init__(self, path, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS Sessions (session_id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM Sessions WHERE session_id = ? AND expires_at > ?",
+                (session_id, self._clock())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, items, ttl=SESSION_TTL):
+        expires_at = self._clock() + ttl
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO Sessions (session_id, data, expires_at) VALUES (?, ?, ?)",
+                [(session_id, json.dumps(data, default=str), expires_at) for session_id, data in items]
+            )
+            self._conn.execute("DELETE FROM Sessions WHERE expires_at <= ?", (self._clock(),))
+            self._conn.commit()
+
+    def delete(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM Sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+class MySQLSessionBackend:
+    """Sessions in the Sessions table, shared by every app server"""
+
+    def __init__(self, connect, clock=time.time):
+        self._connect = connect
+        self._clock = clock
+
+    def get(self, session_id):
+        conn = self._connect()
+        if not conn:
+            return None
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT data FROM Sessions WHERE session_id = %s AND expires_at > %s",
+                (session_id, self._clock())
+            )
+            row = cursor.fetchone()
+            return json.loads(row['data']) if row else None
+        finally:
+            cursor.close()
+            conn.close()
+
+    def put_many(self, items, ttl=SESSION_TTL):
+        conn = self._connect()
+        if not conn:
+            return
+        cursor = conn.cursor()
+        try:
+            expires_at = self._clock() + ttl
+            cursor.executemany(
+                "INSERT INTO Sessions (session_id, data, expires_at) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE data = VALUES(data), expires_at = VALUES(expires_at)",
+                [(session_id, json.dumps(data, default=str), expires_at) for session_id, data in items]
+            )
+            cursor.execute("DELETE FROM Sessions WHERE expires_at <= %s LIMIT 1000", (self._clock(),))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def delete(self, session_id):
+        conn = self._connect()
+        if not conn:
+            return
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM Sessions WHERE session_id = %s", (session_id,))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+
+class SessionManager:
+    """Signed session tokens on top of a backend.
+
+    Creating and destroying a session is written through immediately; later
+    updates are buffered and flushed in batches every ``flush_interval``
+    seconds by a daemon thread, so saving state costs no DB round-trip.
+    """
+
+    def __init__(self, backend, secret, flush_interval=2.0, ttl=SESSION_TTL):
+        self.backend = backend
+        self._secret = secret.encode() if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pending = {}
+        # Held while pending state is written out, so destroy() cannot slip in between
+        self._write_lock = threading.Lock()
+        self._destroyed = {}   # session_id -> time its token stops mattering
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, args=(flush_interval,),
+                                         name="session-flusher", daemon=True)
+        self._flusher.start()
+
+    def _sign(self, session_id):
+        digest = hmac.new(self._secret, session_id.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest[:18]).decode('ascii')
+
+    def session_id(self, token):
+        """Session id of a token, or None if the token was not signed by us"""
+        if not token or '.' not in token:
+            return None
+        session_id, signature = token.rsplit('.', 1)
+        if not hmac.compare_digest(signature.encode(), self._sign(session_id).encode()):
+            return None
+        return session_id
+
+    def create(self, data):
+        session_id = secrets.token_urlsafe(24)
+        self.backend.put_many([(session_id, data)], self.ttl)
+        return f"{session_id}.{self._sign(session_id)}"
+
+    def load(self, token):
+        session_id = self.session_id(token)
+        if session_id is None:
+            return None
+        with self._lock:
+            if session_id in self._pending:
+                return dict(self._pending[session_id])
+        return self.backend.get(session_id)
+
+    def save(self, token, data):
+        """Queue the new state; it reaches the backend on the next flush"""
+        session_id = self.session_id(token)
+        if session_id is not None:
+            with self._lock:
+                # A rerun still holding a logged-out token must not bring the session back
+                if session_id not in self._destroyed:
+                    self._pending[session_id] = dict(data)
+
+    def destroy(self, token):
+        session_id = self.session_id(token)
+        if session_id is not None:
+            with self._write_lock:
+                with self._lock:
+                    self._pending.pop(session_id, None)
+                    self._destroyed[session_id] = time.time() + self.ttl
+                self.backend.delete(session_id)
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                now = time.time()
+                self._destroyed = {sid: until for sid, until in self._destroyed.items() if until > now}
+                items, self._pending = list(self._pending.items()), {}
+            if items:
+                try:
+                    self.backend.put_many(items, self.ttl)
+                except Exception:
+                    # Put them back unless a newer save replaced them meanwhile
+                    with self._lock:
+                        for session_id, data in items:
+                            self._pending.setdefault(session_id, data)
+                    raise
+
+    def _flush_loop(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
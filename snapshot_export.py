@@ -0,0 +1,235 @@
+"""
+Analytics Snapshot Export
+Filename: snapshot_export.py
+Run with: python snapshot_export.py OUTPUT_DIR [--format parquet|arrow]
+
+Streams Bookings, Showtimes and Movies out of MySQL with server-side cursors
+into columnar files, so analysts never have to query the production database.
+Bookings are appended incrementally past a booking_id watermark and
+partitioned by booking month; only bookings older than EXPORT_LAG_SECONDS
+and than every open transaction are exported, so a lower id that commits
+late is not skipped; Showtimes and Movies are small and rewritten
+in full each run. Later edits to already-exported bookings (e.g. a status
+change) are not picked up; re-export from scratch with --full for that.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import pymysql
+
+CHUNK_ROWS = 100000
+# Bookings younger than this may still have lower-id siblings in flight
+EXPORT_LAG_SECONDS = 300
+WATERMARK_FILE = '_watermark.json'
+
+BOOKINGS_SCHEMA = pa.schema([
+    ('booking_id', pa.int64()),
+    ('user_id', pa.int32()),
+    ('showtime_id', pa.int32()),
+    ('tickets_booked', pa.int16()),
+    ('booking_date', pa.timestamp('s')),
+    ('status', pa.string()),
+    ('seat_numbers', pa.string()),
+])
+SHOWTIMES_SCHEMA = pa.schema([
+    ('showtime_id', pa.int32()),
+    ('movie_id', pa.int32()),
+    ('screen_id', pa.int32()),
+    ('show_date', pa.date32()),
+    ('show_time', pa.duration('s')),
+    ('available_seats', pa.int32()),
+    ('ticket_price', pa.float64()),
+])
+MOVIES_SCHEMA = pa.schema([
+    ('movie_id', pa.int32()),
+    ('title', pa.string()),
+    ('genre', pa.string()),
+    ('language', pa.string()),
+    ('duration', pa.int32()),
+    ('rating', pa.float64()),
+    ('release_year', pa.int32()),
+])
+
+EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def _write(table, path, fmt):
+    """Write to a hidden temp file and rename, so readers never see half a file"""
+    tmp = os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.tmp')
+    if fmt == 'parquet':
+        pq.write_table(table, tmp, compression='zstd')
+    else:
+        with ipc.new_file(tmp, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _table(rows, schema):
+    columns = {field.name: [row[field.name] for row in rows] for field in schema}
+    if 'rating' in columns:
+        columns['rating'] = [None if v is None else float(v) for v in columns['rating']]
+    if 'ticket_price' in columns:
+        columns['ticket_price'] = [None if v is None else float(v) for v in columns['ticket_price']]
+    return pa.table(columns, schema=schema)
+
+
+def _stream(conn, query, params=()):
+    """Yield lists of up to CHUNK_ROWS dict rows from a server-side cursor"""
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def read_watermark(out_dir):
+    try:
+        with open(os.path.join(out_dir, WATERMARK_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'bookings': 0}
+
+
+def _save_watermark(out_dir, watermark):
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(watermark, f)
+    os.replace(path + '.tmp', path)
+
+
+def _export_limit(conn, after_id):
+    """First booking_id past ``after_id`` that is not yet safe to export, or None.
+
+    A booking is safe once it is older than EXPORT_LAG_SECONDS and than the
+    oldest open transaction, which may still commit a lower booking_id.
+    """
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+    try:
+        cursor.execute("SELECT NOW() - INTERVAL %s SECOND AS cutoff", (EXPORT_LAG_SECONDS,))
+        cutoff = cursor.fetchone()[0]
+        try:
+            cursor.execute("SELECT MIN(trx_started) FROM information_schema.innodb_trx")
+            oldest = cursor.fetchone()[0]
+            if oldest is not None:
+                cutoff = min(cutoff, oldest)
+        except pymysql.MySQLError:
+            # Needs the PROCESS privilege; the lag alone still covers short transactions
+            pass
+        cursor.execute("SELECT MIN(booking_id) FROM Bookings WHERE booking_id > %s AND booking_date >= %s",
+                       (after_id, cutoff))
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def export_bookings(conn, out_dir, fmt):
+    """Append settled bookings past the watermark; returns the number of rows written"""
+    watermark = read_watermark(out_dir)
+    limit = _export_limit(conn, watermark['bookings'])
+    written = 0
+    for rows in _stream(conn, f"""
+        SELECT booking_id, user_id, showtime_id, tickets_booked, booking_date, status, seat_numbers
+        FROM Bookings WHERE booking_id > %s{' AND booking_id < %s' if limit else ''} ORDER BY booking_id
+    """, (watermark['bookings'], limit) if limit else (watermark['bookings'],)):
+        partitions = {}
+        for row in rows:
+            partitions.setdefault(row['booking_date'].strftime('%Y-%m'), []).append(row)
+        for month, part_rows in partitions.items():
+            part_dir = os.path.join(out_dir, 'bookings', f'booking_month={month}')
+            os.makedirs(part_dir, exist_ok=True)
+            name = f"part-{part_rows[0]['booking_id']:012d}-{part_rows[-1]['booking_id']:012d}{EXTENSIONS[fmt]}"
+            _write(_table(part_rows, BOOKINGS_SCHEMA), os.path.join(part_dir, name), fmt)
+        # Advance only once the chunk is on disk, so a crash just redoes this chunk
+        watermark['bookings'] = rows[-1]['booking_id']
+        _save_watermark(out_dir, watermark)
+        written += len(rows)
+    return written
+
+
+def export_table(conn, out_dir, fmt, name, query, schema):
+    """Rewrite a small dimension table as a single file"""
+    chunks = [_table(rows, schema) for rows in _stream(conn, query)]
+    table = pa.concat_tables(chunks) if chunks else schema.empty_table()
+    _write(table, os.path.join(out_dir, name + EXTENSIONS[fmt]), fmt)
+    return table.num_rows
+
+
+def export_snapshot(conn, out_dir, fmt='parquet', full=False):
+    if full and os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    return {
+        'movies': export_table(conn, out_dir, fmt, 'movies',
+                               "SELECT movie_id, title, genre, language, duration, rating, release_year FROM Movies",
+                               MOVIES_SCHEMA),
+        'showtimes': export_table(conn, out_dir, fmt, 'showtimes',
+                                  "SELECT showtime_id, movie_id, screen_id, show_date, show_time, available_seats, ticket_price FROM Showtimes",
+                                  SHOWTIMES_SCHEMA),
+        'bookings': export_bookings(conn, out_dir, fmt),
+    }
+
+
+def _detect_format(out_dir):
+    return 'parquet' if os.path.exists(os.path.join(out_dir, 'showtimes.parquet')) else 'arrow'
+
+
+def _read(path, fmt, columns=None):
+    """Memory-map one file; Arrow IPC columns then point straight into the mapping"""
+    if fmt == 'parquet':
+        return pq.read_table(path, columns=columns, memory_map=True)
+    table = ipc.open_file(pa.memory_map(path)).read_all()
+    return table.select(columns) if columns else table
+
+
+def load_snapshot(out_dir):
+    """Memory-map a snapshot and return (bookings, showtimes) Arrow tables"""
+    fmt = _detect_format(out_dir)
+    showtimes = _read(os.path.join(out_dir, 'showtimes' + EXTENSIONS[fmt]), fmt)
+
+    columns = ['booking_id', 'showtime_id', 'tickets_booked', 'booking_date', 'status']
+    parts = []
+    bookings_dir = os.path.join(out_dir, 'bookings')
+    if os.path.isdir(bookings_dir):
+        for month in sorted(os.listdir(bookings_dir)):
+            part_dir = os.path.join(bookings_dir, month)
+            if month.startswith('.') or not os.path.isdir(part_dir):
+                continue
+            parts.extend(_read(os.path.join(part_dir, name), fmt, columns)
+                         for name in sorted(os.listdir(part_dir))
+                         if name.endswith(EXTENSIONS[fmt]) and not name.startswith('.'))
+    # concat_tables only chains the chunks, nothing is copied
+    bookings = pa.concat_tables(parts) if parts else BOOKINGS_SCHEMA.empty_table().select(columns)
+    return bookings, showtimes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Bookings, Showtimes and Movies to columnar files")
+    parser.add_argument('out_dir')
+    parser.add_argument('--format', choices=sorted(EXTENSIONS), default='parquet')
+    parser.add_argument('--full', action='store_true', help="Discard the existing snapshot and export everything")
+    args = parser.parse_args(argv)
+
+    from db_utils import DB_CONFIG
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        counts = export_snapshot(conn, args.out_dir, args.format, args.full)
+    finally:
+        conn.close()
+    print(", ".join(f"{name}: {count} rows" for name, count in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
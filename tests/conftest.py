@@ -0,0 +1,87 @@
+"""
+Shared test fixtures
+Filename: tests/conftest.py
+
+Database tests run the app's own code against an SQLite copy of the schema,
+through the same stand-in connection the benchmark uses.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrations
+from benchmark import SQLiteConnection, seed
+from db_pool import ConnectionPool, ReplicaRouter
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A migrated, empty SQLite database"""
+    path = str(tmp_path / 'cinebook.db')
+    db = migrations.Database(sqlite_path=path)
+    migrations.migrate(db)
+    db.close()
+    return path
+
+
+@pytest.fixture
+def seeded_path(db_path):
+    """Two movies with two showtimes each on the default layout, and two users"""
+    db = migrations.Database(sqlite_path=db_path)
+    seed(db, movies=2, showtimes_per_movie=2, users=2)
+    db.close()
+    return db_path
+
+
+@pytest.fixture
+def pool(seeded_path):
+    pool = ConnectionPool({'path': seeded_path}, connect=SQLiteConnection, max_size=4, timeout=5.0)
+    yield pool
+    pool.close_idle()
+
+
+@pytest.fixture
+def app_db(pool, monkeypatch):
+    """db_utils wired to the seeded SQLite pool, with fresh process-wide caches"""
+    import streamlit as st
+    import db_utils
+
+    st.cache_resource.clear()
+    monkeypatch.setattr(db_utils, 'get_pool', lambda: pool)
+    monkeypatch.setattr(db_utils, 'get_router', lambda: ReplicaRouter(pool, []))
+    monkeypatch.setattr(db_utils, 'HOLD_BACKEND', 'memory')
+    yield db_utils
+    st.cache_resource.clear()
+
+
+@pytest.fixture
+def run_page(app_db, monkeypatch):
+    """Run a page function with AppTest against app_db"""
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest leaves its script as __main__, which forkserver workers would re-run
+    monkeypatch.setitem(sys.modules, '__main__', sys.modules['__main__'])
+
+    def run(page):
+        at = AppTest.from_function(page, default_timeout=30).run()
+        assert not at.exception
+        return at
+    return run
+
+
+def query(pool, sql, params=()):
+    """Rows of one statement run on a borrowed connection"""
+    conn = pool.connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        conn.commit()
+        return rows
+    finally:
+        cursor.close()
+        conn.close()
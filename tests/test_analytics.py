@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from analytics import build_report, load_sales_frames
+from benchmark import SQLiteConnection
+from conftest import query
+
+
+@pytest.fixture
+def report(app_db, pool, seeded_path):
+    assert app_db.reserve_seats(1, 1, ['A1', 'A2'])['success']
+    assert app_db.reserve_seats(2, 3, ['A1'])['success']
+    booking_id = app_db.reserve_seats(2, 1, ['B1', 'B2', 'B3'])['booking_id']
+    query(pool, "UPDATE Bookings SET status = 'cancelled' WHERE booking_id = %s", (booking_id,))
+    conn = SQLiteConnection(seeded_path)
+    try:
+        bookings, showtimes = load_sales_frames(conn)
+    finally:
+        conn.close()
+    return build_report(bookings, showtimes)
+
+
+def test_frames_use_narrow_dtypes(seeded_path):
+    conn = SQLiteConnection(seeded_path)
+    try:
+        bookings, showtimes = load_sales_frames(conn)
+    finally:
+        conn.close()
+    assert bookings.empty
+    assert showtimes['showtime_id'].dtype == 'int32'
+    assert showtimes['hour'].dtype == 'int8'
+    assert 'show_time' not in showtimes
+
+
+def test_cancelled_bookings_are_left_out_of_revenue(report):
+    assert report['total_revenue'] == pytest.approx(3 * 200.0)
+    by_movie = report['by_movie'].set_index('movie_id')
+    assert by_movie.loc[1, 'sold'] == 2
+    assert by_movie.loc[2, 'sold'] == 1
+    assert report['revenue_trend']['revenue'].sum() == pytest.approx(600.0)
+
+
+def test_cancellation_rate_per_movie(report):
+    rates = report['cancellations'].set_index('movie_id')['cancellation_rate']
+    assert rates[1] == pytest.approx(0.5)
+    assert rates[2] == 0
+
+
+def test_fill_rate_counts_sold_seats_against_capacity(report):
+    # Cancelled seats stay taken in the seat bitmap, so they are not part of capacity
+    assert report['overall_fill_rate'] == pytest.approx(3 / (4 * 100 - 3))
+    heatmap = report['fill_heatmap']
+    assert isinstance(heatmap, pd.DataFrame)
+    assert set(heatmap.columns) <= {10, 13, 16, 19}
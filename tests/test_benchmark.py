@@ -0,0 +1,73 @@
+import random
+
+import pymysql
+
+from benchmark import SQLiteConnection, check_integrity, pick_seats, regressions, run
+from conftest import query
+from seat_inventory import DEFAULT_LAYOUT
+
+
+def test_cursor_fetches_like_pymysql(seeded_path):
+    conn = SQLiteConnection(seeded_path)
+    try:
+        with conn.cursor() as cursor:
+            assert cursor.execute("SELECT movie_id, title FROM Movies ORDER BY movie_id") == 2
+            assert cursor.description[0][0] == 'movie_id'
+            assert cursor.fetchone() == {'movie_id': 1, 'title': 'Movie 0'}
+            assert [row['movie_id'] for row in cursor] == [2]
+        with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+            cursor.execute("SELECT showtime_id FROM Showtimes ORDER BY showtime_id")
+            assert cursor.rowcount == -1
+            assert cursor.fetchmany(3) == [(1,), (2,), (3,)]
+            assert cursor.fetchall() == [(4,)]
+    finally:
+        conn.close()
+
+
+def test_multi_row_insert_reports_the_first_id(seeded_path):
+    conn = SQLiteConnection(seeded_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO Users (username, password_hash) VALUES (%s, %s), (%s, %s), (%s, %s)",
+                       ('a', 'x', 'b', 'x', 'c', 'x'))
+        assert cursor.rowcount == 3
+        assert cursor.lastrowid == 3
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+def test_picked_seats_are_free_and_adjacent():
+    booked = {f"{row}{n}" for row in 'ABCDEFGHI' for n in range(1, 11)} | {'J1', 'J2'}
+    seats = pick_seats(random.Random(1), DEFAULT_LAYOUT, booked, 3)
+    assert len(seats) == 3 and not booked.intersection(seats)
+    assert all(seat.startswith('J') for seat in seats)
+
+
+def test_integrity_check_finds_double_bookings(pool):
+    for seats in ('A1,A2', 'A2'):
+        query(pool, "INSERT INTO Bookings (user_id, showtime_id, tickets_booked, booking_date, seat_numbers) "
+              "VALUES (1, 1, 1, '2026-01-01 10:00:00', %s)", (seats,))
+    conn = pool.connection()
+    try:
+        assert check_integrity(conn) == {'double_booked': 1, 'inventory_mismatches': 1}
+    finally:
+        conn.close()
+
+
+def test_run_books_without_double_booking(app_db, pool):
+    results = run(pool, users=3, iterations=5, seed_value=1, think=0)
+    assert results['bookings']['succeeded'] > 0
+    assert results['bookings']['double_booked'] == 0
+    assert results['bookings']['inventory_mismatches'] == 0
+    assert regressions(results, results, tolerance=0.1) == []
+
+
+def test_regressions_compare_against_the_baseline():
+    def results(p95, throughput):
+        return {'bookings': {'double_booked': 0, 'inventory_mismatches': 0},
+                'operations': {'book_tickets': {'p95_ms': p95, 'throughput_per_s': throughput}}}
+
+    assert regressions(results(10, 100), results(10, 100), 0.2) == []
+    assert regressions(results(11, 90), results(10, 100), 0.2) == []
+    assert len(regressions(results(13, 70), results(10, 100), 0.2)) == 2
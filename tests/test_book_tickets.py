@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import query
+
+
+def booking_page():
+    import streamlit as st
+    from book_tickets import show_book_tickets
+
+    for key, value in (('user_id', 1), ('hold_owner', 'me'), ('selected_movie', 1),
+                       ('selected_seats', []), ('hold_showtime', None)):
+        st.session_state.setdefault(key, value)
+    show_book_tickets()
+
+
+@pytest.fixture
+def page(run_page, pool):
+    query(pool, "UPDATE Movies SET poster_url = 'https://example.com/poster.jpg'")
+    return run_page(booking_page)
+
+
+def test_seat_clicks_select_and_hold_seats(page, app_db):
+    page.button(key='seat_A1').click().run()
+    page.button(key='seat_A2').click().run()
+    assert page.session_state.selected_seats == ['A1', 'A2']
+    assert app_db.get_hold_store().held_by_others(1, 'other') == {'A1', 'A2'}
+    page.button(key='seat_A1').click().run()
+    assert page.session_state.selected_seats == ['A2']
+    assert app_db.get_hold_store().held_by_others(1, 'other') == {'A2'}
+
+
+def test_seat_taken_by_another_customer_is_dropped(page, app_db):
+    page.button(key='seat_A1').click().run()
+    # Our hold lapsed and another session picked the seat
+    store = app_db.get_hold_store()
+    store.release(1, ['A1'], 'me')
+    store.hold(1, ['A1'], 'other')
+    page.button(key='seat_A2').click().run()
+    assert page.session_state.selected_seats == ['A2']
+    assert page.button(key='seat_A1').disabled
+
+
+def test_confirm_books_the_selection(page, app_db):
+    page.button(key='seat_C3').click().run()
+    next(b for b in page.button if b.label == "Confirm Booking").click().run()
+    assert not page.exception
+    assert app_db.get_booked_seats(1) == {'C3'}
+    assert page.session_state.selected_seats == []
+    assert app_db.get_hold_store().held_by_others(1, 'other') == set()
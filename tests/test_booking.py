@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import query
+
+
+def test_booking_claims_seats_and_seat_count(app_db, pool):
+    before = query(pool, "SELECT available_seats FROM Showtimes WHERE showtime_id = 1")[0]['available_seats']
+    result = app_db.reserve_seats(1, 1, ['A1', 'A2'])
+    assert result['success'] and result['booking_id']
+    assert app_db.get_booked_seats(1) == {'A1', 'A2'}
+    after = query(pool, "SELECT available_seats FROM Showtimes WHERE showtime_id = 1")[0]['available_seats']
+    assert after == before - 2
+
+
+def test_seat_already_booked_is_reported_lost(app_db):
+    assert app_db.reserve_seats(1, 1, ['B1'])['success']
+    result = app_db.reserve_seats(2, 1, ['B1', 'B2'])
+    assert not result['success']
+    assert result['lost_seats'] == ['B1']
+    assert app_db.get_booked_seats(1) == {'B1'}
+
+
+def test_unknown_seat_is_refused(app_db):
+    result = app_db.reserve_seats(1, 1, ['Z1'])
+    assert not result['success']
+    assert result['lost_seats'] == ['Z1']
+
+
+def test_concurrent_bookings_of_one_seat_have_one_winner(app_db, pool):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda user: app_db.reserve_seats(user, 1, ['C5']), [1, 2, 1, 2]))
+    assert sum(r['success'] for r in results) == 1
+    assert all(r['lost_seats'] == ['C5'] for r in results if not r['success'])
+    rows = query(pool, "SELECT COUNT(*) AS n FROM Bookings WHERE showtime_id = 1")
+    assert rows[0]['n'] == 1
+
+
+def test_bulk_booking_ids_match_their_requests(app_db, pool):
+    results = app_db.reserve_seats_bulk(1, [(3, ['A1']), (1, ['B1', 'B2']), (3, ['C1']), (2, ['D1'])],
+                                        showtimes_per_txn=2)
+    assert all(r['success'] for r in results)
+    for (showtime_id, seats), result in zip([(3, 'A1'), (1, 'B1,B2'), (3, 'C1'), (2, 'D1')], results):
+        row = query(pool, "SELECT showtime_id, seat_numbers FROM Bookings WHERE booking_id = %s",
+                    (result['booking_id'],))[0]
+        assert (row['showtime_id'], row['seat_numbers']) == (showtime_id, seats)
+
+
+def test_bulk_requests_fail_on_their_own(app_db):
+    assert app_db.reserve_seats(2, 1, ['A1'])['success']
+    results = app_db.reserve_seats_bulk(1, [(1, ['A1', 'A2']), (1, ['A3']), (99, ['A1']), (2, []),
+                                            (2, ['Z9']), (2, ['A3'])])
+    assert [r['success'] for r in results] == [False, True, False, False, False, True]
+    assert results[0]['lost_seats'] == ['A1']
+    assert results[2]['error'] == "Showtime not found!"
+    assert app_db.get_booked_seats(1) == {'A1', 'A3'}
+
+
+def test_bulk_requests_in_one_order_cannot_double_book(app_db):
+    results = app_db.reserve_seats_bulk(1, [(1, ['E1', 'E2']), (1, ['E2', 'E3'])])
+    assert [r['success'] for r in results] == [True, False]
+    assert results[1]['lost_seats'] == ['E2']
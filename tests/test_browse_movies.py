@@ -0,0 +1,51 @@
+import pytest
+
+from conftest import query
+
+
+def browse_page():
+    from browse_movies import show_browse_movies
+    show_browse_movies()
+
+
+@pytest.fixture
+def catalogue(app_db, pool):
+    for n in range(2, 27):
+        query(pool, "INSERT INTO Movies (title, genre, language, duration, rating, release_year, description, poster_url) "
+              "VALUES (%s, 'Drama', 'English', 100, 7.0, 2020, '', '')", (f"Movie {n}",))
+    app_db.refresh_movie_facets()
+
+
+def page_text(at):
+    return ' '.join(m.value for m in at.markdown)
+
+
+def test_grid_shows_one_page_of_cards(run_page, catalogue):
+    at = run_page(browse_page)
+    assert len([b for b in at.button if b.label == "Book Now"]) == 12
+    assert "Page 1 of 3 · 27 movies" in page_text(at)
+
+
+def test_paging_and_filter_changes(run_page, catalogue):
+    at = run_page(browse_page)
+    next(b for b in at.button if b.label == "Next →").click().run()
+    assert at.session_state.browse_page == 1
+    assert "Page 2 of 3" in page_text(at)
+    at.selectbox[0].select('English').run()
+    assert at.session_state.browse_page == 0
+
+
+def test_last_page_disables_next(run_page, catalogue):
+    at = run_page(browse_page)
+    for _ in range(2):
+        next(b for b in at.button if b.label == "Next →").click().run()
+    assert len([b for b in at.button if b.label == "Book Now"]) == 3
+    assert next(b for b in at.button if b.label == "Next →").disabled
+
+
+def test_card_text_is_escaped(app_db):
+    from browse_movies import card_html
+    html = card_html({'movie_id': 1, 'title': '<script>x</script>', 'genre': 'Drama', 'duration': 90,
+                      'rating': 7.0, 'language': 'English', 'poster_url': "x' onerror='alert(1)"})
+    assert '<script>' not in html
+    assert "onerror='" not in html
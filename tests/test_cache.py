@@ -0,0 +1,120 @@
+import threading
+
+from cache import TTLCache, VersionedCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_hits_until_expiry():
+    clock = Clock()
+    cache = TTLCache(ttl=10, clock=clock)
+    loads = []
+    loader = lambda: loads.append(1) or len(loads)
+    assert cache.get_or_load('movies', loader) == 1
+    assert cache.get_or_load('movies', loader) == 1
+    clock.now = 11
+    assert cache.get_or_load('movies', loader) == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_ttl_cache_does_not_store_failed_loads():
+    cache = TTLCache(ttl=10)
+    assert cache.get_or_load('movies', lambda: None) is None
+    assert cache.get_or_load('movies', lambda: 'loaded') == 'loaded'
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=10)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    threads = [threading.Thread(target=cache.get_or_load, args=('k', loader)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert cache._load_locks == {}
+
+
+def test_load_overlapping_invalidate_is_not_cached():
+    cache = TTLCache(ttl=10)
+
+    def loader():
+        cache.invalidate()
+        return 'stale'
+
+    assert cache.get_or_load('k', loader) == 'stale'
+    assert cache.get_or_load('k', lambda: 'fresh') == 'fresh'
+
+
+def test_oldest_entries_are_evicted_over_max_entries():
+    clock = Clock()
+    cache = TTLCache(ttl=10, max_entries=2, clock=clock)
+    for key in 'abc':
+        clock.now += 1
+        cache.get_or_load(key, lambda: key)
+    assert list(cache._entries) == ['b', 'c']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entries_are_swept_on_insert():
+    clock = Clock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.get_or_load('a', lambda: 1)
+    clock.now = 20
+    cache.get_or_load('b', lambda: 2)
+    assert list(cache._entries) == ['b']
+    assert cache.stats()['evictions'] == 0
+
+
+def test_bump_forces_a_fresh_reload():
+    cache = VersionedCache(max_age=60)
+    assert cache.get_or_load(7, lambda: 'replica') == 'replica'
+    assert cache.get_or_load(7, lambda: 'other') == 'replica'
+    cache.bump(7)
+    assert cache.get_or_load(7, lambda: 'replica', fresh_loader=lambda: 'primary') == 'primary'
+    # Once reloaded fresh, later misses go back to the normal loader
+    cache.bump(8)
+    assert cache.get_or_load(7, lambda: 'other', fresh_loader=lambda: 'primary') == 'primary'
+
+
+def test_versioned_entries_expire_after_max_age():
+    clock = Clock()
+    cache = VersionedCache(max_age=30, clock=clock)
+    cache.get_or_load(7, lambda: 'old')
+    clock.now = 31
+    assert cache.get_or_load(7, lambda: 'new') == 'new'
+
+
+def test_load_overlapping_bump_is_not_cached():
+    cache = VersionedCache()
+
+    def loader():
+        cache.bump(7)
+        return 'stale'
+
+    assert cache.get_or_load(7, loader) == 'stale'
+    assert cache.get_or_load(7, lambda: 'replica', fresh_loader=lambda: 'fresh') == 'fresh'
+
+
+def test_booking_reloads_the_movies_showtimes(app_db):
+    showtime = app_db.get_showtimes(1)[0]
+    assert app_db.reserve_seats(1, showtime['showtime_id'], ['A1', 'A2'])['success']
+    reloaded = {row['showtime_id']: row for row in app_db.get_showtimes(1)}
+    assert reloaded[showtime['showtime_id']]['available_seats'] == showtime['available_seats'] - 2
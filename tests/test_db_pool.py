@@ -0,0 +1,160 @@
+import threading
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeout, ReplicaRouter
+
+
+class FakeConnection:
+    def __init__(self, fail_ping=False, **config):
+        self.config = config
+        self.closed = False
+        self.rollbacks = 0
+        self.fail_ping = fail_ping
+
+    def ping(self, reconnect=False):
+        if self.fail_ping:
+            raise ConnectionError("gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect(**config):
+        conn = FakeConnection(**config)
+        opened.append(conn)
+        return conn
+
+    return ConnectionPool({}, connect=connect, **kwargs), opened
+
+
+def test_connections_are_reused():
+    pool, opened = make_pool(max_size=2)
+    for _ in range(5):
+        pool.connection().close()
+    assert len(opened) == 1
+    assert pool.stats()['borrows'] == 5
+    assert pool.stats()['idle'] == 1
+
+
+def test_release_rolls_back_open_transaction():
+    pool, opened = make_pool()
+    pool.connection().close()
+    assert opened[0].rollbacks == 1
+
+
+def test_closed_connection_cannot_be_used():
+    pool, _ = make_pool()
+    conn = pool.connection()
+    conn.close()
+    with pytest.raises(Exception, match="returned to pool"):
+        conn.cursor()
+
+
+def test_overflow_connections_are_closed_on_return():
+    pool, opened = make_pool(max_size=1, max_overflow=1)
+    first, second = pool.connection(), pool.connection()
+    assert pool.stats()['overflow_open'] == 1
+    second.close()
+    first.close()
+    assert opened[1].closed and not opened[0].closed
+    assert pool.stats()['open'] == 1
+
+
+def test_borrow_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, max_overflow=0, timeout=0.05)
+    held = pool.connection()
+    with pytest.raises(PoolTimeout):
+        pool.connection()
+    assert pool.stats()['timeouts'] == 1
+    held.close()
+
+
+def test_waiter_gets_connection_when_one_is_returned():
+    pool, opened = make_pool(max_size=1, max_overflow=0, timeout=5)
+    held = pool.connection()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.connection()))
+    waiter.start()
+    held.close()
+    waiter.join(5)
+    assert got and len(opened) == 1
+    assert pool.stats()['waited_borrows'] == 1
+
+
+def test_unhealthy_idle_connection_is_replaced():
+    pool, opened = make_pool(ping_interval=0)
+    pool.connection().close()
+    opened[0].fail_ping = True
+    pool.connection().close()
+    assert opened[0].closed
+    assert len(opened) == 2
+
+
+def test_connection_past_lifetime_is_recycled():
+    pool, opened = make_pool(max_lifetime=0)
+    pool.connection().close()
+    pool.connection().close()
+    assert len(opened) == 2
+    assert pool.stats()['discarded'] == 2
+
+
+class LaggingPool:
+    def __init__(self, lag):
+        self.lag = lag
+
+    def connection(self):
+        pool = self
+
+        class Cursor:
+            def execute(self, sql):
+                pass
+
+            def fetchone(self):
+                return {'Seconds_Behind_Source': pool.lag}
+
+            def close(self):
+                pass
+
+        class Conn:
+            def cursor(self):
+                return Cursor()
+
+            def close(self):
+                pass
+
+        return Conn()
+
+
+def test_router_skips_lagging_replicas():
+    primary, fresh, stale = object(), LaggingPool(1), LaggingPool(60)
+    router = ReplicaRouter(primary, [stale, fresh], max_lag=5)
+    assert {router.read_pool() for _ in range(4)} == {fresh}
+
+
+def test_router_falls_back_to_primary():
+    primary = object()
+    router = ReplicaRouter(primary, [LaggingPool(None)], max_lag=5)
+    assert router.read_pool() is primary
+    assert router.stats()['fallbacks'] == 1
+
+
+def test_unhealthy_replica_is_skipped_until_rechecked():
+    primary, replica = object(), LaggingPool(0)
+    router = ReplicaRouter(primary, [replica], max_lag=5, check_interval=60)
+    assert router.read_pool() is replica
+    router.mark_unhealthy(replica)
+    assert router.read_pool() is primary
+
+
+def test_router_without_replicas_reads_from_primary():
+    primary = object()
+    router = ReplicaRouter(primary, [])
+    assert router.read_pool() is primary
+    assert router.stats()['fallbacks'] == 0
@@ -0,0 +1,56 @@
+import json
+import sqlite3
+
+import pytest
+
+from conftest import query
+from seat_inventory import SeatLayout, compile_layout
+
+LAYOUT = {'rows': [
+    {'label': 'A', 'seats': 6, 'aisles': [3], 'missing': [1], 'class': 'premium'},
+    {'label': 'B', 'seats': 6, 'aisles': [3]},
+]}
+
+
+def test_aisles_and_missing_seats_shape_the_grid():
+    layout = SeatLayout(LAYOUT['rows'])
+    assert layout.rows[0] == ('A', [None, 'A2', 'A3', None, 'A4', 'A5', 'A6'])
+    assert layout.size == 11
+    assert layout.width == 7
+    assert layout.position('B1') == 5
+
+
+def test_seat_classes_get_their_own_masks():
+    layout = SeatLayout(LAYOUT['rows'])
+    assert layout.to_labels(layout.class_masks['premium']) == {'A2', 'A3', 'A4', 'A5', 'A6'}
+    assert layout.seat_class['B6'] == 'standard'
+
+
+def test_screens_sharing_a_layout_share_its_index():
+    layout_json = json.dumps(LAYOUT)
+    assert compile_layout(layout_json) is compile_layout(layout_json)
+
+
+@pytest.fixture
+def screen(app_db, pool):
+    """Showtime 3 moved onto a screen with the LAYOUT above, before any seat is booked"""
+    query(pool, "INSERT INTO SeatLayouts (name, layout_json) VALUES ('Studio', %s)", (json.dumps(LAYOUT),))
+    query(pool, "INSERT INTO Screens (name, layout_id) VALUES ('Studio 1', 1)")
+    query(pool, "DELETE FROM SeatInventory WHERE showtime_id = 3")
+    query(pool, "UPDATE Showtimes SET screen_id = 1 WHERE showtime_id = 3")
+    return app_db
+
+
+def test_booking_uses_the_screens_layout(screen):
+    assert not screen.reserve_seats(1, 3, ['A1'])['success']
+    assert not screen.reserve_seats(1, 3, ['C1'])['success']
+    assert screen.reserve_seats(1, 3, ['A2', 'B6'])['success']
+    assert screen.get_booked_seats(3) == {'A2', 'B6'}
+
+
+def test_layout_with_seat_bitmaps_cannot_change(screen, pool):
+    assert screen.reserve_seats(1, 3, ['B1'])['success']
+    with pytest.raises(sqlite3.IntegrityError):
+        query(pool, "UPDATE SeatLayouts SET layout_json = %s WHERE layout_id = 1", (json.dumps({'rows': [['A', 5]]}),))
+    with pytest.raises(sqlite3.IntegrityError):
+        query(pool, "UPDATE Showtimes SET screen_id = NULL WHERE showtime_id = 3")
@@ -0,0 +1,61 @@
+import os
+
+import migrations
+from migrations import Database, check_query_plans, find_queries, migrate, to_sqlite
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_to_sqlite_rewrites_the_mysql_dialect():
+    assert to_sqlite("SELECT * FROM Showtimes WHERE showtime_id = %s FOR UPDATE") == \
+        "SELECT * FROM Showtimes WHERE showtime_id = ?"
+    assert to_sqlite("INSERT IGNORE INTO t (a) VALUES (%s) ON DUPLICATE KEY UPDATE a = VALUES(a)") == \
+        "INSERT OR IGNORE INTO t (a) VALUES (?) ON CONFLICT DO UPDATE SET a = excluded.a"
+
+
+def test_migrate_applies_pending_versions_once(tmp_path):
+    db = Database(sqlite_path=str(tmp_path / 'm.db'))
+    try:
+        assert migrate(db, target=2) == [1, 2]
+        assert migrate(db) == [number for number, _, _ in migrations.MIGRATIONS][2:]
+        assert migrate(db) == []
+    finally:
+        db.close()
+
+
+def test_generated_lists_are_rendered(tmp_path):
+    module = tmp_path / 'queries.py'
+    module.write_text(
+        "def book(cursor, seats):\n"
+        "    sql = 'SELECT * FROM Bookings WHERE showtime_id = %s'\n"
+        "    sql += f\" AND seat IN ({', '.join(['%s'] * len(seats))})\"\n"
+        "    cursor.execute(sql, seats)\n"
+        "    cursor.execute(\"INSERT INTO t VALUES \" + ', '.join(['(%s, %s)'] * len(seats)))\n"
+        "    cursor.execute(build_sql())\n"
+    )
+    assert find_queries(str(module)) == [
+        (4, "SELECT * FROM Bookings WHERE showtime_id = %s AND seat IN (%s, %s)"),
+        (5, "INSERT INTO t VALUES (%s, %s), (%s, %s)"),
+        (6, None),
+    ]
+
+
+def test_app_queries_use_indexes(db_path):
+    db = Database(sqlite_path=db_path)
+    try:
+        paths = [os.path.join(ROOT, name) for name in migrations.CHECKED_MODULES]
+        assert check_query_plans(db, paths) == []
+    finally:
+        db.close()
+
+
+def test_full_scan_is_reported(db_path, tmp_path):
+    module = tmp_path / 'scan.py'
+    module.write_text("def f(cursor):\n    cursor.execute('SELECT * FROM Bookings WHERE seat_numbers = %s')\n")
+    db = Database(sqlite_path=db_path)
+    try:
+        [(_, line, problem)] = check_query_plans(db, [str(module)])
+    finally:
+        db.close()
+    assert line == 2
+    assert problem.startswith('full scan of Bookings')
@@ -0,0 +1,54 @@
+import pytest
+
+from conftest import query
+from movie_search import build_search
+
+
+@pytest.fixture
+def catalogue(app_db, pool):
+    for title, genre, language, rating, year in [('Up', 'Animation', 'English', 8.3, 2009),
+                                                  ('Ran', 'Drama', 'Japanese', 8.2, 1985),
+                                                  ('Upstream Color', 'Drama', 'English', 6.7, 2013)]:
+        query(pool, "INSERT INTO Movies (title, genre, language, duration, rating, release_year, description, poster_url) "
+              "VALUES (%s, %s, %s, 100, %s, %s, '', '')", (title, genre, language, rating, year))
+    return app_db
+
+
+def test_words_become_a_boolean_prefix_query():
+    page_sql, page_params, count_sql, count_params = build_search(text='star wars', genre='Sci-Fi')
+    assert 'MATCH(title, description) AGAINST (%s IN BOOLEAN MODE)' in page_sql
+    assert page_params == ['+star* +wars*', '+star* +wars*', 'Sci-Fi', 12, 0]
+    assert count_params == ['+star* +wars*', 'Sci-Fi']
+    assert 'LIMIT' not in count_sql
+
+
+def test_short_text_falls_back_to_an_escaped_title_prefix():
+    page_sql, page_params, _, _ = build_search(text='50%', sort='relevance')
+    assert 'title LIKE %s' in page_sql
+    assert page_params[0] == '50\\%%'
+    assert 'ORDER BY release_year DESC' in page_sql
+
+
+def test_filters_and_sort_run_in_sql(catalogue):
+    movies, total = catalogue.search_movies(genre='Drama', min_rating=6.5, sort='rating')
+    assert [m['title'] for m in movies] == ['Ran', 'Movie 1', 'Movie 0', 'Upstream Color']
+    assert total == 4
+
+
+def test_pages_report_the_full_total(catalogue):
+    movies, total = catalogue.search_movies(sort='title', limit=2, offset=2)
+    assert [m['title'] for m in movies] == ['Ran', 'Up']
+    assert total == 5
+
+
+def test_title_prefix_search(catalogue):
+    movies, total = catalogue.search_movies(text='Up', sort='title')
+    assert [m['title'] for m in movies] == ['Up', 'Upstream Color']
+    assert total == 2
+
+
+def test_facets_count_the_catalogue(catalogue):
+    catalogue.refresh_movie_facets()
+    facets = catalogue.get_movie_facets()
+    assert facets['genre'] == [('Drama', 4), ('Animation', 1)]
+    assert facets['release_year'][0] == (2024, 2)
@@ -0,0 +1,42 @@
+from conftest import query
+
+BOOKED_AT = ['2026-01-01 10:00:00', '2026-01-02 10:00:00', '2026-01-02 10:00:00',
+             '2026-01-03 10:00:00', '2026-01-04 10:00:00']
+
+
+def add_bookings(pool, showtime_id, dates):
+    for booked_at in dates:
+        query(pool, "INSERT INTO Bookings (user_id, showtime_id, tickets_booked, booking_date, seat_numbers) "
+              "VALUES (1, %s, 1, %s, 'A1')", (showtime_id, booked_at))
+
+
+def test_pages_walk_every_booking_newest_first(app_db, pool):
+    add_bookings(pool, 1, BOOKED_AT)
+    seen, after = [], None
+    while True:
+        rows, after = app_db.get_user_bookings_page(1, upcoming=True, after=after, limit=2)
+        assert len(rows) <= 2
+        seen += rows
+        if after is None:
+            break
+    assert [row['booking_id'] for row in seen] == [5, 4, 3, 2, 1]
+
+
+def test_last_full_page_has_no_next_key(app_db, pool):
+    add_bookings(pool, 1, BOOKED_AT[:2])
+    rows, after = app_db.get_user_bookings_page(1, upcoming=True, limit=2)
+    assert len(rows) == 2
+    assert after is None
+
+
+def test_past_and_upcoming_bookings_are_split(app_db, pool):
+    query(pool, "INSERT INTO Showtimes (movie_id, show_date, show_time, available_seats) "
+          "VALUES (1, '2020-01-01', '18:00:00', 100)")
+    past_showtime = query(pool, "SELECT MAX(showtime_id) AS id FROM Showtimes")[0]['id']
+    add_bookings(pool, 1, BOOKED_AT[:1])
+    add_bookings(pool, past_showtime, BOOKED_AT[1:2])
+    upcoming, _ = app_db.get_user_bookings_page(1, upcoming=True)
+    past, _ = app_db.get_user_bookings_page(1, upcoming=False)
+    assert [row['booking_id'] for row in upcoming] == [1]
+    assert [row['booking_id'] for row in past] == [2]
+    assert app_db.get_user_bookings_page(2, upcoming=True) == ([], None)
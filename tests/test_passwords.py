@@ -0,0 +1,61 @@
+import hashlib
+
+import pytest
+
+import passwords
+from conftest import query
+from passwords import PasswordBusy, PasswordWorkers, hash_password, verify_password
+
+
+def test_scrypt_hash_verifies_only_its_password():
+    stored = hash_password('hunter2')
+    assert stored.startswith('scrypt$')
+    assert stored != hash_password('hunter2')
+    assert verify_password('hunter2', stored) == (True, False)
+    assert verify_password('hunter3', stored) == (False, False)
+
+
+def test_legacy_sha256_hash_is_flagged_for_rehash():
+    legacy = hashlib.sha256(b'hunter2').hexdigest()
+    assert verify_password('hunter2', legacy) == (True, True)
+    assert verify_password('nope', legacy) == (False, False)
+
+
+def test_new_cost_parameters_flag_a_rehash(monkeypatch):
+    stored = hash_password('hunter2')
+    monkeypatch.setattr(passwords, 'SCRYPT_N', 2 ** 15)
+    assert verify_password('hunter2', stored) == (True, True)
+
+
+def test_malformed_and_dummy_hashes_never_verify():
+    assert verify_password('x', 'scrypt$bad') == (False, False)
+    assert verify_password('', passwords.DUMMY_HASH) == (False, False)
+
+
+def test_workers_reject_jobs_beyond_max_pending():
+    workers = PasswordWorkers(workers=1, max_pending=1, wait=0.01)
+    try:
+        workers._slots.acquire()
+        with pytest.raises(PasswordBusy):
+            workers.hash('hunter2')
+        workers._slots.release()
+        assert verify_password('hunter2', workers.hash('hunter2'))[0]
+        assert workers.stats()['rejected'] == 1
+    finally:
+        workers._executor.shutdown()
+
+
+def test_login_upgrades_a_legacy_hash(app_db, pool):
+    query(pool, "UPDATE Users SET password_hash = %s WHERE username = 'bench0'",
+          (hashlib.sha256(b'hunter2').hexdigest(),))
+    assert app_db.login_user('bench0', 'wrong') is None
+    assert app_db.login_user('bench0', 'hunter2')['username'] == 'bench0'
+    stored = query(pool, "SELECT password_hash FROM Users WHERE username = 'bench0'")[0]['password_hash']
+    assert stored.startswith('scrypt$')
+    assert app_db.login_user('bench0', 'hunter2') is not None
+
+
+def test_registered_user_can_log_in(app_db):
+    assert app_db.register_user('carol', 'hunter2', 'carol@example.com')
+    assert app_db.login_user('carol', 'hunter2')['email'] == 'carol@example.com'
+    assert app_db.login_user('nobody', 'hunter2') is None
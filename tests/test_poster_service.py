@@ -0,0 +1,106 @@
+import io
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from PIL import Image
+
+from poster_service import PosterCache, register_asset, start_server
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    directory = tmp_path / 'fixtures'
+    directory.mkdir()
+    for name, colour in (('red.png', 'red'), ('blue.png', 'blue')):
+        Image.new('RGB', (600, 900), colour).save(directory / name)
+    return str(directory)
+
+
+@pytest.fixture
+def posters(tmp_path, fixtures):
+    return PosterCache(str(tmp_path / 'cache'), fixture_dir=fixtures)
+
+
+def test_variants_are_rendered_once_and_then_served_from_disk(posters):
+    path, digest = posters.get('https://img.example.com/red.png', 'thumb', 'jpeg')
+    assert Image.open(path).size == (320, 480)
+    assert posters.get('https://img.example.com/red.png', 'thumb', 'jpeg') == (path, digest)
+    assert Image.open(posters.get('https://img.example.com/red.png', 'detail', 'webp')[0]).size == (640, 960)
+    assert (posters.stats()['hits'], posters.stats()['misses']) == (1, 2)
+
+
+def test_concurrent_misses_render_once(posters):
+    renders = []
+    render = posters._render
+    posters._render = lambda *args: renders.append(1) or render(*args)
+    threads = [threading.Thread(target=posters.get, args=('https://img.example.com/blue.png',)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert len(renders) == 1
+    assert posters._load_locks == {}
+
+
+def test_least_recently_used_blobs_are_evicted(tmp_path, fixtures):
+    posters = PosterCache(str(tmp_path / 'cache'), max_bytes=1, fixture_dir=fixtures)
+    posters.get('https://img.example.com/red.png')
+    posters.get('https://img.example.com/blue.png')
+    assert posters.total_bytes <= 1
+    # The evicted blob is rendered again on the next request
+    posters.get('https://img.example.com/red.png')
+    assert posters.stats()['misses'] == 3
+
+
+def test_unknown_variant_is_rejected(posters):
+    with pytest.raises(KeyError):
+        posters.get('https://img.example.com/red.png', 'huge')
+
+
+@pytest.fixture
+def server(posters):
+    urls = {1: 'https://img.example.com/red.png', 2: 'https://img.example.com/missing.png'}
+    server = start_server(posters, urls.get, port=0)
+    yield f"http://127.0.0.1:{server.server_address[1]}", server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(url, **headers):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=10) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, b''
+
+
+def test_posters_are_served_with_etags(server):
+    base, _ = server
+    status, headers, body = fetch(f"{base}/poster/1/thumb?v=abc", Accept='image/webp')
+    assert status == 200
+    assert headers['Content-Type'] == 'image/webp'
+    assert headers['Cache-Control'].endswith('immutable')
+    assert Image.open(io.BytesIO(body)).format == 'WEBP'
+    status, _, body = fetch(f"{base}/poster/1/thumb?v=abc", Accept='image/webp', **{'If-None-Match': headers['ETag']})
+    assert (status, body) == (304, b'')
+    assert fetch(f"{base}/poster/1/thumb")[1]['Content-Type'] == 'image/jpeg'
+
+
+def test_unknown_and_broken_posters(server):
+    base, _ = server
+    assert fetch(f"{base}/poster/9/thumb")[0] == 404
+    assert fetch(f"{base}/poster/1/huge")[0] == 404
+    assert fetch(f"{base}/poster/2/thumb")[0] == 502
+
+
+def test_static_assets_are_gzipped_for_clients_that_accept_it(server):
+    base, http_server = server
+    register_asset(http_server, 'theme.abc123.css', b'body{margin:0}' * 50, 'text/css')
+    status, headers, body = fetch(f"{base}/static/theme.abc123.css", **{'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert len(body) < 700
+    assert fetch(f"{base}/static/theme.abc123.css")[2] == b'body{margin:0}' * 50
+    assert fetch(f"{base}/static/other.css")[0] == 404
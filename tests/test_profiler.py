@@ -0,0 +1,74 @@
+import sqlite3
+
+import profiler
+from profiler import RenderProfiler, _prune_dumps, flame_html, section
+from query_metrics import InstrumentedCursor, QueryMetrics, named_query
+
+
+def test_sections_nest_and_count_queries():
+    cursor = InstrumentedCursor(sqlite3.connect(':memory:').cursor(), QueryMetrics())
+    with RenderProfiler('rerun') as prof:
+        with section('page'):
+            named_query('get_movies')(cursor.execute)("SELECT 1", ())
+            with section('grid'):
+                cursor.execute("SELECT 2", ())
+    cursor.execute("SELECT 3", ())
+    report = prof.report()
+    assert [(s['name'], s['depth'], s['queries']) for s in report['sections']] == \
+        [('rerun', 0, 2), ('page', 1, 2), ('grid', 2, 1)]
+    assert report['query_names'] == {'get_movies': 1, 'other': 1}
+
+
+def test_section_outside_a_profiled_rerun_is_a_no_op():
+    with section('page') as block:
+        assert block is None
+
+
+def test_cprofile_dumps_are_rotated(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILE_KEEP', 2)
+    for name in ('20260101-000000-000001-a.prof', '20260101-000000-000002-b.prof', 'notes.txt'):
+        (tmp_path / name).write_text('')
+    with RenderProfiler('Book Tickets', cprofile=True) as prof:
+        sum(range(1000))
+    path = prof.dump(str(tmp_path))
+    assert path.endswith('-book-tickets.prof')
+    _prune_dumps(str(tmp_path), keep=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == \
+        sorted(['20260101-000000-000002-b.prof', path.rsplit('/', 1)[1], 'notes.txt'])
+
+
+def test_prune_with_keep_zero_removes_every_dump(tmp_path):
+    (tmp_path / 'a.prof').write_text('')
+    _prune_dumps(str(tmp_path), keep=0)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_flame_graph_escapes_section_names():
+    with RenderProfiler('<rerun>') as prof:
+        pass
+    assert '<rerun>' not in flame_html(prof.report())
+    assert '&lt;rerun&gt;' in flame_html(prof.report())
+
+
+def profiled_page():
+    import streamlit as st
+    from profiler import profile_rerun, section
+
+    st.session_state.is_admin = True
+    st.session_state.profile_enabled = True
+
+    def render():
+        with section('body'):
+            st.write("hello")
+            st.button("Go")
+    profile_rerun(render, "Test page")
+
+
+def test_rerun_report_counts_elements(run_page):
+    at = run_page(profiled_page)
+    report = at.session_state.profile_history[0]
+    assert report['name'] == 'Test page'
+    if profiler.COUNTS_ELEMENTS:
+        body = next(s for s in report['sections'] if s['name'] == 'body')
+        assert body['elements'] == 2
+    assert any('Render profile' in e.label for e in at.sidebar.expander)
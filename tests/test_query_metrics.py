@@ -0,0 +1,108 @@
+import logging
+import socket
+import urllib.request
+
+import pytest
+
+from benchmark import SQLiteConnection
+from db_pool import ConnectionPool
+from query_metrics import QueryMetrics, named_query, redact, start_metrics_server, watch_queries
+
+
+@pytest.fixture
+def metrics():
+    return QueryMetrics(slow_seconds=10)
+
+
+@pytest.fixture
+def instrumented(seeded_path, metrics):
+    pool = ConnectionPool({'path': seeded_path}, connect=SQLiteConnection, max_size=2, metrics=metrics)
+    yield pool
+    pool.close_idle()
+
+
+def run(pool, sql, params=()):
+    conn = pool.connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def test_queries_are_counted_under_their_name(instrumented, metrics):
+    named_query('list_movies')(run)(instrumented, "SELECT * FROM Movies")
+    run(instrumented, "SELECT * FROM Users WHERE user_id = %s", (1,))
+    summary = metrics.summary()
+    assert (summary['list_movies']['count'], summary['list_movies']['rows']) == (1, 2)
+    assert summary['other']['rows'] == 1
+
+
+def test_failed_queries_are_logged_without_their_values(instrumented, metrics, caplog):
+    with caplog.at_level(logging.ERROR, logger='cinebook.queries'), pytest.raises(Exception):
+        named_query('login_user')(run)(instrumented, "SELECT * FROM Nope WHERE username = %s", ('alice',))
+    assert metrics.summary()['login_user']['errors'] == 1
+    assert 'alice' not in caplog.text
+    assert 'params=(str)' in caplog.text
+
+
+def test_slow_queries_are_logged(instrumented, metrics, caplog):
+    metrics.slow_seconds = 0
+    with caplog.at_level(logging.WARNING, logger='cinebook.queries'):
+        run(instrumented, "SELECT * FROM Users WHERE email = %s", ('bench0@example.com',))
+    assert 'slow query other' in caplog.text
+    assert 'bench0' not in caplog.text
+
+
+def test_listeners_see_statements_in_their_context(instrumented):
+    seen = []
+    with watch_queries(lambda name, seconds: seen.append(name)):
+        named_query('get_movies')(run)(instrumented, "SELECT * FROM Movies")
+    run(instrumented, "SELECT * FROM Movies")
+    assert seen == ['get_movies']
+
+
+def test_redact_keeps_only_types():
+    assert redact(('alice', 3, None)) == "(str, int, NoneType)"
+    assert redact({'name': 'alice'}) == "{name: str}"
+
+
+def test_prometheus_exposition(metrics):
+    metrics.observe('book_tickets', 0.003, rows=1)
+    metrics.observe('book_tickets', 0.3, error=ValueError())
+    metrics.add_gauge('cinebook_pool_connections', "Pool connections.", lambda: {'idle': 2})
+    text = metrics.render()
+    assert 'cinebook_query_duration_seconds_bucket{query="book_tickets",le="0.005"} 1' in text
+    assert 'cinebook_query_duration_seconds_bucket{query="book_tickets",le="+Inf"} 2' in text
+    assert 'cinebook_query_errors_total{query="book_tickets"} 1' in text
+    assert 'cinebook_pool_connections{state="idle"} 2' in text
+    assert metrics.summary()['book_tickets']['p95_ms'] == 500.0
+
+
+def test_metrics_endpoint(metrics):
+    metrics.observe('get_movies', 0.01, rows=5)
+    server = start_metrics_server(metrics, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            assert 'cinebook_query_rows_total{query="get_movies"} 5' in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_app_starts_without_the_exporter_when_its_port_is_taken(monkeypatch):
+    import streamlit as st
+    import db_utils
+
+    with socket.socket() as taken:
+        taken.bind(('127.0.0.1', 0))
+        taken.listen()
+        monkeypatch.setattr(db_utils, 'METRICS_PORT', taken.getsockname()[1])
+        st.cache_resource.clear()
+        try:
+            assert isinstance(db_utils.get_query_metrics(), QueryMetrics)
+        finally:
+            st.cache_resource.clear()
@@ -0,0 +1,80 @@
+from benchmark import SQLiteConnection
+from conftest import query
+from rollups import RECONCILE_LOCK, read_totals, reconcile
+
+
+class ReconcileConnection(SQLiteConnection):
+    """SQLite stand-in with the MySQL named locks reconcile() takes.
+
+    SQLite transactions already read from one snapshot, so the explicit
+    START TRANSACTION is skipped.
+    """
+
+    held = set()
+
+    def __init__(self, path, **config):
+        super().__init__(path, **config)
+        self.raw.create_function('GET_LOCK', 2, self._get_lock)
+        self.raw.create_function('RELEASE_LOCK', 1, self._release_lock)
+
+    def _get_lock(self, name, timeout):
+        if name in self.held:
+            return 0
+        self.held.add(name)
+        return 1
+
+    def _release_lock(self, name):
+        self.held.discard(name)
+        return 1
+
+    def cursor(self, cursorclass=None):
+        cursor = super().cursor(cursorclass)
+        execute = cursor.execute
+        cursor.execute = lambda sql, params=None: None if sql.startswith('START TRANSACTION') else execute(sql, params)
+        return cursor
+
+
+def totals(pool):
+    conn = pool.connection()
+    cursor = conn.cursor()
+    try:
+        return read_totals(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def test_bookings_and_registrations_update_the_counters(app_db, pool):
+    assert app_db.reserve_seats(1, 1, ['A1', 'A2'])['success']
+    assert app_db.reserve_seats_bulk(2, [(2, ['A1']), (3, ['B1', 'B2', 'B3'])])[1]['success']
+    assert app_db.register_user('carol', 'hunter2', 'carol@example.com')
+    assert totals(pool) == {'users': 1, 'bookings': 3, 'tickets': 6}
+    rows = query(pool, "SELECT movie_id, SUM(bookings) AS bookings, SUM(tickets) AS tickets "
+                       "FROM MovieSales GROUP BY movie_id ORDER BY movie_id")
+    assert [(r['movie_id'], r['bookings'], r['tickets']) for r in rows] == [(1, 2, 3), (2, 1, 3)]
+
+
+def test_reconcile_corrects_drift(seeded_path, app_db, pool):
+    assert app_db.reserve_seats(1, 1, ['A1', 'A2'])['success']
+    query(pool, "DELETE FROM ShowtimeSales")
+    query(pool, "UPDATE MetricCounters SET value = value + 5 WHERE name = 'tickets'")
+    conn = ReconcileConnection(seeded_path)
+    try:
+        # Seeded users predate the counters, so 'users' is corrected too
+        assert reconcile(conn) == 3
+        assert reconcile(conn) == 0
+    finally:
+        conn.close()
+    assert totals(pool) == {'users': 2, 'bookings': 1, 'tickets': 2}
+    assert query(pool, "SELECT showtime_id, bookings, tickets FROM ShowtimeSales") == \
+        [{'showtime_id': 1, 'bookings': 1, 'tickets': 2}]
+
+
+def test_reconcile_skips_while_another_process_holds_the_lock(seeded_path):
+    conn = ReconcileConnection(seeded_path)
+    ReconcileConnection.held.add(RECONCILE_LOCK)
+    try:
+        assert reconcile(conn) is None
+    finally:
+        ReconcileConnection.held.discard(RECONCILE_LOCK)
+        conn.close()
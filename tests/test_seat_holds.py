@@ -0,0 +1,54 @@
+from seat_holds import InMemoryHoldStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hold_conflicts_with_another_owner():
+    store = InMemoryHoldStore()
+    assert store.hold(1, ['A1', 'A2'], 'alice') == []
+    assert store.hold(1, ['A2', 'A3'], 'bob') == ['A2']
+    assert store.held_by_others(1, 'alice') == {'A3'}
+    assert store.held_by_others(1, 'bob') == {'A1', 'A2'}
+
+
+def test_expired_hold_can_be_taken_over():
+    clock = Clock()
+    store = InMemoryHoldStore(clock=clock)
+    store.hold(1, ['A1'], 'alice', ttl=10)
+    clock.now = 11
+    assert store.held_by_others(1, 'bob') == set()
+    assert store.hold(1, ['A1'], 'bob') == []
+
+
+def test_release_only_drops_own_holds():
+    store = InMemoryHoldStore()
+    store.hold(1, ['A1'], 'alice')
+    store.release(1, ['A1'], 'bob')
+    assert store.held_by_others(1, 'bob') == {'A1'}
+    store.release(1, ['A1'], 'alice')
+    assert store.held_by_others(1, 'bob') == set()
+
+
+def test_sweep_skips_refreshed_holds():
+    clock = Clock()
+    store = InMemoryHoldStore(clock=clock)
+    store.hold(1, ['A1', 'A2'], 'alice', ttl=10)
+    clock.now = 5
+    store.hold(1, ['A1'], 'alice', ttl=10)
+    clock.now = 12
+    assert store.sweep() == 1
+    assert store.held_by_others(1, 'bob') == {'A1'}
+
+
+def test_booking_refuses_seats_held_by_another_session(app_db):
+    app_db.get_hold_store().hold(1, ['D1'], 'other-session')
+    result = app_db.reserve_seats(1, 1, ['D1', 'D2'], hold_owner='my-session')
+    assert not result['success']
+    assert result['lost_seats'] == ['D1']
+    assert app_db.reserve_seats(1, 1, ['D1'], hold_owner='other-session')['success']
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import query
+from seat_inventory import DEFAULT_LAYOUT, MAX_SEATS, SeatLayout
+
+
+def test_mask_round_trips_through_bitmap():
+    seats = {'A1', 'C7', 'J10'}
+    mask = DEFAULT_LAYOUT.to_mask(seats)
+    blob = DEFAULT_LAYOUT.encode(mask)
+    assert len(blob) == DEFAULT_LAYOUT.nbytes == 13
+    assert DEFAULT_LAYOUT.to_labels(DEFAULT_LAYOUT.decode(blob)) == seats
+
+
+def test_empty_bitmap_decodes_to_no_seats():
+    assert DEFAULT_LAYOUT.decode(DEFAULT_LAYOUT.empty_bitmap()) == 0
+    assert DEFAULT_LAYOUT.decode(None) == 0
+
+
+def test_positions_run_row_by_row():
+    assert DEFAULT_LAYOUT.position('A1') == 0
+    assert DEFAULT_LAYOUT.position('B1') == 10
+    assert DEFAULT_LAYOUT.position('J10') == 99
+
+
+def test_bitmap_from_legacy_seat_strings():
+    blob = DEFAULT_LAYOUT.bitmap_from_csv(['A1,A2', None, ' B3 ', 'Z99'])
+    assert DEFAULT_LAYOUT.to_labels(DEFAULT_LAYOUT.decode(blob)) == {'A1', 'A2', 'B3'}
+
+
+def test_layout_larger_than_bitmap_column_is_rejected():
+    SeatLayout([('A', MAX_SEATS)])
+    with pytest.raises(ValueError):
+        SeatLayout([('A', MAX_SEATS + 1)])
+
+
+def test_booked_seats_are_read_from_inventory(app_db, pool):
+    query(pool, "UPDATE SeatInventory SET seat_bitmap = %s WHERE showtime_id = 1",
+          (DEFAULT_LAYOUT.encode(DEFAULT_LAYOUT.to_mask(['D4', 'D5'])),))
+    assert app_db.get_booked_seats(1, DEFAULT_LAYOUT) == {'D4', 'D5'}
+
+
+def test_missing_inventory_row_is_built_from_bookings(app_db, pool):
+    query(pool, "DELETE FROM SeatInventory WHERE showtime_id = 2")
+    query(pool, "INSERT INTO Bookings (user_id, showtime_id, tickets_booked, booking_date, seat_numbers) "
+          "VALUES (1, 2, 2, '2026-01-01 10:00:00', 'E1,E2')")
+    assert app_db.get_booked_seats(2, DEFAULT_LAYOUT) == {'E1', 'E2'}
+    rows = query(pool, "SELECT seat_bitmap FROM SeatInventory WHERE showtime_id = 2")
+    assert DEFAULT_LAYOUT.to_labels(DEFAULT_LAYOUT.decode(rows[0]['seat_bitmap'])) == {'E1', 'E2'}
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+import seed_data
+from seat_inventory import DEFAULT_LAYOUT
+from seed_data import SeatAllocator, Writer
+
+
+def test_load_data_fields():
+    assert Writer._field(None) == 'NULL'
+    assert Writer._field(12) == '12'
+    assert Writer._field(b'\x00\xff') == '00ff'
+    assert Writer._field('say "hi",\nbye') == '"say ""hi"",\nbye"'
+    assert Writer._field('NULL') == '"NULL"'
+
+
+def test_groups_sit_together_until_the_show_is_full():
+    allocator = SeatAllocator(1)
+    seats = allocator.allocate(0, 4)
+    assert len({seat[0] for seat in seats}) == 1
+    numbers = sorted(int(seat[1:]) for seat in seats)
+    assert numbers == list(range(numbers[0], numbers[0] + 4))
+    while allocator.allocate(0, 4):
+        pass
+    assert allocator.taken[0] == 80
+    assert allocator.allocate(0, 4) is None
+    # A smaller group can still take a free seat in the last row
+    booked = allocator.masks[0]
+    assert not booked & DEFAULT_LAYOUT.to_mask(allocator.allocate(0, 1))
+
+
+def test_cancelled_bookings_do_not_keep_their_seats():
+    allocator = SeatAllocator(1)
+    allocator.allocate(0, 3, keep=False)
+    assert (allocator.taken[0], allocator.masks[0]) == (0, 0)
+
+
+@pytest.fixture(scope='module')
+def generated(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('seed') / 'catalogue.db')
+    assert seed_data.main(['--sqlite', path, '--users', '20', '--movies', '6', '--showtimes', '30',
+                           '--bookings', '800', '--seed', '7']) == 0
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def test_seat_inventory_matches_confirmed_bookings(generated):
+    sold = {}
+    for row in generated.execute("SELECT showtime_id, seat_numbers FROM Bookings WHERE status = 'confirmed'"):
+        seats = row['seat_numbers'].split(',')
+        assert sold.setdefault(row['showtime_id'], set()).isdisjoint(seats)
+        sold[row['showtime_id']].update(seats)
+    for row in generated.execute("SELECT s.showtime_id, s.available_seats, i.seat_bitmap FROM Showtimes s "
+                                 "JOIN SeatInventory i ON i.showtime_id = s.showtime_id"):
+        seats = sold.get(row['showtime_id'], set())
+        assert DEFAULT_LAYOUT.to_labels(DEFAULT_LAYOUT.decode(row['seat_bitmap'])) == seats
+        assert row['available_seats'] == DEFAULT_LAYOUT.size - len(seats)
+
+
+def test_rollups_match_the_bookings(generated):
+    bookings, tickets = generated.execute("SELECT COUNT(*), SUM(tickets_booked) FROM Bookings").fetchone()
+    counters = dict(generated.execute("SELECT name, SUM(value) FROM MetricCounters GROUP BY name").fetchall())
+    assert counters == {'users': 20, 'bookings': bookings, 'tickets': tickets}
+    by_movie = generated.execute("SELECT SUM(bookings), SUM(tickets) FROM MovieSales").fetchone()
+    assert tuple(by_movie) == (bookings, tickets)
+
+
+def test_bookings_are_made_before_their_show(generated):
+    late = generated.execute("""
+        SELECT COUNT(*) FROM Bookings b JOIN Showtimes s ON b.showtime_id = s.showtime_id
+        WHERE b.booking_date > s.show_date || ' ' || s.show_time
+    """).fetchone()[0]
+    assert late == 0
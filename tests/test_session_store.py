@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from session_store import MemorySessionBackend, SessionManager, SQLiteSessionBackend
+
+
+@pytest.fixture
+def manager():
+    manager = SessionManager(MemorySessionBackend(), 'secret', flush_interval=3600)
+    yield manager
+    manager.stop()
+
+
+def test_session_round_trips_through_a_flush(manager):
+    token = manager.create({'user_id': 1})
+    manager.save(token, {'user_id': 1, 'page': 'bookings'})
+    assert manager.load(token) == {'user_id': 1, 'page': 'bookings'}
+    manager.flush()
+    assert manager.backend.get(manager.session_id(token)) == {'user_id': 1, 'page': 'bookings'}
+
+
+def test_tampered_or_foreign_tokens_are_rejected(manager):
+    token = manager.create({'user_id': 1})
+    session_id, signature = token.rsplit('.', 1)
+    assert manager.load(f"{session_id}x.{signature}") is None
+    other = SessionManager(MemorySessionBackend(), 'other secret', flush_interval=3600)
+    try:
+        assert other.session_id(token) is None
+    finally:
+        other.stop()
+    assert manager.load('garbage') is None
+
+
+def test_save_after_destroy_does_not_revive_the_session(manager):
+    token = manager.create({'user_id': 1})
+    manager.destroy(token)
+    manager.save(token, {'user_id': 1})
+    manager.flush()
+    assert manager.load(token) is None
+
+
+def test_destroy_during_a_flush_wins():
+    class SlowBackend(MemorySessionBackend):
+        """Holds a write once armed, until proceed is set"""
+        armed = False
+        writing = threading.Event()
+        proceed = threading.Event()
+
+        def put_many(self, items, ttl=None):
+            if self.armed:
+                self.writing.set()
+                self.proceed.wait(5)
+            super().put_many(items)
+
+    backend = SlowBackend()
+    manager = SessionManager(backend, 'secret', flush_interval=3600)
+    try:
+        token = manager.create({'user_id': 1})
+        manager.save(token, {'user_id': 1, 'page': 'browse'})
+        backend.armed = True
+        flusher = threading.Thread(target=manager.flush)
+        flusher.start()
+        backend.writing.wait(5)
+        destroyer = threading.Thread(target=manager.destroy, args=(token,))
+        destroyer.start()
+        backend.proceed.set()
+        flusher.join(5)
+        destroyer.join(5)
+        assert manager.load(token) is None
+    finally:
+        manager.stop()
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemorySessionBackend(max_entries=2)
+    backend.put_many([('a', {}), ('b', {})])
+    backend.get('a')
+    backend.put_many([('c', {})])
+    assert backend.get('b') is None
+    assert backend.get('a') == {}
+
+
+def test_sqlite_backend_expires_sessions(tmp_path):
+    now = [1000.0]
+    backend = SQLiteSessionBackend(str(tmp_path / 'sessions.db'), clock=lambda: now[0])
+    backend.put_many([('a', {'user_id': 1})], ttl=60)
+    assert backend.get('a') == {'user_id': 1}
+    now[0] += 61
+    assert backend.get('a') is None
+    backend.put_many([('b', {})], ttl=60)
+    backend.delete('b')
+    assert backend.get('b') is None
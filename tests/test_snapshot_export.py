@@ -0,0 +1,82 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import snapshot_export
+from analytics import build_report, prepare_frames
+from snapshot_export import export_snapshot, load_snapshot, read_watermark
+
+MOVIES = [{'movie_id': 1, 'title': 'Movie 0', 'genre': 'Drama', 'language': 'English',
+           'duration': 120, 'rating': 7.5, 'release_year': 2024}]
+SHOWTIMES = [{'showtime_id': 1, 'movie_id': 1, 'screen_id': None, 'show_date': date(2026, 2, 2),
+              'show_time': timedelta(hours=19), 'available_seats': 97, 'ticket_price': 200.0}]
+
+
+def booking(booking_id, booked_at, tickets=1, status='confirmed'):
+    return {'booking_id': booking_id, 'user_id': 1, 'showtime_id': 1, 'tickets_booked': tickets,
+            'booking_date': booked_at, 'status': status, 'seat_numbers': 'A1'}
+
+
+@pytest.fixture
+def source(monkeypatch):
+    """Rows the export reads, in place of MySQL server-side cursors"""
+    data = {'bookings': [], 'limit': None}
+
+    def stream(conn, query, params=()):
+        if 'FROM Movies' in query:
+            yield MOVIES
+        elif 'FROM Showtimes' in query:
+            yield SHOWTIMES
+        else:
+            rows = [row for row in data['bookings'] if row['booking_id'] > params[0]
+                    and (len(params) < 2 or row['booking_id'] < params[1])]
+            if rows:
+                yield rows
+
+    monkeypatch.setattr(snapshot_export, '_stream', stream)
+    monkeypatch.setattr(snapshot_export, '_export_limit', lambda conn, after_id: data['limit'])
+    return data
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_bookings_are_appended_past_the_watermark(source, tmp_path, fmt):
+    out = str(tmp_path / 'snapshot')
+    source['bookings'] = [booking(1, datetime(2026, 1, 30, 10)), booking(2, datetime(2026, 2, 1, 9))]
+    assert export_snapshot(None, out, fmt)['bookings'] == 2
+    assert export_snapshot(None, out, fmt)['bookings'] == 0
+    source['bookings'].append(booking(3, datetime(2026, 2, 1, 12), tickets=2))
+    assert export_snapshot(None, out, fmt)['bookings'] == 1
+    assert read_watermark(out) == {'bookings': 3}
+    assert sorted(p.name for p in (tmp_path / 'snapshot' / 'bookings').iterdir()) == \
+        ['booking_month=2026-01', 'booking_month=2026-02']
+
+    bookings, showtimes = load_snapshot(out)
+    assert bookings.column('booking_id').to_pylist() == [1, 2, 3]
+    assert showtimes.num_rows == 1
+
+
+def test_unsettled_bookings_wait_for_the_next_run(source, tmp_path):
+    out = str(tmp_path / 'snapshot')
+    source['bookings'] = [booking(n, datetime(2026, 2, 1, 10)) for n in (1, 2, 3)]
+    source['limit'] = 2
+    assert export_snapshot(None, out)['bookings'] == 1
+    source['limit'] = None
+    assert export_snapshot(None, out)['bookings'] == 2
+
+
+def test_snapshot_feeds_the_sales_report(source, tmp_path):
+    out = str(tmp_path / 'snapshot')
+    source['bookings'] = [booking(1, datetime(2026, 2, 1, 10), tickets=3),
+                          booking(2, datetime(2026, 2, 1, 11), status='cancelled')]
+    export_snapshot(None, out)
+    bookings, showtimes = load_snapshot(out)
+    report = build_report(*prepare_frames(bookings.to_pandas(), showtimes.to_pandas()))
+    assert report['total_revenue'] == pytest.approx(600.0)
+    assert report['by_hour']['hour'].tolist() == [19]
+
+
+def test_empty_snapshot_loads(source, tmp_path):
+    out = str(tmp_path / 'snapshot')
+    export_snapshot(None, out)
+    bookings, _ = load_snapshot(out)
+    assert bookings.num_rows == 0
@@ -0,0 +1,64 @@
+import socket
+import urllib.request
+
+import pytest
+
+from theme import THEME_PATH, compile_stylesheet, minify
+
+
+def test_minify_drops_comments_and_whitespace():
+    css = """
+    /* buttons */
+    .stButton > button {
+        color : #fff;
+        margin: 0 auto;
+    }
+    a :hover, a:focus { color: red; }
+    """
+    assert minify(css) == ".stButton>button{color :#fff;margin:0 auto}a :hover,a:focus{color:red}"
+
+
+def test_stylesheet_name_follows_its_content(tmp_path):
+    path = tmp_path / 'theme.css'
+    path.write_text("body { margin: 0; }")
+    first = compile_stylesheet(str(path))
+    assert first.css == "body{margin:0}"
+    assert first.filename == f"theme.{first.version}.css"
+    assert compile_stylesheet(str(path)) == first
+    path.write_text("body { margin: 1px; }")
+    assert compile_stylesheet(str(path)).version != first.version
+
+
+def test_app_theme_compiles_smaller():
+    with open(THEME_PATH, encoding='utf-8') as f:
+        source = f.read()
+    assert 0 < len(compile_stylesheet().css) < len(source)
+
+
+def test_stylesheet_is_inlined_without_the_poster_server(app_db):
+    assert app_db.stylesheet_html() == f"<style>{app_db.get_stylesheet().css}</style>"
+
+
+@pytest.fixture
+def poster_server(app_db, monkeypatch, tmp_path):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    monkeypatch.setattr(app_db, 'POSTER_PORT', port)
+    monkeypatch.setattr(app_db, 'POSTER_PUBLIC_URL', f"http://127.0.0.1:{port}")
+    monkeypatch.setattr(app_db, 'POSTER_CACHE_DIR', str(tmp_path / 'posters'))
+    yield app_db
+    server = app_db.get_poster_server()
+    if server:
+        server.shutdown()
+        server.server_close()
+
+
+def test_stylesheet_is_linked_and_cached_by_the_browser(poster_server):
+    html = poster_server.stylesheet_html()
+    sheet = poster_server.get_stylesheet()
+    url = html.split('href="')[1].split('"')[0]
+    assert url.endswith(f"/static/{sheet.filename}")
+    with urllib.request.urlopen(url, timeout=10) as response:
+        assert response.read().decode() == sheet.css
+        assert 'immutable' in response.headers['Cache-Control']
@@ -0,0 +1,36 @@
+"""
+Theme Stylesheet
+Filename: theme.py
+
+The app's CSS lives in theme.css. It is minified and hashed once per
+process; the hash goes into the file name, so browsers can cache the
+stylesheet forever and a changed theme gets a new URL.
+"""
+
+import hashlib
+import os
+import re
+from collections import namedtuple
+
+THEME_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'theme.css')
+
+Stylesheet = namedtuple('Stylesheet', ['css', 'version', 'filename'])
+
+
+def minify(css):
+    """Drop comments and the whitespace CSS does not need"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    # Space before ':' is kept, "a :hover" and "a:hover" are different selectors
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def compile_stylesheet(path=THEME_PATH):
+    with open(path, encoding='utf-8') as f:
+        css = minify(f.read())
+    version = hashlib.sha256(css.encode()).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return Stylesheet(css, version, f"{name}.{version}.css")